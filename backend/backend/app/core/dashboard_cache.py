@@ -0,0 +1,205 @@
+import json
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+from app.db.session import SessionLocal
+from app.models.activities import Activity
+from app.models.leads import Lead
+from app.models.tasks import Task
+from app.utils.serializers import dumps
+
+# Version stamps outlive every cached entry, so an expired stamp restarting
+# at 0 cannot collide with a payload that is still cached
+_VERSION_TTL_SECONDS = 60 * 60 * 24
+
+
+# ==========================================================
+# 🔖 Per-company version stamps (bumped on lead / task / activity writes)
+# ==========================================================
+_lock = threading.Lock()
+_local_versions: Dict[str, int] = {}
+
+
+def _version_key(company_id) -> str:
+    return f"uplift:dash:ver:{company_id}"
+
+
+def company_version(company_id) -> str:
+    """
+    Part of every dashboard cache key. With Redis every worker reads the same
+    shared counter, so they share keys (and L2 entries); the per-process
+    counter is only used while Redis is off or unreachable.
+    """
+    r = get_redis()
+    if r is not None:
+        try:
+            return f"r{int(r.get(_version_key(company_id)) or 0)}"
+        except Exception:
+            pass
+    with _lock:
+        return f"l{_local_versions.get(str(company_id), 0)}"
+
+
+def bump(company_id) -> None:
+    """Invalidate every cached dashboard payload of this company."""
+    if company_id is None:
+        return
+    with _lock:
+        _local_versions[str(company_id)] = _local_versions.get(str(company_id), 0) + 1
+    r = get_redis()
+    if r is not None:
+        try:
+            pipe = r.pipeline()
+            pipe.incr(_version_key(company_id))
+            pipe.expire(_version_key(company_id), _VERSION_TTL_SECONDS)
+            pipe.execute()
+        except Exception:
+            # The shared stamp did not move: at least drop this worker's copies
+            myday_cache.clear()
+            geo_cache.clear()
+
+
+def mark_changed(session, company_ids: Iterable) -> None:
+    """Bump these companies once the session commits (Core writes the mapper events miss)."""
+    session.info.setdefault("dashboard_companies", set()).update(c for c in company_ids if c is not None)
+
+
+# ==========================================================
+# ⚡ TTL cache (in-process L1, optional Redis L2)
+# ==========================================================
+class DashboardCache:
+    """
+    JSON-safe payloads under version-stamped keys. Writes never delete
+    entries: they bump the stamp, so old keys just stop being read and age
+    out on their TTL.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: int):
+        self.name = name
+        self.ttl = ttl
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def _key(self, key: str) -> str:
+        return f"uplift:dash:{self.name}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._local.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+        r = get_redis()
+        if r is not None:
+            try:
+                raw = r.get(self._key(key))
+            except Exception:
+                raw = None
+            if raw:
+                value = json.loads(raw)
+                with self._lock:
+                    self._local[key] = value
+                    self.redis_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> Any:
+        """Store (UUIDs / datetimes encoded once) and return the stored form."""
+        raw = dumps(value)
+        value = json.loads(raw)
+        with self._lock:
+            self._local[key] = value
+        r = get_redis()
+        if r is not None:
+            try:
+                r.setex(self._key(key), self.ttl, raw)
+            except Exception:
+                pass
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.redis_hits + self.misses
+            return {
+                "size": len(self._local),
+                "maxsize": self._local.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.redis_hits) / lookups, 4) if lookups else None,
+                "redis_enabled": get_redis() is not None,
+            }
+
+
+myday_cache = DashboardCache(
+    "myday",
+    maxsize=settings.DASHBOARD_CACHE_MAX_SIZE,
+    ttl=settings.DASHBOARD_CACHE_TTL_SECONDS,
+)
+geo_cache = DashboardCache(
+    "geo",
+    maxsize=settings.DASHBOARD_CACHE_MAX_SIZE,
+    ttl=settings.DASHBOARD_GEO_CACHE_TTL_SECONDS,
+)
+
+_counter_lock = threading.Lock()
+not_modified = 0
+
+
+def count_not_modified() -> None:
+    global not_modified
+    with _counter_lock:
+        not_modified += 1
+
+
+def stats() -> dict:
+    return {
+        "myday": myday_cache.stats(),
+        "geo": geo_cache.stats(),
+        "not_modified_responses": not_modified,
+    }
+
+
+# ==========================================================
+# 🔄 Invalidation on lead / task / activity writes
+# ==========================================================
+def _changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        mark_changed(session, (target.company_id,))
+    else:
+        bump(target.company_id)
+
+
+for _model in (Lead, Task, Activity):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _changed)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _bump_after_commit(session):
+    for company_id in session.info.pop("dashboard_companies", ()):
+        bump(company_id)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("dashboard_companies", None)
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+def _percentile(samples, pct: float):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return round(ordered[idx], 2)
+
+
+class PasswordHashPool:
+    """
+    Dedicated, size-limited executor for bcrypt hash/verify.
+
+    Keeps password CPU off the shared request threadpool so a login burst
+    cannot starve lead/activity traffic. Work beyond `workers + max_queue`
+    outstanding jobs is rejected with 429 instead of queueing unbounded.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self._hash_ms = deque(maxlen=1000)
+        self._wait_ms = deque(maxlen=1000)
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many logins in progress, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+            try:
+                return fn(*args)
+            finally:
+                done = time.perf_counter()
+                with self._lock:
+                    self._running -= 1
+                    self.completed += 1
+                    self._wait_ms.append((started - submitted) * 1000)
+                    self._hash_ms.append((done - started) * 1000)
+
+        try:
+            return await asyncio.wrap_future(self._executor.submit(job))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            hash_ms, wait_ms = list(self._hash_ms), list(self._wait_ms)
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._running,
+                "queue_depth": self._pending - self._running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "hash_ms_p50": _percentile(hash_ms, 50),
+                "hash_ms_p99": _percentile(hash_ms, 99),
+                "queue_wait_ms_p50": _percentile(wait_ms, 50),
+                "queue_wait_ms_p99": _percentile(wait_ms, 99),
+            }
+
+
+password_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -0,0 +1,184 @@
+import json
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from cachetools import TTLCache
+from sqlalchemy import event, inspect
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+from app.core.token_revocation import mark_user_changed
+from app.db.session import SessionLocal
+from app.models.user import User
+
+# Fields that change what a principal is allowed to do (or show)
+_WATCHED_FIELDS = ("is_active", "role", "company_id", "email", "full_name")
+
+
+# ==========================================================
+# 👤 Slim principal (what routes actually read from current_user)
+# ==========================================================
+@dataclass(frozen=True)
+class Principal:
+    id: UUID
+    company_id: UUID
+    role: Optional[str] = None
+    email: Optional[str] = None
+    full_name: Optional[str] = None
+    is_active: bool = True
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            company_id=user.company_id,
+            role=user.role,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=bool(user.is_active),
+        )
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "id": str(self.id),
+            "company_id": str(self.company_id),
+            "role": self.role,
+            "email": self.email,
+            "full_name": self.full_name,
+            "is_active": self.is_active,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Principal":
+        d = json.loads(raw)
+        return cls(
+            id=UUID(d["id"]),
+            company_id=UUID(d["company_id"]),
+            role=d.get("role"),
+            email=d.get("email"),
+            full_name=d.get("full_name"),
+            is_active=bool(d.get("is_active", True)),
+        )
+
+
+# ==========================================================
+# ⚡ TTL/LRU cache (in-process L1, optional Redis L2)
+# ==========================================================
+class PrincipalCache:
+    """
+    Maps user_id -> Principal so get_current_user can skip the users-table
+    query. The local TTL bounds staleness in other workers after an
+    invalidation; Redis entries are deleted immediately.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.ttl = ttl
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(user_id) -> str:
+        return f"uplift:principal:{user_id}"
+
+    def get(self, user_id: UUID) -> Optional[Principal]:
+        with self._lock:
+            principal = self._local.get(user_id)
+            if principal is not None:
+                self.hits += 1
+                return principal
+
+        r = get_redis()
+        if r is not None:
+            try:
+                raw = r.get(self._key(user_id))
+            except Exception:
+                raw = None
+            if raw:
+                principal = Principal.from_json(raw)
+                with self._lock:
+                    self._local[user_id] = principal
+                    self.redis_hits += 1
+                return principal
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, principal: Principal) -> None:
+        with self._lock:
+            self._local[principal.id] = principal
+        r = get_redis()
+        if r is not None:
+            try:
+                r.setex(self._key(principal.id), self.ttl, principal.to_json())
+            except Exception:
+                pass
+
+    def invalidate(self, user_id: UUID) -> None:
+        with self._lock:
+            self._local.pop(user_id, None)
+            self.invalidations += 1
+        r = get_redis()
+        if r is not None:
+            try:
+                r.delete(self._key(user_id))
+            except Exception:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.redis_hits + self.misses
+            return {
+                "size": len(self._local),
+                "maxsize": self._local.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.hits + self.redis_hits) / lookups, 4) if lookups else None,
+                "redis_enabled": get_redis() is not None,
+            }
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+# ==========================================================
+# 🔄 Invalidation on user writes (deactivation, role change, ...)
+# ==========================================================
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[f].history.has_changes() for f in _WATCHED_FIELDS):
+        principal_cache.invalidate(target.id)
+        mark_user_changed(target.id)
+        state.session.info.setdefault("principal_invalidations", set()).add(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    principal_cache.invalidate(target.id)
+    mark_user_changed(target.id)
+    inspect(target).session.info.setdefault("principal_invalidations", set()).add(target.id)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _drop_after_commit(session):
+    # A concurrent request may have re-cached the pre-commit row between
+    # flush and commit; evict again once the new values are visible.
+    for user_id in session.info.pop("principal_invalidations", ()):
+        principal_cache.invalidate(user_id)
@@ -0,0 +1,40 @@
+import logging
+
+from app.core.config import settings
+
+log = logging.getLogger("uvicorn")
+
+# Optional dependency: the app runs fine without Redis (single-process caches)
+try:
+    import redis  # type: ignore
+except Exception:  # pragma: no cover
+    redis = None
+
+_client = None
+_disabled = False
+
+
+def get_redis():
+    """
+    Return a shared Redis client when REDIS_URL is configured, else None.
+    The client connects lazily, so callers must still guard each command.
+    """
+    global _client, _disabled
+    if _client is not None or _disabled:
+        return _client
+
+    if not settings.REDIS_URL or redis is None:
+        _disabled = True
+        return None
+
+    try:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.25,
+            socket_connect_timeout=0.25,
+            decode_responses=True,
+        )
+    except Exception as e:
+        log.warning("⚠️  Redis disabled (%s)", e)
+        _disabled = True
+    return _client
@@ -0,0 +1,83 @@
+import threading
+import time
+from typing import Optional
+from uuid import UUID
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+# Revoked token ids only need to outlive the longest-lived access token
+_MAX_TOKEN_SECONDS = 60 * 60 * 24 * 7
+
+_lock = threading.Lock()
+_revoked_jti = TTLCache(maxsize=100_000, ttl=_MAX_TOKEN_SECONDS)
+# user_id -> epoch seconds; claims issued before this are not trusted as-is
+_user_not_before = TTLCache(maxsize=100_000, ttl=max(settings.AUTH_CLAIMS_MAX_AGE_MINUTES, 1) * 60)
+
+
+def revoke_token(jti: str, expires_at: Optional[float] = None) -> None:
+    """Reject this token id on every auth path until it expires."""
+    if not jti:
+        return
+    ttl = int(expires_at - time.time()) if expires_at else _MAX_TOKEN_SECONDS
+    if ttl <= 0:
+        return
+    with _lock:
+        _revoked_jti[jti] = True
+    r = get_redis()
+    if r is not None:
+        try:
+            r.setex(f"uplift:revoked:{jti}", ttl, "1")
+        except Exception:
+            pass
+
+
+def is_token_revoked(jti: Optional[str]) -> bool:
+    if not jti:
+        return False
+    with _lock:
+        if jti in _revoked_jti:
+            return True
+    r = get_redis()
+    if r is not None:
+        try:
+            return bool(r.exists(f"uplift:revoked:{jti}"))
+        except Exception:
+            pass
+    return False
+
+
+def mark_user_changed(user_id: UUID) -> None:
+    """
+    Stop trusting claims minted before now for this user (role change,
+    deactivation). Only needs to last one claims window: older tokens
+    already go through the DB-backed path.
+    """
+    now = time.time()
+    ttl = max(settings.AUTH_CLAIMS_MAX_AGE_MINUTES, 1) * 60
+    with _lock:
+        _user_not_before[user_id] = now
+    r = get_redis()
+    if r is not None:
+        try:
+            r.setex(f"uplift:user-nbf:{user_id}", ttl, str(now))
+        except Exception:
+            pass
+
+
+def user_claims_not_before(user_id: UUID) -> float:
+    with _lock:
+        nbf = _user_not_before.get(user_id)
+    if nbf is not None:
+        return nbf
+    r = get_redis()
+    if r is not None:
+        try:
+            raw = r.get(f"uplift:user-nbf:{user_id}")
+            if raw:
+                return float(raw)
+        except Exception:
+            pass
+    return 0.0
@@ -0,0 +1,64 @@
+# backend/app/db/loaders.py
+#
+# Named loader profiles. Relationships on Lead / Activity / Task are lazy by
+# default; each query opts into exactly the eager loads its response needs:
+#
+#   "list"   — many rows serialised with display names (lead / assignee);
+#              collections are never loaded (list routes exclude them)
+#   "detail" — one row with every relationship a detail view shows
+#   "bare"   — lookups for update / delete / count: no relationship loads
+#
+#   db.query(Activity).options(*loader_profile(Activity, "list"))
+
+from sqlalchemy.orm import joinedload, lazyload, noload, selectinload
+
+from app.models.activities import Activity
+from app.models.leads import Lead
+from app.models.tasks import Task
+
+_PROFILES = {
+    Lead: {
+        # One IN query for the page's companies; activities / tasks stay
+        # unread (noload: no lazy load per row) and are left to "detail"
+        "list": lambda: (
+            selectinload(Lead.company),
+            noload(Lead.activities),
+            noload(Lead.tasks),
+        ),
+        "detail": lambda: (
+            joinedload(Lead.company),
+            selectinload(Lead.activities),
+            selectinload(Lead.tasks),
+        ),
+        "bare": lambda: (lazyload("*"),),
+    },
+    Activity: {
+        # Many-to-one joins only; the company row is never serialised
+        "list": lambda: (joinedload(Activity.lead), joinedload(Activity.assigned_user)),
+        "detail": lambda: (
+            joinedload(Activity.lead),
+            joinedload(Activity.assigned_user),
+            joinedload(Activity.creator_user),
+        ),
+        "bare": lambda: (lazyload("*"),),
+    },
+    Task: {
+        "list": lambda: (joinedload(Task.lead), joinedload(Task.assigned_user)),
+        "detail": lambda: (
+            joinedload(Task.lead),
+            joinedload(Task.assigned_user),
+            joinedload(Task.creator_user),
+        ),
+        "bare": lambda: (lazyload("*"),),
+    },
+}
+
+PROFILE_NAMES = ("list", "detail", "bare")
+
+
+def loader_profile(model, name: str) -> tuple:
+    """Loader options for `model` under profile `name` ("list" | "detail" | "bare")."""
+    try:
+        return _PROFILES[model][name]()
+    except KeyError:
+        raise ValueError(f"No loader profile {name!r} for {getattr(model, '__name__', model)}") from None
@@ -68,6 +68,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Page-Limit", "X-Total-Count", "X-Total-Count-Estimated", "ETag"],
 )
 
 log.warning("✅ CORS enabled for: %s", ", ".join(origins))
@@ -104,6 +105,7 @@ _safe_include("app.routers.tasks")
 _safe_include("app.routers.quotation")
 _safe_include("app.routers.order")              # <-- FIX: file is order.py (not orders.py)
 _safe_include("app.routers.activity_overview")
+_safe_include("app.routers.activity_rules")
 
 # Gmail & AI helpers
 _safe_include("app.routers.gmail")
@@ -113,6 +115,37 @@ _safe_include("app.routers.ai_insights")
 # Google OAuth (in routers/integrations/google_auth.py)
 _safe_include("app.routers.integrations.google_auth")
 
+# ---- Background workers -------------------------------------------
+@app.on_event("startup")
+def _start_workers() -> None:
+    try:
+        from app.db.session import engine
+        from app.services.activity_partitions import ensure_partitions, is_partitioned
+
+        # Inserts fail without a partition for the current month
+        with engine.begin() as conn:
+            if is_partitioned(conn):
+                ensure_partitions(conn)
+    except Exception as e:  # pragma: no cover
+        log.warning("⚠️  Activity partitions not checked: %s", e)
+    try:
+        from app.services.scheduler import start_scheduler
+
+        start_scheduler()
+    except Exception as e:  # pragma: no cover
+        log.warning("⚠️  Background jobs not started: %s", e)
+
+
+@app.on_event("shutdown")
+def _stop_workers() -> None:
+    try:
+        from app.services.scheduler import stop_scheduler
+
+        stop_scheduler()
+    except Exception:  # pragma: no cover
+        pass
+
+
 # ---- Health/root --------------------------------------------------
 @app.get("/", tags=["health"])
 def health():
@@ -5,9 +5,16 @@ from app.models.user import User
 from app.models.company import Company
 from app.models.company_profile import CompanyProfile
 from app.models.leads import Lead
+from app.models.lead_duplicate import LeadDuplicateCandidate
 from app.models.tasks import Task
 from app.models.quotation import Quotation
 from app.models.order import Order
+from app.models.refresh_token import RefreshToken
+from app.models.activity_counter import ActivityCounter
+from app.models.activity_rollup import ActivityDailyRollup
+from app.models.activity_rule import ActivityOutbox, ActivityRule
+from app.models.activity_idempotency import ActivityIdempotencyKey
+from app.models.activity_archive import ActivityArchive
 
 __all__ = [
     "Base",
@@ -15,7 +22,15 @@ __all__ = [
     "Company",
     "CompanyProfile",
     "Lead",
+    "LeadDuplicateCandidate",
     "Task",
     "Quotation",
     "Order",
+    "RefreshToken",
+    "ActivityCounter",
+    "ActivityDailyRollup",
+    "ActivityRule",
+    "ActivityOutbox",
+    "ActivityIdempotencyKey",
+    "ActivityArchive",
 ]
@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, String, Text, Boolean, DateTime, Integer, ForeignKey, Float, Index
+    Column, Computed, String, Text, Boolean, DateTime, Integer, ForeignKey, Float, Index, PrimaryKeyConstraint
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
@@ -8,10 +8,22 @@ import uuid
 from app.db.base_class import Base
 
 
+# Where AI sentiment has been written into meta over time
+SENTIMENT_EXPR = "coalesce(meta ->> 'ai_sentiment', meta ->> 'sentiment', meta -> 'ai' ->> 'sentiment')"
+
+
 class Activity(Base):
+    """
+    RANGE-partitioned by month on created_at (see services/activity_partitions).
+    The table key is (id, created_at) as partitioning requires; the ORM
+    still identifies rows by id alone. Nothing can hold a foreign key to a
+    partitioned table's id, so parent_activity_id is a plain column and the
+    follow-up chain is deleted explicitly (services/activity_chain).
+    """
+
     __tablename__ = "activities"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), nullable=False, default=uuid.uuid4)
     lead_id = Column(UUID(as_uuid=True), ForeignKey("leads.id", ondelete="CASCADE"), nullable=False)
 
     # 🔗 Company isolation — align with Task/CompanyProfile
@@ -45,7 +57,7 @@ class Activity(Base):
     gps_verified = Column(Boolean, default=False)
 
     # Chaining / automation flags
-    parent_activity_id = Column(UUID(as_uuid=True), ForeignKey("activities.id", ondelete="CASCADE"), nullable=True)
+    parent_activity_id = Column(UUID(as_uuid=True), nullable=True)
     auto_generated = Column(Boolean, default=False)
 
     # Analytics / meta
@@ -53,17 +65,42 @@ class Activity(Base):
     source_channel = Column(String(60))                  # Google Form | Referral | Manual | ...
     meta = Column(JSONB, default=dict)
 
-    # Relationships
-    parent_activity = relationship("Activity", remote_side=[id], uselist=False)
-    lead = relationship("Lead", back_populates="activities", lazy="joined")
-    assigned_user = relationship("User", foreign_keys=[assigned_to], lazy="joined")
-    creator_user = relationship("User", foreign_keys=[created_by], lazy="joined")
-    company = relationship("CompanyProfile", lazy="joined")
+    # Hot meta key as a stored generated column (read-only: write meta instead)
+    ai_sentiment = Column(String, Computed(SENTIMENT_EXPR, persisted=True))
+
+    # Client-supplied batch sync key (uniqueness: activity_idempotency_keys)
+    idempotency_key = Column(String(80), nullable=True)
+
+    # Relationships (lazy; routers pick eager loads via app.db.loaders profiles)
+    parent_activity = relationship(
+        "Activity",
+        primaryjoin="foreign(Activity.parent_activity_id) == remote(Activity.id)",
+        uselist=False,
+        viewonly=True,
+    )
+    lead = relationship("Lead", back_populates="activities")
+    assigned_user = relationship("User", foreign_keys=[assigned_to])
+    creator_user = relationship("User", foreign_keys=[created_by])
+    company = relationship("CompanyProfile")
+
+    # eager_defaults: INSERT ... RETURNING created_at (and ai_sentiment), so
+    # after_insert hooks see the stored timestamp, not an unloaded attribute
+    __mapper_args__ = {"primary_key": [id], "eager_defaults": True}
 
     # Helpful indexes
     __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at", name="activities_pkey"),
         Index("ix_activities_lead_status_due", "lead_id", "status", "due_date"),
         Index("ix_activities_assignee_due", "assigned_to", "due_date"),
         Index("ix_activities_created_at", "created_at"),
         Index("ix_activities_company_id", "company_id"),
+        Index("ix_activities_parent_activity_id", "parent_activity_id"),
+        # meta @> '{...}' and meta @? '$.key' filters
+        Index("ix_activities_meta_path_ops", "meta", postgresql_using="gin", postgresql_ops={"meta": "jsonb_path_ops"}),
+        Index("ix_activities_company_sentiment_created", "company_id", "ai_sentiment", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
+
+
+# Keyset pagination for GET /activities walks (created_at DESC, id DESC) per tenant
+Index("ix_activities_company_created_id", Activity.company_id, Activity.created_at.desc(), Activity.id.desc())
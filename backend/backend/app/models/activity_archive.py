@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+from app.db.base_class import Base
+
+
+class ActivityArchive(Base):
+    """
+    Activities past a company's retention window, one gzip'd JSON-lines
+    chunk per (company, month). Late rows for an archived month are
+    appended as another gzip member (gzip.decompress reads them all).
+    """
+
+    __tablename__ = "activity_archive"
+
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company_profile.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)
+    row_count = Column(Integer, nullable=False, default=0)
+    payload = Column(LargeBinary, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
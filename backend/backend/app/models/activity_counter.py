@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+from app.db.base_class import Base
+
+# user_id used for the company-wide row (what admins see)
+COMPANY_WIDE = uuid.UUID(int=0)
+
+
+class ActivityCounter(Base):
+    """
+    Running activity totals behind /activities/summary/overview. One row per
+    (company, user) for the activities that user created or is assigned to,
+    plus a company-wide row with user_id = COMPANY_WIDE. Maintained
+    incrementally by app.services.activity_counters.
+    """
+
+    __tablename__ = "activity_counters"
+
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company_profile.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), primary_key=True)  # no FK: holds COMPANY_WIDE
+
+    total = Column(Integer, nullable=False, default=0)
+    verified = Column(Integer, nullable=False, default=0)
+    pending = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
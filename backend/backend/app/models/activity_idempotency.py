@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+from app.db.base_class import Base
+
+
+class ActivityIdempotencyKey(Base):
+    """
+    Claimed batch-sync keys. activities is partitioned, so a unique index
+    there would have to include created_at; uniqueness per company lives
+    here instead and is claimed with INSERT ... ON CONFLICT DO NOTHING.
+    """
+
+    __tablename__ = "activity_idempotency_keys"
+
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company_profile.id", ondelete="CASCADE"), primary_key=True)
+    idempotency_key = Column(String(80), primary_key=True)
+    activity_id = Column(UUID(as_uuid=True), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Date, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base_class import Base
+from app.models.activity_counter import COMPANY_WIDE
+
+
+class ActivityDailyRollup(Base):
+    """
+    Activity counts per (company, user, day, type, status) for charts and
+    timelines. user_id is the assignee, else the creator (COMPANY_WIDE when
+    both are gone). Maintained incrementally by app.services.activity_rollup.
+    """
+
+    __tablename__ = "activity_daily_rollup"
+
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company_profile.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), primary_key=True, default=COMPANY_WIDE)
+    day = Column(Date, primary_key=True)
+    type = Column(String(40), primary_key=True)
+    status = Column(String(20), primary_key=True)
+
+    count = Column(Integer, nullable=False, default=0)
+    call_duration_sum = Column(BigInteger, nullable=False, default=0)  # seconds
+
+    __table_args__ = (
+        Index("ix_activity_rollup_company_day", "company_id", "day"),
+    )
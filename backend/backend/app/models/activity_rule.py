@@ -0,0 +1,58 @@
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+from app.db.base_class import Base
+
+
+class ActivityRule(Base):
+    """
+    Per-company next-task rule: when an activity of `trigger_type` completes
+    with `trigger_outcome` (either may be NULL = any), schedule a follow-up.
+    """
+
+    __tablename__ = "activity_rules"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company_profile.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String(120), nullable=False)
+
+    trigger_type = Column(String(40), nullable=True)       # Call | Visit | ... (NULL = any)
+    trigger_outcome = Column(String(60), nullable=True)    # Interested | No Answer | ... (NULL = any)
+
+    next_type = Column(String(40), nullable=False, default="Task")
+    next_title = Column(String(200), nullable=False)
+    delay_minutes = Column(Integer, nullable=False, default=1440)
+    priority = Column(String(10), nullable=False, default="High")
+
+    enabled = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_activity_rules_company", "company_id"),
+    )
+
+
+class ActivityOutbox(Base):
+    """
+    Activity events written in the same transaction as the activity and
+    drained by the rule worker (services/activity_rules).
+    """
+
+    __tablename__ = "activity_outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company_profile.id", ondelete="CASCADE"), nullable=False)
+    activity_id = Column(UUID(as_uuid=True), nullable=False)   # no FK: activities is partitioned
+    event = Column(String(30), nullable=False, default="completed")
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    processed_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # The worker only ever scans the pending tail
+        Index("ix_activity_outbox_pending", "id", postgresql_where=processed_at.is_(None)),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Integer
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
@@ -21,6 +21,7 @@ class CompanyProfile(Base):
     footer_note = Column(String, default="Thank you for your business!")
     signature_url = Column(String, nullable=True)
     template_style = Column(String, default="classic")
+    activity_retention_months = Column(Integer, nullable=True)  # NULL = settings.ACTIVITY_RETENTION_MONTHS
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+from app.db.base_class import Base
+
+
+class LeadDuplicateCandidate(Base):
+    """
+    A scored pair of leads that look like the same business. Pairs are
+    stored once (lead_id < duplicate_lead_id) and re-scored in place by
+    later scans while still open.
+    """
+
+    __tablename__ = "lead_duplicate_candidates"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company_profile.id", ondelete="CASCADE"), nullable=False)
+    lead_id = Column(UUID(as_uuid=True), ForeignKey("leads.id", ondelete="CASCADE"), nullable=False)
+    duplicate_lead_id = Column(UUID(as_uuid=True), ForeignKey("leads.id", ondelete="CASCADE"), nullable=False)
+
+    score = Column(Float, nullable=False)
+    name_score = Column(Float, nullable=True)
+    block_key = Column(String(40), nullable=True)     # pincode:570001 | name:R400
+    status = Column(String(20), nullable=False, default="open")  # open | dismissed
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("lead_id", "duplicate_lead_id", name="uq_lead_duplicate_pair"),
+        Index("ix_lead_duplicates_company_status_score", "company_id", "status", "score"),
+        Index("ix_lead_duplicates_duplicate_lead", "duplicate_lead_id"),
+    )
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, String, Float, Boolean, ForeignKey
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, DateTime, String, Float, Boolean, ForeignKey, Index, event
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 from app.models.base_model import TimestampMixin
 from sqlalchemy.dialects.postgresql import UUID  # ✅ added
+from app.utils.contact import name_key, normalize_email, normalize_phone
+from app.utils.geo import geo_cell
 import uuid
 
 
@@ -11,12 +14,20 @@ class Lead(Base, TimestampMixin):
 
     # ✅ changed from String → UUID
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Keyset pagination key: never NULL (legacy rows backfilled by upgrade_schema)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     business_name = Column(String, nullable=False)  # Business Name
     contact_person = Column(String, nullable=True)
     email = Column(String, nullable=True)
     phone = Column(String, nullable=True)
 
+    # 🔎 Normalised identity (lower-cased email, E.164-style phone) for duplicate probes
+    email_normalized = Column(String, nullable=True)
+    phone_normalized = Column(String(20), nullable=True)
+    # Phonetic code of the business name (fuzzy-duplicate blocking key)
+    name_key = Column(String(12), nullable=True)
+
     # NEW address fields
     country = Column(String, nullable=True)
     state = Column(String, nullable=True)
@@ -26,6 +37,8 @@ class Lead(Base, TimestampMixin):
     stage = Column(String, default="New")
     lat = Column(Float, nullable=True)
     lng = Column(Float, nullable=True)
+    # 📍 Grid bucket of (lat, lng) for nearby-lead lookups (utils/geo.geo_cell)
+    geo_cell = Column(BigInteger, nullable=True)
 
     # NEW source
     lead_source = Column(String, nullable=True)
@@ -42,26 +55,62 @@ class Lead(Base, TimestampMixin):
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
 
     # 🔗 Relationships
-    company = relationship("CompanyProfile", back_populates="leads", lazy="joined")
+    company = relationship("CompanyProfile", back_populates="leads")
 
+    # passive_deletes: children go with the FK ON DELETE CASCADE instead of
+    # being SELECTed and deleted row by row when a lead is deleted
     quotations = relationship(
         "Quotation",
         back_populates="lead",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     orders = relationship(
         "Order",
         back_populates="lead",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     tasks = relationship(
         "Task",
         back_populates="lead",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     # ✅ Injected fix
     activities = relationship(
         "Activity",
         back_populates="lead",
-        cascade="all, delete-orphan"
-    )
\ No newline at end of file
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+
+# Keyset pagination for GET /leads walks (created_at DESC, id DESC) per tenant
+Index("ix_leads_company_created_id", Lead.company_id, Lead.created_at.desc(), Lead.id.desc())
+
+# Duplicate checks are per-tenant equality probes on the normalised identity
+Index(
+    "ix_leads_company_email_norm", Lead.company_id, Lead.email_normalized,
+    postgresql_where=Lead.email_normalized.isnot(None),
+)
+Index(
+    "ix_leads_company_phone_norm", Lead.company_id, Lead.phone_normalized,
+    postgresql_where=Lead.phone_normalized.isnot(None),
+)
+
+# Fuzzy-duplicate blocking: candidates share a pincode or a name key
+Index("ix_leads_company_pincode", Lead.company_id, Lead.pincode)
+Index("ix_leads_company_name_key", Lead.company_id, Lead.name_key)
+
+# Nearby leads: cells around a point, then a lat/lng range
+Index("ix_leads_company_geo_cell", Lead.company_id, Lead.geo_cell)
+
+
+@event.listens_for(Lead, "before_insert")
+@event.listens_for(Lead, "before_update")
+def _normalize_identity(mapper, connection, target):
+    target.email_normalized = normalize_email(target.email)
+    target.phone_normalized = normalize_phone(target.phone)
+    target.name_key = name_key(target.business_name, target.city)
+    target.geo_cell = geo_cell(target.lat, target.lng)
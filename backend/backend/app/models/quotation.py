@@ -15,7 +15,7 @@ class Quotation(Base, TimestampMixin):
     __tablename__ = "quotations"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    lead_id = Column(UUID(as_uuid=True), ForeignKey("leads.id", ondelete="CASCADE"), nullable=False)
+    lead_id = Column(UUID(as_uuid=True), ForeignKey("leads.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # Core quotation details
     item_name = Column(String, nullable=False)
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+from app.db.base_class import Base
+
+
+class RefreshToken(Base):
+    """
+    Rotating refresh token. Only a SHA-256 of the opaque token is stored:
+    the token is 256 random bits, so a fast hash is enough and renewal is a
+    single unique-index probe (no bcrypt).
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # All tokens rotated from one login share a family; reuse of a rotated
+    # token revokes the whole family.
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    replaced_by = Column(UUID(as_uuid=True), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<RefreshToken(id='{self.id}', user_id='{self.user_id}')>"
@@ -25,7 +25,7 @@ class Task(Base, TimestampMixin):
     __tablename__ = "tasks"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    lead_id = Column(UUID(as_uuid=True), ForeignKey("leads.id", ondelete="CASCADE"), nullable=False)
+    lead_id = Column(UUID(as_uuid=True), ForeignKey("leads.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # 🔐 Company scoping (align with CompanyProfile table everywhere)
     company_id = Column(UUID(as_uuid=True), ForeignKey("company_profile.id", ondelete="CASCADE"), nullable=False)
@@ -51,8 +51,8 @@ class Task(Base, TimestampMixin):
     lng = Column(Float, nullable=True)
     distance_km = Column(Float, nullable=True)
 
-    # Relationships
-    lead = relationship("Lead", back_populates="tasks", lazy="joined")
-    assigned_user = relationship("User", foreign_keys=[assigned_to], lazy="joined")
-    creator_user = relationship("User", foreign_keys=[created_by], lazy="joined")
-    company = relationship("CompanyProfile", lazy="joined")
+    # Relationships (lazy; routers pick eager loads via app.db.loaders profiles)
+    lead = relationship("Lead", back_populates="tasks")
+    assigned_user = relationship("User", foreign_keys=[assigned_to])
+    creator_user = relationship("User", foreign_keys=[created_by])
+    company = relationship("CompanyProfile")
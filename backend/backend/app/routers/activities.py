@@ -1,19 +1,52 @@
+import json
+import re
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from sqlalchemy import cast, or_, select
+from sqlalchemy.dialects.postgresql import JSONPATH
 from typing import List, Optional
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from app.db.loaders import loader_profile
 from app.db.session import get_db
 from app.models.activities import Activity
 from app.models.leads import Lead
 from app.models.user import User
-from app.schemas.activities import ActivityCreate, ActivityUpdate, ActivityOut, ActivityVerify
-from app.routers.auth import get_current_user
+from app.schemas.activities import ActivityBatchCreate, ActivityCreate, ActivityUpdate, ActivityOut, ActivityVerify
+from app.routers.auth import get_current_principal
+from app.services.activity_batch import MAX_BATCH, call_duration_from_meta, ingest_activities
+from app.services.activity_chain import DEFAULT_DEPTH, MAX_DEPTH, load_chain
+from app.services.activity_counters import read_overview
+from app.services.activity_rollup import GROUP_FIELDS, rollup_series
+from app.services import activity_rules  # noqa: F401  (completion -> rule outbox events)
+from app.services.list_views import activity_list_select, activity_rows
+from app.utils.pagination import count_estimate, keyset_select
+from app.utils.serializers import FastJSONResponse
 
 router = APIRouter(prefix="/activities", tags=["Activities"])
 
 
+_META_KEY = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,63}$")
+
+
+def _meta_conditions(meta_contains: Optional[str], meta_has: Optional[str]) -> list:
+    """meta @> :json / meta @? '$.key' — both served by ix_activities_meta_path_ops."""
+    conds = []
+    if meta_contains:
+        try:
+            wanted = json.loads(meta_contains)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="meta_contains must be a JSON object")
+        if not isinstance(wanted, dict):
+            raise HTTPException(status_code=400, detail="meta_contains must be a JSON object")
+        conds.append(Activity.meta.contains(wanted))
+    for key in [k.strip() for k in (meta_has or "").split(",") if k.strip()]:
+        if not _META_KEY.match(key):
+            raise HTTPException(status_code=400, detail=f"Invalid meta key: {key}")
+        conds.append(Activity.meta.path_exists(cast(f"$.{key}", JSONPATH)))
+    return conds
+
+
 def _must_own_or_admin(current_user: User, activity: Activity):
     if current_user.role == "admin":
         return
@@ -28,27 +61,19 @@ def _must_own_or_admin(current_user: User, activity: Activity):
 def create_activity(
     payload: ActivityCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_principal)
 ):
     if not payload.lead_id or not payload.type:
         raise HTTPException(status_code=400, detail="lead_id and type are required")
 
-    lead = db.query(Lead).filter(
+    lead = db.query(Lead).options(*loader_profile(Lead, "bare")).filter(
         Lead.id == payload.lead_id, Lead.company_id == current_user.company_id
     ).first()
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found or not yours")
 
     now = datetime.utcnow()
-    call_duration = None
-    if (payload.type or "").lower() == "call" and payload.meta:
-        start, end = payload.meta.get("call_start"), payload.meta.get("call_end")
-        if start and end:
-            try:
-                t1, t2 = datetime.fromisoformat(start), datetime.fromisoformat(end)
-                call_duration = int((t2 - t1).total_seconds())
-            except Exception:
-                pass
+    call_duration = call_duration_from_meta(payload.type, payload.meta)
 
     activity = Activity(
         **payload.dict(exclude_unset=True, exclude={"company_id", "created_by"}),
@@ -65,13 +90,31 @@ def create_activity(
     return activity
 
 
+@router.post("/batch")
+def create_activities_batch(
+    payload: ActivityBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_principal)
+):
+    """
+    Mobile sync: up to MAX_BATCH activities in one request. Items are keyed by
+    idempotency_key, so retrying a failed upload never inserts twice —
+    already-stored keys come back as "duplicate" with their original id.
+    """
+    if not payload.activities:
+        raise HTTPException(status_code=400, detail="No activities provided")
+    if len(payload.activities) > MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH} activities per batch")
+    return ingest_activities(db, current_user, payload.activities)
+
+
 # ---------------------------------------------------------------------------
-# LIST  (joined Lead + User)
+# LIST  (column select joined to Lead + assignee)
 # ---------------------------------------------------------------------------
 @router.get("", response_model=List[ActivityOut])
 def list_activities(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_principal),
     lead_id: Optional[UUID] = None,
     status: Optional[str] = None,
     type: Optional[str] = None,
@@ -81,52 +124,118 @@ def list_activities(
     date_to: Optional[datetime] = None,
     limit: int = Query(200, le=500),
     offset: int = 0,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    with_total: bool = Query(False, description="Send X-Total-Count (estimated for large results)"),
+    meta_contains: Optional[str] = Query(None, description='JSON object meta must contain, e.g. {"ai_next_step": "..."}'),
+    meta_has: Optional[str] = Query(None, description="Comma list of meta keys that must be present"),
+    sentiment: Optional[str] = Query(None, description="Positive | Neutral | Negative"),
 ):
-    q = (
-        db.query(Activity)
-        .options(joinedload(Activity.lead), joinedload(Activity.assigned_user))
-        .filter(Activity.company_id == current_user.company_id)
-    )
+    """
+    Newest first. Pages are keyset-based: pass the X-Next-Cursor header of one
+    page as ?cursor= for the next. ?offset= still works for old clients.
+    meta_contains / meta_has / sentiment filter in the database (GIN on meta,
+    generated ai_sentiment column).
+    """
+    conds = [Activity.company_id == current_user.company_id]
 
     if current_user.role != "admin":
-        q = q.filter(or_(Activity.assigned_to == current_user.id, Activity.created_by == current_user.id))
+        conds.append(or_(Activity.assigned_to == current_user.id, Activity.created_by == current_user.id))
     if lead_id:
-        q = q.filter(Activity.lead_id == lead_id)
+        conds.append(Activity.lead_id == lead_id)
     if status:
-        q = q.filter(Activity.status == status)
+        conds.append(Activity.status == status)
     if type:
-        q = q.filter(Activity.type == type)
+        conds.append(Activity.type == type)
     if verified is not None:
-        q = q.filter(Activity.verified_event == verified)
+        conds.append(Activity.verified_event == verified)
     if assigned_to:
         if current_user.role == "admin" or assigned_to == current_user.id:
-            q = q.filter(Activity.assigned_to == assigned_to)
+            conds.append(Activity.assigned_to == assigned_to)
     if date_from:
-        q = q.filter(Activity.created_at >= date_from)
+        conds.append(Activity.created_at >= date_from)
     if date_to:
-        q = q.filter(Activity.created_at <= date_to)
+        conds.append(Activity.created_at <= date_to)
+    if sentiment:
+        if sentiment == "Neutral":  # the insights default when nothing was written
+            conds.append(or_(Activity.ai_sentiment == sentiment, Activity.ai_sentiment.is_(None)))
+        else:
+            conds.append(Activity.ai_sentiment == sentiment)
+    conds.extend(_meta_conditions(meta_contains, meta_has))
+
+    stmt = activity_list_select().where(*conds)
+    if offset and not cursor:
+        rows = db.execute(
+            stmt.order_by(Activity.created_at.desc(), Activity.id.desc()).offset(offset).limit(limit)
+        ).all()
+        next_cursor = None
+    else:
+        rows, next_cursor = keyset_select(db, stmt, Activity.created_at, Activity.id, cursor, limit)
+
+    headers = {"X-Page-Limit": str(limit)}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if with_total:
+        total, estimated = count_estimate(db, select(Activity.id).where(*conds))
+        headers["X-Total-Count"] = str(total)
+        headers["X-Total-Count-Estimated"] = "true" if estimated else "false"
+
+    # --- column rows -> dicts with lead/assignee names + unified when (no per-row Pydantic) ---
+    return FastJSONResponse(activity_rows(rows), headers=headers)
+
+
+# ---------------------------------------------------------------------------
+# ROLLUP  (timelines / charts from activity_daily_rollup)
+# ---------------------------------------------------------------------------
+MAX_ROLLUP_DAYS = 366
+
+
+@router.get("/rollup")
+def activity_rollup(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_principal),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    bucket: str = Query("day", pattern="^(day|week|month)$"),
+    group_by: Optional[str] = Query(None, description="Comma list of type, status, user_id"),
+    user_id: Optional[UUID] = None,
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must be on or before date_to")
+    if (date_to - date_from).days >= MAX_ROLLUP_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_ROLLUP_DAYS} days")
+
+    groups = [g.strip() for g in (group_by or "").split(",") if g.strip()]
+    unknown = set(groups) - set(GROUP_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Cannot group by: {', '.join(sorted(unknown))}")
+
+    if current_user.role != "admin":
+        user_id = current_user.id
 
-    data = q.order_by(Activity.created_at.desc()).offset(offset).limit(limit).all()
-    # --- serialize with lead/assignee names + unified when ---
-    return [
-        {
-            **a.__dict__,
-            "lead_name": getattr(a.lead, "name", None),
-            "assigned_to_name": getattr(a.assigned_user, "full_name", None),
-            "when": a.due_date or getattr(a, "activity_date", None),
-        }
-        for a in data
-    ]
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "bucket": bucket,
+        "group_by": groups,
+        "series": rollup_series(
+            db, current_user.company_id, date_from, date_to,
+            bucket=bucket, group_by=groups, user_id=user_id, type=type, status=status,
+        ),
+    }
 
 
 # ---------------------------------------------------------------------------
 # GET / UPDATE / VERIFY / DELETE
 # ---------------------------------------------------------------------------
 @router.get("/{activity_id}", response_model=ActivityOut)
-def get_activity(activity_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_activity(activity_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
     act = (
         db.query(Activity)
-        .options(joinedload(Activity.lead), joinedload(Activity.assigned_user))
+        .options(*loader_profile(Activity, "detail"))
         .filter(Activity.id == activity_id, Activity.company_id == current_user.company_id)
         .first()
     )
@@ -140,9 +249,31 @@ def get_activity(activity_id: UUID, db: Session = Depends(get_db), current_user:
     }
 
 
+@router.get("/{activity_id}/chain")
+def get_activity_chain(
+    activity_id: UUID,
+    max_depth: int = Query(DEFAULT_DEPTH, ge=1, le=MAX_DEPTH),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_principal),
+):
+    """Ancestors and follow-ups of an activity (parent_activity_id links), one query."""
+    chain = load_chain(db, activity_id, current_user.company_id, max_depth)
+    if not chain:
+        raise HTTPException(404, "Activity not found")
+    root = chain["activity"]
+    if current_user.role != "admin" and current_user.id not in {root["created_by"], root["assigned_to"]}:
+        raise HTTPException(status_code=403, detail="Not allowed")
+    return FastJSONResponse(chain)
+
+
 @router.put("/{activity_id}", response_model=ActivityOut)
-def update_activity(activity_id: UUID, payload: ActivityUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    act = db.query(Activity).filter(Activity.id == activity_id, Activity.company_id == current_user.company_id).first()
+def update_activity(activity_id: UUID, payload: ActivityUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
+    act = (
+        db.query(Activity)
+        .options(*loader_profile(Activity, "bare"))
+        .filter(Activity.id == activity_id, Activity.company_id == current_user.company_id)
+        .first()
+    )
     if not act:
         raise HTTPException(404, "Activity not found")
     _must_own_or_admin(current_user, act)
@@ -161,8 +292,13 @@ def update_activity(activity_id: UUID, payload: ActivityUpdate, db: Session = De
 
 
 @router.post("/verify", response_model=ActivityOut)
-def verify_activity(payload: ActivityVerify, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    act = db.query(Activity).filter(Activity.id == payload.activity_id, Activity.company_id == current_user.company_id).first()
+def verify_activity(payload: ActivityVerify, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
+    act = (
+        db.query(Activity)
+        .options(*loader_profile(Activity, "bare"))
+        .filter(Activity.id == payload.activity_id, Activity.company_id == current_user.company_id)
+        .first()
+    )
     if not act:
         raise HTTPException(404, "Activity not found")
     _must_own_or_admin(current_user, act)
@@ -175,8 +311,13 @@ def verify_activity(payload: ActivityVerify, db: Session = Depends(get_db), curr
 
 
 @router.delete("/{activity_id}")
-def delete_activity(activity_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    act = db.query(Activity).filter(Activity.id == activity_id, Activity.company_id == current_user.company_id).first()
+def delete_activity(activity_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
+    act = (
+        db.query(Activity)
+        .options(*loader_profile(Activity, "bare"))
+        .filter(Activity.id == activity_id, Activity.company_id == current_user.company_id)
+        .first()
+    )
     if not act:
         raise HTTPException(404, "Activity not found")
     _must_own_or_admin(current_user, act)
@@ -186,16 +327,9 @@ def delete_activity(activity_id: UUID, db: Session = Depends(get_db), current_us
 
 
 # ---------------------------------------------------------------------------
-# SUMMARY  (unchanged)
+# SUMMARY  (counter row lookup; see services/activity_counters)
 # ---------------------------------------------------------------------------
 @router.get("/summary/overview")
-def summary_overview(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    q = db.query(Activity).filter(Activity.company_id == current_user.company_id)
-    if current_user.role != "admin":
-        q = q.filter(or_(Activity.assigned_to == current_user.id, Activity.created_by == current_user.id))
-
-    total = q.count()
-    verified = q.filter(Activity.verified_event == True).count()
-    pending = q.filter(Activity.status.in_(["Planned", "Pending", "Overdue"])).count()
-    completed = q.filter(Activity.status == "Completed").count()
-    return {"total": total, "verified": verified, "pending": pending, "completed": completed}
+def summary_overview(db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
+    user_id = None if current_user.role == "admin" else current_user.id
+    return read_overview(db, current_user.company_id, user_id)
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from uuid import UUID
+from app.db.session import get_db
+from app.models.activity_rule import ActivityRule
+from app.models.user import User
+from app.routers.auth import get_current_principal
+from app.schemas.activity_rules import ActivityRuleCreate, ActivityRuleOut, ActivityRuleUpdate
+from app.services.activity_logic import DEFAULT_RULES
+from app.services.activity_rules import invalidate
+
+router = APIRouter(prefix="/activity-rules", tags=["Activity Rules"])
+
+
+def _must_be_admin(current_user: User):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can manage rules")
+
+
+def _get_rule(db: Session, rule_id: UUID, company_id) -> ActivityRule:
+    rule = db.query(ActivityRule).filter(ActivityRule.id == rule_id, ActivityRule.company_id == company_id).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    return rule
+
+
+# ---------------------------------------------------------------------------
+# LIST (falls back to the built-in defaults until a company adds its own)
+# ---------------------------------------------------------------------------
+@router.get("")
+def list_rules(db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
+    rules = (
+        db.query(ActivityRule)
+        .filter(ActivityRule.company_id == current_user.company_id)
+        .order_by(ActivityRule.created_at.asc())
+        .all()
+    )
+    if not rules:
+        return {"source": "default", "rules": DEFAULT_RULES}
+    return {"source": "company", "rules": [ActivityRuleOut.model_validate(r) for r in rules]}
+
+
+# ---------------------------------------------------------------------------
+# CREATE / UPDATE / DELETE (admin)
+# ---------------------------------------------------------------------------
+@router.post("", response_model=ActivityRuleOut)
+def create_rule(payload: ActivityRuleCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
+    _must_be_admin(current_user)
+    rule = ActivityRule(**payload.dict(), company_id=current_user.company_id)
+    db.add(rule)
+    db.commit()
+    db.refresh(rule)
+    invalidate(current_user.company_id)
+    return rule
+
+
+@router.put("/{rule_id}", response_model=ActivityRuleOut)
+def update_rule(rule_id: UUID, payload: ActivityRuleUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
+    _must_be_admin(current_user)
+    rule = _get_rule(db, rule_id, current_user.company_id)
+    for k, v in payload.dict(exclude_unset=True).items():
+        setattr(rule, k, v)
+    db.commit()
+    db.refresh(rule)
+    invalidate(current_user.company_id)
+    return rule
+
+
+@router.delete("/{rule_id}")
+def delete_rule(rule_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
+    _must_be_admin(current_user)
+    db.delete(_get_rule(db, rule_id, current_user.company_id))
+    db.commit()
+    invalidate(current_user.company_id)
+    return {"ok": True}
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 
+from app.db.loaders import loader_profile
 from app.db.session import get_db
 from app.models.activities import Activity  # uses your existing model
 
@@ -15,6 +16,9 @@ except Exception:  # pragma: no cover
 
 router = APIRouter(prefix="/ai", tags=["AI Copilot"])
 
+# meta.ai_suggestion values that count as "no suggestion"
+_FALSY = ("", "false", "0", "[]", "{}")
+
 
 # ---------------------------
 # Helpers
@@ -88,71 +92,68 @@ def ai_insights_dashboard(
     """
     since = _now_utc() - timedelta(days=days)
 
-    # ---- Base query (activities) ----
-    q = db.query(Activity).filter(Activity.created_at >= since)
-
+    # ---- Filters (aggregated in the database; only capped lists load rows) ----
+    conds = [Activity.created_at >= since]
     if lead_id:
-        try:
-            q = q.filter(Activity.lead_id == lead_id)
-        except Exception:
-            pass
-
+        conds.append(Activity.lead_id == lead_id)
     if user_id:
-        try:
-            q = q.filter(
-                (Activity.created_by == user_id) | (Activity.assigned_to == user_id)
-            )
-        except Exception:
-            pass
+        conds.append((Activity.created_by == user_id) | (Activity.assigned_to == user_id))
 
-    activities: List[Activity] = q.order_by(Activity.created_at.desc()).all()
+    now = _now_utc()
+    sentiment_col = func.coalesce(Activity.ai_sentiment, "Neutral")
+    has_suggestion = func.coalesce(Activity.meta["ai_suggestion"].astext, "").notin_(_FALSY)
+    is_open = Activity.status.notin_(("Completed", "Cancelled"))
+    is_overdue = and_(is_open, Activity.due_date < now)
 
-    # ---- Counters ----
-    total = len(activities)
+    # ---- Counters: one GROUP BY (status, type, sentiment) ----
+    total = with_ai_suggestion = overdue_count = 0
     by_status: Dict[str, int] = {}
     by_type: Dict[str, int] = {}
     sentiment: Dict[str, int] = {"Positive": 0, "Neutral": 0, "Negative": 0}
-    with_ai_suggestion = 0
-
-    # For lists
-    pending_list: List[Dict[str, Any]] = []
-    overdue_list: List[Dict[str, Any]] = []
-    recent_ai_suggestions: List[Dict[str, Any]] = []
-
-    now = _now_utc()
-
-    for a in activities:
-        # status/type buckets
-        by_status[a.status] = by_status.get(a.status, 0) + 1
-        by_type[a.type] = by_type.get(a.type, 0) + 1
-
-        # sentiment buckets
-        s = _safe_sentiment(a)
-        if s not in sentiment:
-            sentiment[s] = 0
-        sentiment[s] += 1
-
-        # AI suggestion
-        if _has_ai_suggestion(a):
-            with_ai_suggestion += 1
-            recent_ai_suggestions.append(_fmt_activity(a))
-
-        # pending & overdue lists
-        if a.status not in ("Completed", "Cancelled"):
-            pending_list.append(_fmt_activity(a))
-            if getattr(a, "due_date", None) and a.due_date < now:
-                overdue_list.append(_fmt_activity(a))
+    for st, ty, se, n, n_ai, n_overdue in (
+        db.query(
+            Activity.status, Activity.type, sentiment_col,
+            func.count(), func.count().filter(has_suggestion), func.count().filter(is_overdue),
+        )
+        .filter(*conds)
+        .group_by(Activity.status, Activity.type, sentiment_col)
+    ):
+        total += n
+        with_ai_suggestion += n_ai
+        overdue_count += n_overdue
+        by_status[st] = by_status.get(st, 0) + n
+        by_type[ty] = by_type.get(ty, 0) + n
+        sentiment[se] = sentiment.get(se, 0) + n
+
+    # ---- Lists (capped for UI) ----
+    def _latest(cond, limit: int) -> List[Dict[str, Any]]:
+        rows = (
+            db.query(Activity)
+            .options(*loader_profile(Activity, "bare"))
+            .filter(*conds, cond)
+            .order_by(Activity.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+        return [_fmt_activity(a) for a in rows]
+
+    recent_ai_suggestions = _latest(has_suggestion, 20)
+    pending_list = _latest(is_open, 50)
+    overdue_list = _latest(is_overdue, 50)
 
     # ---- User performance (IDs only; you can join names in UI) ----
-    created_by_stats: Dict[str, int] = {}
-    assigned_to_stats: Dict[str, int] = {}
-    for a in activities:
-        if getattr(a, "created_by", None):
-            k = str(a.created_by)
-            created_by_stats[k] = created_by_stats.get(k, 0) + 1
-        if getattr(a, "assigned_to", None):
-            k = str(a.assigned_to)
-            assigned_to_stats[k] = assigned_to_stats.get(k, 0) + 1
+    created_by_stats: Dict[str, int] = {
+        str(k): n
+        for k, n in db.query(Activity.created_by, func.count())
+        .filter(*conds, Activity.created_by.isnot(None))
+        .group_by(Activity.created_by)
+    }
+    assigned_to_stats: Dict[str, int] = {
+        str(k): n
+        for k, n in db.query(Activity.assigned_to, func.count())
+        .filter(*conds, Activity.assigned_to.isnot(None))
+        .group_by(Activity.assigned_to)
+    }
 
     # ---- Tasks snapshot (if Task model exists) ----
     tasks_summary = None
@@ -199,15 +200,15 @@ def ai_insights_dashboard(
             "with_ai_suggestion": with_ai_suggestion,
             "pending": by_status.get("Pending", 0) + by_status.get("Open", 0),
             "completed": by_status.get("Completed", 0),
-            "overdue": len(overdue_list),
+            "overdue": overdue_count,
         },
         "by_status": by_status,
         "by_type": by_type,
         "sentiment": sentiment,  # Positive / Neutral / Negative
         "lists": {
-            "recent_ai_suggestions": recent_ai_suggestions[:20],  # cap for UI
-            "pending": pending_list[:50],
-            "overdue": overdue_list[:50],
+            "recent_ai_suggestions": recent_ai_suggestions,
+            "pending": pending_list,
+            "overdue": overdue_list,
         },
         "users": {
             "created_by": created_by_stats,
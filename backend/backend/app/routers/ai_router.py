@@ -1,6 +1,7 @@
 import os
 import httpx
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 from app.db.session import get_db
@@ -100,11 +101,9 @@ async def summarize_activity(activity_id: str, db: Session = Depends(get_db)):
     elif any(w in low for w in ["cancel", "delay", "angry", "problem", "lost", "not interested"]):
         sentiment = "Negative"
 
-    # --- 5️⃣ Save
-    act.ai_summary = summary
-    act.ai_sentiment = sentiment
-    act.meta = act.meta or {}
-    act.meta["ai_summary"] = summary
+    # --- 5️⃣ Save (new dict: in-place JSONB edits are not tracked;
+    #        ai_sentiment column is generated from meta)
+    act.meta = {**(act.meta or {}), "ai_summary": summary, "ai_sentiment": sentiment}
     db.commit()
 
     return {"summary": summary, "sentiment": sentiment}
@@ -170,8 +169,7 @@ async def suggest_next_step(activity_id: str, db: Session = Depends(get_db)):
         except Exception as e:
             print("⚠️ OpenRouter next-step fallback:", e)
 
-    act.meta = act.meta or {}
-    act.meta["ai_next_step"] = suggestion
+    act.meta = {**(act.meta or {}), "ai_next_step": suggestion}
     db.commit()
 
     return {"suggestion": suggestion}
@@ -189,9 +187,12 @@ async def get_ai_insights(days: int = 7, db: Session = Depends(get_db)):
         completed = db.query(Activity).filter(Activity.status == "Completed").count()
 
         sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
-        for act in db.query(Activity).all():
-            if hasattr(act, "ai_sentiment") and act.ai_sentiment in sentiment_counts:
-                sentiment_counts[act.ai_sentiment] += 1
+        for value, n in (
+            db.query(Activity.ai_sentiment, func.count())
+            .filter(Activity.ai_sentiment.in_(sentiment_counts))
+            .group_by(Activity.ai_sentiment)
+        ):
+            sentiment_counts[value] = n
 
         return {
             "total": total,
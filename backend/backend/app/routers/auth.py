@@ -1,19 +1,29 @@
+import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta
-from typing import Optional
-from uuid import UUID
+from typing import Optional, Tuple
+from uuid import UUID, uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordRequestForm
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 # Internal imports
 from app.core.config import settings
+from app.core.password_pool import password_pool
+from app.core.principal_cache import Principal, principal_cache
+from app.core.token_revocation import is_token_revoked, revoke_token, user_claims_not_before
 from app.db.session import get_db
 from app.models.user import User
 from app.models.company_profile import CompanyProfile
+from app.models.refresh_token import RefreshToken
+from app.schemas.user import RefreshTokenRequest
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -22,7 +32,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 http_bearer = HTTPBearer(auto_error=False)
 
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES  # renew via /auth/refresh
 
 
 def verify_password(plain: str, hashed: str) -> bool:
@@ -49,17 +59,52 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         else:
             to_encode[k] = v
 
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    # iat/jti let claims-only auth enforce a max age and per-token revocation
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid4().hex})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
 
 
+# ===================== Refresh tokens =====================
+def _hash_refresh_token(raw: str) -> str:
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def issue_refresh_token(db: Session, user_id: UUID, family_id: Optional[UUID] = None) -> Tuple[str, RefreshToken]:
+    """Add a new refresh token row (caller commits) and return (raw, row)."""
+    raw = secrets.token_urlsafe(32)
+    row = RefreshToken(
+        id=uuid4(),
+        user_id=user_id,
+        family_id=family_id or uuid4(),
+        token_hash=_hash_refresh_token(raw),
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    db.add(row)
+    return raw, row
+
+
+def _access_claims(user) -> dict:
+    return {
+        "sub": str(user.id),
+        "email": user.email,
+        "company_id": str(user.company_id),
+        "role": user.role,
+    }
+
+
+def _revoke_refresh_family(db: Session, family_id: UUID) -> None:
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
+
 # ===================== Dependencies =====================
-def get_current_user(
-    creds: Optional[HTTPAuthorizationCredentials] = Depends(http_bearer),
-    db: Session = Depends(get_db),
-) -> User:
-    """Extract current user from JWT"""
+def _decode_token(creds: Optional[HTTPAuthorizationCredentials]) -> Tuple[UUID, dict]:
+    """Verify the bearer JWT and return (user_id, payload)."""
     if creds is None or not creds.credentials:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
 
@@ -79,33 +124,68 @@ def get_current_user(
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
+    if is_token_revoked(payload.get("jti")):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    return user_id, payload
+
+
+def _load_principal(user_id: UUID, db: Session) -> Principal:
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
     user = db.query(User).filter(User.id == user_id).first()
     if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
-    return user
 
+    principal = Principal.from_user(user)
+    principal_cache.set(principal)
+    return principal
 
-# ===================== Routes =====================
 
-@router.post("/signup", summary="Register new company and admin user", name="auth_signup")
-def signup(payload: dict, db: Session = Depends(get_db)):
+def get_current_user(
+    creds: Optional[HTTPAuthorizationCredentials] = Depends(http_bearer),
+    db: Session = Depends(get_db),
+) -> Principal:
+    """Extract current user from JWT (cached slim record, DB on miss)"""
+    user_id, _ = _decode_token(creds)
+    return _load_principal(user_id, db)
+
+
+def get_current_principal(
+    creds: Optional[HTTPAuthorizationCredentials] = Depends(http_bearer),
+    db: Session = Depends(get_db),
+) -> Principal:
     """
-    Body Example:
-    {
-        "full_name": "Admin User",
-        "email": "owner@123.com",
-        "password": "admin123",
-        "company_name": "Uplift",
-        "theme_color": "#0048E8",      (optional)
-        "accent_color": "#FACC15",     (optional)
-        "footer_note": "Thank you!"    (optional)
-    }
+    Claims-only variant for routes that just need id/company_id/role.
+    Fresh tokens are trusted as signed; tokens older than
+    AUTH_CLAIMS_MAX_AGE_MINUTES, minted before the user last changed, or
+    missing claims fall back to get_current_user's lookup.
     """
-    # --- Check if email already exists ---
-    existing = db.query(User).filter(User.email == payload["email"]).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already registered")
+    user_id, payload = _decode_token(creds)
+
+    max_age = settings.AUTH_CLAIMS_MAX_AGE_MINUTES * 60
+    iat = payload.get("iat")
+    company_id = payload.get("company_id")
+    role = payload.get("role")
+    if max_age > 0 and iat and company_id and role:
+        age = time.time() - float(iat)
+        if 0 <= age <= max_age and float(iat) >= user_claims_not_before(user_id):
+            try:
+                return Principal(id=user_id, company_id=UUID(company_id), role=role, email=payload.get("email"))
+            except ValueError:
+                pass
+
+    return _load_principal(user_id, db)
+
+
+# ===================== Routes =====================
+
+def _user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
 
+
+def _create_company_and_admin(db: Session, payload: dict, hashed_password: str) -> dict:
     # --- Create company profile ---
     company = CompanyProfile(
         company_name=payload["company_name"],
@@ -123,7 +203,7 @@ def signup(payload: dict, db: Session = Depends(get_db)):
     user = User(
         email=payload["email"],
         full_name=payload["full_name"],
-        hashed_password=hash_password(payload["password"]),
+        hashed_password=hashed_password,
         role="admin",
         is_active=True,
         company_id=company.id,
@@ -154,11 +234,36 @@ def signup(payload: dict, db: Session = Depends(get_db)):
     }
 
 
+@router.post("/signup", summary="Register new company and admin user", name="auth_signup")
+async def signup(payload: dict, db: Session = Depends(get_db)):
+    """
+    Body Example:
+    {
+        "full_name": "Admin User",
+        "email": "owner@123.com",
+        "password": "admin123",
+        "company_name": "Uplift",
+        "theme_color": "#0048E8",      (optional)
+        "accent_color": "#FACC15",     (optional)
+        "footer_note": "Thank you!"    (optional)
+    }
+    """
+    # --- Check if email already exists ---
+    existing = await run_in_threadpool(_user_by_email, db, payload["email"])
+    if existing:
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    # --- bcrypt runs on the dedicated password pool (429 when saturated) ---
+    hashed = await password_pool.run(hash_password, payload["password"])
+
+    return await run_in_threadpool(_create_company_and_admin, db, payload, hashed)
+
+
 # ==========================================================
 #  ✅ Robust OAuth2 Login (Form-data compatible with Swagger)
 # ==========================================================
 @router.post("/login", summary="Login (Generate JWT)", name="auth_login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """
     Accepts form-data (Swagger-compatible):
     username=<email>
@@ -166,23 +271,69 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     """
 
     # 🔍 Find user by email (username field holds email)
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await run_in_threadpool(_user_by_email, db, form_data.username)
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # 🔐 bcrypt verify runs on the dedicated password pool, not the request threadpool
+    if not user or not await password_pool.run(verify_password, form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
 
-    # 🧾 Generate and return JWT (convert UUIDs to str)
-    token = create_access_token({
-        "sub": str(user.id),
-        "email": user.email,
-        "company_id": str(user.company_id),
-        "role": user.role
-    })
+    # 🧾 Generate and return JWT (convert UUIDs to str) + a rotating refresh token
+    token = create_access_token(_access_claims(user))
+    refresh_token = await run_in_threadpool(_new_session_refresh_token, db, user.id)
 
-    return {"access_token": token, "token_type": "bearer"}
+    return {"access_token": token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+def _new_session_refresh_token(db: Session, user_id: UUID) -> str:
+    raw, _ = issue_refresh_token(db, user_id)
+    db.commit()
+    return raw
+
+
+# ==========================================================
+#  🔁 Refresh (rotate refresh token, mint new access token)
+# ==========================================================
+@router.post("/refresh", summary="Exchange a refresh token for new tokens", name="auth_refresh")
+def refresh(payload: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """
+    One indexed lookup on the SHA-256 of the token, no bcrypt. The presented
+    token is revoked and replaced; presenting an already-rotated token again
+    revokes its whole family (stolen-token detection).
+    """
+    invalid = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    now = datetime.utcnow()
+
+    row = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash_refresh_token(payload.refresh_token)).first()
+    if not row or row.expires_at <= now:
+        raise invalid
+    if row.revoked_at is not None:
+        _revoke_refresh_family(db, row.family_id)
+        db.commit()
+        raise invalid
+
+    # Claim the token atomically so two concurrent refreshes can't both rotate it
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == row.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+    if claimed.rowcount != 1:
+        db.rollback()
+        raise invalid
+
+    principal = _load_principal(row.user_id, db)
+    raw, new_row = issue_refresh_token(db, row.user_id, family_id=row.family_id)
+    db.execute(update(RefreshToken).where(RefreshToken.id == row.id).values(replaced_by=new_row.id))
+    db.commit()
+
+    return {
+        "access_token": create_access_token(_access_claims(principal)),
+        "refresh_token": raw,
+        "token_type": "bearer",
+    }
 
 
 # ==========================================================
@@ -194,7 +345,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     name="auth_me",
     openapi_extra={"security": [{"BearerAuth": []}]},
 )
-def get_me(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_me(current_user: Principal = Depends(get_current_user), db: Session = Depends(get_db)):
     """Return user + company details of the logged-in user"""
     company = db.query(CompanyProfile).filter(CompanyProfile.id == current_user.company_id).first()
     return {
@@ -212,19 +363,46 @@ def get_me(current_user: User = Depends(get_current_user), db: Session = Depends
         },
     }
 
+# ==========================================================
+#  🚪 Logout (revokes this access token everywhere)
+# ==========================================================
+@router.post("/logout", summary="Revoke the current access token", name="auth_logout")
+def logout(
+    body: Optional[RefreshTokenRequest] = None,
+    creds: Optional[HTTPAuthorizationCredentials] = Depends(http_bearer),
+    db: Session = Depends(get_db),
+):
+    user_id, payload = _decode_token(creds)
+    revoke_token(payload.get("jti"), payload.get("exp"))
+
+    # Optionally end the refresh-token session as well
+    if body and body.refresh_token:
+        row = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash_refresh_token(body.refresh_token)).first()
+        if row and row.user_id == user_id:
+            _revoke_refresh_family(db, row.family_id)
+            db.commit()
+    return {"message": "Logged out"}
+
+
+# ==========================================================
+#  📈 Auth metrics (admin only)
+# ==========================================================
+@router.get("/metrics", summary="Auth cache metrics", name="auth_metrics")
+def auth_metrics(current_user: Principal = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admins only")
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_pool": password_pool.stats(),
+    }
+
+
 # ==========================================================
 #  🌐 GOOGLE OAUTH LOGIN (LIVE READY FOR RENDER) — FIXED
 # ==========================================================
 from os import getenv
 from google_auth_oauthlib.flow import Flow
-import pathlib, json, base64, secrets
-from sqlalchemy.orm import Session
-from fastapi import Depends, Request
-from fastapi.responses import RedirectResponse
-
-from app.db.session import get_db
-from app.models.user import User
-from app.models.company_profile import CompanyProfile
+import pathlib, json, base64
 
 GOOGLE_CLIENT_ID = getenv("GOOGLE_OAUTH_CLIENT_ID") or getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = getenv("GOOGLE_OAUTH_CLIENT_SECRET") or getenv("GOOGLE_CLIENT_SECRET")
@@ -345,8 +523,11 @@ def google_callback(request: Request, db: Session = Depends(get_db)):
         db.refresh(user)
 
     # Mint JWT and bounce to frontend with token + email
-    token = create_access_token({"sub": str(user.id), "email": user.email, "company_id": str(user.company_id)})
+    token = create_access_token(_access_claims(user))
+    refresh_token, _ = issue_refresh_token(db, user.id)
+    db.commit()
 
-    # Send as query params so your LoginScreen.jsx can persist them
-    redirect_with_token = f"{next_url}?access_token={token}&email={email}"
+    # Short-lived access token as a query param (LoginScreen.jsx persists it); the
+    # refresh token goes in the fragment, which never reaches servers, logs or Referer
+    redirect_with_token = f"{next_url}?access_token={token}&email={email}#refresh_token={refresh_token}"
     return RedirectResponse(redirect_with_token, status_code=302)
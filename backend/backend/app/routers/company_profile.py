@@ -67,6 +67,15 @@ def update_company_profile(
         if key in allowed_fields and value not in [None, ""]:
             setattr(company, key, value)
 
+    # Activity retention (months before archival) — admins only
+    if "activity_retention_months" in data:
+        if current_user.role != "admin":
+            raise HTTPException(status_code=403, detail="Only admins can change retention")
+        months = data["activity_retention_months"]
+        if months is not None and (not isinstance(months, int) or not 1 <= months <= 120):
+            raise HTTPException(status_code=400, detail="activity_retention_months must be 1-120 (or null)")
+        company.activity_retention_months = months
+
     company.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(company)
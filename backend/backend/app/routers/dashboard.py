@@ -1,12 +1,18 @@
 from datetime import datetime, timedelta, time
-from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from app.core import dashboard_cache
+from app.core.config import settings
 from app.db.session import get_db
 from app.models.leads import Lead
 from app.models.tasks import Task
 from app.models.user import User
 from app.routers.auth import get_current_user
-from app.utils.geo import calc_distance
+from app.utils.etag import etag_matches, make_etag
+from app.utils.geo import bounding_box, cells_in_bbox, tile_center, tile_margin_km, within_radius
+from app.utils.serializers import dumps
 
 router = APIRouter(
     prefix="/dashboard",
@@ -14,41 +20,132 @@ router = APIRouter(
     dependencies=[Depends(get_current_user)]
 )
 
-@router.get("/myday")
-def my_day_dashboard(db: Session = Depends(get_db), current_user: User = Depends(get_current_user),
-                     lat: float | None = Query(default=None), lng: float | None = Query(default=None), radius_km: float = 10):
+
+def _nearby_candidates(db: Session, company_id, lat: float, lng: float, radius_km: float):
+    """
+    Leads within radius_km with open-task counts, unsorted. Reads only the
+    geo_cell buckets around the point (ix_leads_company_geo_cell) plus a
+    bounding-box check, so the cost follows the leads nearby, not the tenant.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    q = select(Lead.id, Lead.business_name, Lead.city, Lead.lat, Lead.lng).where(
+        Lead.company_id == company_id, Lead.lat.between(min_lat, max_lat)
+    )
+    if -180.0 <= min_lng and max_lng <= 180.0:
+        q = q.where(Lead.lng.between(min_lng, max_lng))
+    cells = cells_in_bbox(min_lat, max_lat, min_lng, max_lng)
+    if cells is not None:
+        q = q.where(Lead.geo_cell.in_(cells))
+    else:
+        q = q.where(Lead.lng.isnot(None))
+    candidates = db.execute(q).all()
+    if not candidates:
+        return []
+
+    idx, _dists = within_radius(lat, lng, [c.lat for c in candidates], [c.lng for c in candidates], radius_km)
+    survivors = [candidates[i] for i in idx.tolist()]
+    open_counts = dict(db.execute(
+        select(Task.lead_id, func.count())
+        .where(Task.company_id == company_id, Task.lead_id.in_([c.id for c in survivors]), Task.status != "Done")
+        .group_by(Task.lead_id)
+    ).all()) if survivors else {}
+    return [
+        {"lead_id": c.id, "lead_name": c.business_name, "city": c.city, "lat": c.lat, "lng": c.lng,
+         "open_tasks_count": open_counts.get(c.id, 0)}
+        for c in survivors
+    ]
+
+
+def _nearby_leads(db: Session, company_id, version: str, lat: float, lng: float, radius_km: float):
+    """
+    Nearest first. Candidates are cached per geo tile (radius widened by the
+    tile's half-diagonal, so every point of the tile is covered); distances
+    are then computed from the exact position.
+    """
+    tile_deg = settings.DASHBOARD_GEO_TILE_DEG
+    tile_lat, tile_lng = tile_center(lat, lng, tile_deg)
+    key = f"{company_id}:{version}:{tile_lat}:{tile_lng}:{radius_km}"
+    candidates = dashboard_cache.geo_cache.get(key)
+    if candidates is None:
+        candidates = dashboard_cache.geo_cache.set(
+            key, _nearby_candidates(db, company_id, tile_lat, tile_lng, radius_km + tile_margin_km(tile_deg))
+        )
+
+    idx, dists = within_radius(lat, lng, [c["lat"] for c in candidates], [c["lng"] for c in candidates], radius_km)
+    nearby = []
+    for i, dist in zip(idx.tolist(), dists.tolist()):
+        c = candidates[i]
+        nearby.append({"lead_id": c["lead_id"], "lead_name": c["lead_name"], "city": c["city"],
+                       "distance_km": round(dist, 2), "open_tasks_count": c["open_tasks_count"]})
+    return nearby
+
+
+def _my_day(db: Session, company_id):
+    """Everything on /myday except the nearby leads."""
     today = datetime.utcnow().date()
     start_today, end_today = datetime.combine(today, time.min), datetime.combine(today, time.max)
     yesterday = today - timedelta(days=1)
     start_yesterday, end_yesterday = datetime.combine(yesterday, time.min), datetime.combine(yesterday, time.max)
 
-    new_leads = db.query(Lead).filter(Lead.company_id == current_user.company_id, Lead.created_at >= start_today, Lead.created_at <= end_today).count()
-    tasks_today_q = db.query(Task).filter(Task.company_id == current_user.company_id, Task.due_date >= start_today, Task.due_date <= end_today)
+    new_leads = db.query(Lead).filter(Lead.company_id == company_id, Lead.created_at >= start_today, Lead.created_at <= end_today).count()
+    tasks_today_q = db.query(Task).filter(Task.company_id == company_id, Task.due_date >= start_today, Task.due_date <= end_today)
     tasks_today = tasks_today_q.all()
     completed = sum(1 for t in tasks_today if str(t.status) == "Done")
     pending = len(tasks_today) - completed
-    yesterday_count = db.query(Task).filter(Task.company_id == current_user.company_id, Task.due_date >= start_yesterday, Task.due_date <= end_yesterday).count()
+    yesterday_count = db.query(Task).filter(Task.company_id == company_id, Task.due_date >= start_yesterday, Task.due_date <= end_yesterday).count()
     change = 0.0 if not yesterday_count else round((len(tasks_today) - yesterday_count) / yesterday_count * 100.0, 1)
 
     now, soon = datetime.utcnow(), datetime.utcnow() + timedelta(hours=24)
-    reminders = db.query(Task).filter(Task.company_id == current_user.company_id, Task.due_date >= now, Task.due_date <= soon, Task.status != "Done").all()
+    reminders = db.query(Task).filter(Task.company_id == company_id, Task.due_date >= now, Task.due_date <= soon, Task.status != "Done").all()
     reminders_payload = [{"task_id": t.id, "title": t.title, "lead_id": t.lead_id,
                           "due_in_hours": round((t.due_date - now).total_seconds()/3600, 1) if t.due_date else None,
                           "priority": str(t.priority)} for t in reminders]
 
-    nearby = []
-    if lat is not None and lng is not None:
-        leads_geo = db.query(Lead).filter(Lead.company_id == current_user.company_id, Lead.lat.isnot(None), Lead.lng.isnot(None)).all()
-        for lead in leads_geo:
-            dist = calc_distance(lat, lng, lead.lat, lead.lng)
-            if dist is not None and dist <= radius_km:
-                count = db.query(Task).filter(Task.company_id == current_user.company_id, Task.lead_id == lead.id, Task.status != "Done").count()
-                nearby.append({"lead_id": lead.id, "lead_name": lead.name, "city": lead.city, "distance_km": dist, "open_tasks_count": count})
-        nearby.sort(key=lambda x: x["distance_km"])
-
     return {
         "summary": {"new_leads_today": new_leads, "tasks_today": len(tasks_today), "tasks_completed": completed,
-                    "tasks_pending": pending, "reminders_due": len(reminders), "nearby_leads": len(nearby)},
+                    "tasks_pending": pending, "reminders_due": len(reminders)},
         "performance": {"task_change_percent_vs_yesterday": change},
-        "reminders": reminders_payload, "nearby_leads": nearby
+        "reminders": reminders_payload,
     }
+
+
+@router.get("/myday")
+def my_day_dashboard(db: Session = Depends(get_db), current_user: User = Depends(get_current_user),
+                     lat: float | None = Query(default=None), lng: float | None = Query(default=None), radius_km: float = 10,
+                     if_none_match: Optional[str] = Header(None)):
+    """
+    Cached per (user, day) and per geo tile under the company's version
+    stamp, which lead / task / activity writes bump. Send the returned ETag
+    back as If-None-Match to get a bodyless 304 when nothing changed.
+    """
+    company_id = current_user.company_id
+    version = dashboard_cache.company_version(company_id)
+
+    key = f"{current_user.id}:{datetime.utcnow().date().isoformat()}:{version}"
+    day = dashboard_cache.myday_cache.get(key)
+    if day is None:
+        day = dashboard_cache.myday_cache.set(key, _my_day(db, company_id))
+
+    nearby = _nearby_leads(db, company_id, version, lat, lng, radius_km) if lat is not None and lng is not None else []
+
+    body = dumps({
+        "summary": {**day["summary"], "nearby_leads": len(nearby)},
+        "performance": day["performance"],
+        "reminders": day["reminders"], "nearby_leads": nearby
+    })
+    etag = make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        dashboard_cache.count_not_modified()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# ==========================================================
+#  📈 Dashboard cache metrics (admin only)
+# ==========================================================
+@router.get("/metrics", summary="Dashboard cache metrics", name="dashboard_metrics")
+def dashboard_metrics(current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admins only")
+    return dashboard_cache.stats()
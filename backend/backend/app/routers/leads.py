@@ -1,42 +1,253 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, status, Query, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy import or_, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from typing import List
-from app.db.session import get_db
+from uuid import UUID
+from app.db.loaders import loader_profile
+from app.db.session import SessionLocal, get_db
 from app.models.leads import Lead
-from app.schemas.leads import LeadCreate, LeadUpdate, LeadOut
+from app.models.lead_duplicate import LeadDuplicateCandidate
+from app.schemas.leads import (
+    LeadCreate, LeadUpdate, LeadOut, LeadPage, DuplicateCheckBatch, LeadMergeRequest, LeadMergeBulk, LeadBulkDelete,
+)
 from app.models.user import User
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_principal
 from typing import Optional
+from app.services.lead_dedupe import find_candidates_for_lead, run_duplicate_scan_job
+from app.services.lead_import import import_leads, parse_records
+from app.services.activity_counters import remove_for_leads
+from app.services.activity_rollup import remove_for_leads as remove_rollup_for_leads
+from app.services.lead_360 import load_lead_full
+from app.services.lead_bulk import bulk_archive_leads, bulk_delete_leads, lead_filters
+from app.services.lead_merge import MergeError, merge_leads
+from app.utils.contact import normalize_email, normalize_phone
+from app.utils.etag import etag_matches, make_etag
+from app.utils.pagination import keyset_page
+
+log = logging.getLogger("uvicorn")
 router = APIRouter(prefix="/leads", tags=["Leads"])
 
+# Default keeps existing "fetch everything" clients working for typical tenants
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 5000
+
 
 # ==========================================================
 # ✅ CHECK DUPLICATE (must be before /{lead_id})
 # ==========================================================
 
+MAX_DUPLICATE_BATCH = 1000
+
+
+def _find_existing(db: Session, company_id, email_n: Optional[str], phone_n: Optional[str]):
+    """Single index probe on the normalised identity; returns the lead id or None."""
+    conds = []
+    if email_n:
+        conds.append(Lead.email_normalized == email_n)
+    if phone_n:
+        conds.append(Lead.phone_normalized == phone_n)
+    if not conds:
+        return None
+    return db.execute(
+        select(Lead.id).where(Lead.company_id == company_id, or_(*conds)).limit(1)
+    ).scalar()
+
+
 @router.get("/check-duplicate")
 def check_duplicate(
     email: Optional[str] = Query(None),
     phone: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_principal),
 ):
     """
-    Checks if a lead with the given email or phone already exists.
+    Checks if a lead with the given email or phone already exists in your company.
     Example: /leads/check-duplicate?email=test@gmail.com
     or /leads/check-duplicate?phone=9876543210
     """
     if not email and not phone:
         raise HTTPException(status_code=400, detail="Please provide email or phone")
 
-    query = db.query(Lead)
-    if email:
-        exists = query.filter(Lead.email == email).first()
-    elif phone:
-        exists = query.filter(Lead.phone == phone).first()
+    lead_id = _find_existing(
+        db,
+        current_user.company_id,
+        normalize_email(email) if email else None,
+        normalize_phone(phone) if phone and not email else None,
+    )
+    return {"exists": lead_id is not None, "lead_id": lead_id}
+
+
+@router.post("/check-duplicate/batch")
+def check_duplicate_batch(
+    payload: DuplicateCheckBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_principal),
+):
+    """
+    Many emails/phones in one call: {"emails": [...], "phones": [...]}.
+    Returns {"emails": {input: lead_id | null}, "phones": {...}}.
+    """
+    if len(payload.emails) + len(payload.phones) > MAX_DUPLICATE_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_DUPLICATE_BATCH} values per call")
+
+    emails = {raw: normalize_email(raw) for raw in payload.emails}
+    phones = {raw: normalize_phone(raw) for raw in payload.phones}
+    email_set = {v for v in emails.values() if v}
+    phone_set = {v for v in phones.values() if v}
+
+    by_email, by_phone = {}, {}
+    if email_set:
+        by_email = dict(db.execute(
+            select(Lead.email_normalized, Lead.id)
+            .where(Lead.company_id == current_user.company_id, Lead.email_normalized.in_(email_set))
+        ).all())
+    if phone_set:
+        by_phone = dict(db.execute(
+            select(Lead.phone_normalized, Lead.id)
+            .where(Lead.company_id == current_user.company_id, Lead.phone_normalized.in_(phone_set))
+        ).all())
+
+    return {
+        "emails": {raw: by_email.get(n) for raw, n in emails.items()},
+        "phones": {raw: by_phone.get(n) for raw, n in phones.items()},
+    }
+
+
+# ==========================================================
+# 🔍 FUZZY DUPLICATES (scan, review, dismiss)
+# ==========================================================
+@router.post("/duplicates/scan", status_code=status.HTTP_202_ACCEPTED)
+def scan_duplicates(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_principal),
+):
+    """Queue a full fuzzy-duplicate scan of your company's leads."""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admins only")
+    background_tasks.add_task(run_duplicate_scan_job, current_user.company_id)
+    return {"status": "queued"}
+
+
+@router.get("/duplicates")
+def list_duplicates(
+    status_filter: str = Query("open", alias="status", pattern="^(open|dismissed)$"),
+    min_score: float = Query(0.0, ge=0.0, le=1.0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_principal),
+):
+    """Candidate pairs written by the scan / on-create check, best first."""
+    a = Lead.__table__.alias("a")
+    b = Lead.__table__.alias("b")
+    rows = db.execute(
+        select(
+            LeadDuplicateCandidate.id,
+            LeadDuplicateCandidate.lead_id,
+            a.c.business_name.label("lead_name"),
+            LeadDuplicateCandidate.duplicate_lead_id,
+            b.c.business_name.label("duplicate_name"),
+            LeadDuplicateCandidate.score,
+            LeadDuplicateCandidate.block_key,
+            LeadDuplicateCandidate.status,
+        )
+        .join(a, a.c.id == LeadDuplicateCandidate.lead_id)
+        .join(b, b.c.id == LeadDuplicateCandidate.duplicate_lead_id)
+        .where(
+            LeadDuplicateCandidate.company_id == current_user.company_id,
+            LeadDuplicateCandidate.status == status_filter,
+            LeadDuplicateCandidate.score >= min_score,
+        )
+        .order_by(LeadDuplicateCandidate.score.desc())
+        .limit(limit)
+    ).mappings().all()
+    return [dict(r) for r in rows]
+
+
+@router.post("/duplicates/{candidate_id}/dismiss")
+def dismiss_duplicate(
+    candidate_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_principal),
+):
+    """Mark a pair as "not a duplicate" so later scans leave it alone."""
+    candidate = db.query(LeadDuplicateCandidate).filter(
+        LeadDuplicateCandidate.id == candidate_id,
+        LeadDuplicateCandidate.company_id == current_user.company_id,
+    ).first()
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Duplicate candidate not found")
+    candidate.status = "dismissed"
+    db.commit()
+    return {"id": candidate.id, "status": candidate.status}
+
+# ==========================================================
+# 🔀 MERGE LEADS (re-parents children in bulk, deletes losers)
+# ==========================================================
+def _merge(db: Session, current_user: User, merges):
+    try:
+        return merge_leads(db, current_user.company_id, merges)
+    except MergeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/merge")
+def merge_lead(
+    payload: LeadMergeRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_principal),
+):
+    """Move activities, tasks, quotations and orders from loser_ids onto survivor_id."""
+    return _merge(db, current_user, [(payload.survivor_id, payload.loser_ids)])
+
+
+@router.post("/merge/bulk")
+def merge_leads_bulk(
+    payload: LeadMergeBulk,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_principal),
+):
+    """Many survivor/loser groups in one transaction."""
+    return _merge(db, current_user, [(m.survivor_id, m.loser_ids) for m in payload.merges])
+
+
+# ==========================================================
+# 🧹 BULK DELETE / ARCHIVE (ids or filter, admin only)
+# ==========================================================
+@router.post("/bulk-delete")
+def bulk_delete(
+    payload: LeadBulkDelete,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_principal),
+):
+    """
+    {"ids": [...]} or {"filter": {"lead_source": "Import", "date_from": ...}},
+    with "mode": "delete" (children removed by the DB cascade) or "archive"
+    (is_active = false).
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admins only")
+
+    conds = []
+    if payload.ids:
+        conds.append(Lead.id.in_(payload.ids))
+    if payload.filter:
+        conds.extend(lead_filters(**payload.filter.dict()))
+    if not conds:
+        raise HTTPException(status_code=400, detail="Provide ids or at least one filter")
+
+    if payload.mode == "archive":
+        affected = bulk_archive_leads(db, current_user.company_id, conds)
     else:
-        exists = None
+        affected = bulk_delete_leads(db, current_user.company_id, conds)
+    return {"mode": payload.mode, "affected": affected}
 
-    return {"exists": bool(exists)}
 
 # ==========================================================
 # ✅ CREATE LEAD (Now includes duplicate detection)
@@ -45,16 +256,11 @@ def check_duplicate(
 def create_lead(
     lead: LeadCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_principal),
 ):
-    # ✅ Prevent duplicate leads (by phone or email)
-    existing_lead = (
-        db.query(Lead)
-        .filter(
-            Lead.company_id == current_user.company_id,
-            ((Lead.phone == lead.phone) | (Lead.email == lead.email))
-        )
-        .first()
+    # ✅ Prevent duplicate leads (by normalised phone or email)
+    existing_lead = _find_existing(
+        db, current_user.company_id, normalize_email(lead.email), normalize_phone(lead.phone)
     )
     if existing_lead:
         raise HTTPException(
@@ -86,26 +292,161 @@ def create_lead(
     db.add(new_lead)
     db.commit()
     db.refresh(new_lead)
+
+    # 🔍 Fuzzy match against leads sharing a pincode / name key
+    try:
+        new_lead.possible_duplicates = find_candidates_for_lead(db, new_lead)
+    except SQLAlchemyError:
+        db.rollback()
+        log.warning("Duplicate check failed for lead %s", new_lead.id, exc_info=True)
     return new_lead
 
 
 # ==========================================================
-# ✅ GET ALL LEADS
+# ✅ BULK IMPORT (CSV / JSON file)
+# ==========================================================
+@router.post("/import")
+def import_leads_file(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_principal),
+):
+    """
+    Upload a CSV (header row) or JSON/NDJSON file of leads. Rows are
+    validated, de-duplicated by normalised phone/email (within the file and
+    against existing leads) and inserted in chunks. Returns a per-row
+    accepted/rejected report.
+    """
+    try:
+        records = parse_records(file.file.read(), file.filename)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read file: {e}")
+
+    return import_leads(db, records, current_user.company_id, current_user.id)
+
+
+# ==========================================================
+# ✅ GET ALL LEADS (keyset paginated)
 # ==========================================================
-@router.get("/", response_model=List[LeadOut])
+def _leads_page(db: Session, current_user: User, limit: int, cursor: Optional[str]):
+    q = db.query(Lead).options(*loader_profile(Lead, "list")).filter(Lead.company_id == current_user.company_id)
+    return keyset_page(q, Lead.created_at, Lead.id, cursor, limit)
+
+
+# The "list" loader profile does not read the collections
+LIST_EXCLUDE = {"activities", "tasks"}
+
+
+@router.get("/", response_model=List[LeadOut], response_model_exclude={"__all__": LIST_EXCLUDE})
 def get_all_leads(
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_principal),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
 ):
-    leads = (
-        db.query(Lead)
-        .filter(Lead.company_id == current_user.company_id)
-        .order_by(Lead.created_at.desc())
-        .all()
-    )
+    """
+    Newest first. Returns a plain list (backward compatible); when more rows
+    exist the cursor for the next page is sent in the X-Next-Cursor header.
+    """
+    leads, next_cursor = _leads_page(db, current_user, limit, cursor)
+    response.headers["X-Page-Limit"] = str(limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return leads
 
 
+@router.get("/page", response_model=LeadPage, response_model_exclude={"items": {"__all__": LIST_EXCLUDE}})
+def get_leads_page(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_principal),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+):
+    """Same listing as GET /leads, wrapped as {items, limit, next_cursor}."""
+    leads, next_cursor = _leads_page(db, current_user, limit, cursor)
+    return {"items": leads, "limit": limit, "next_cursor": next_cursor}
+
+
+# ==========================================================
+# ✅ STREAMING EXPORT (CSV / NDJSON, must be before /{lead_id})
+# ==========================================================
+EXPORT_COLUMNS = (
+    Lead.id, Lead.business_name, Lead.contact_person, Lead.email, Lead.phone,
+    Lead.country, Lead.state, Lead.city, Lead.pincode, Lead.stage,
+    Lead.lat, Lead.lng, Lead.lead_source, Lead.next_action, Lead.notes,
+    Lead.is_active, Lead.created_by, Lead.created_at, Lead.updated_at,
+)
+EXPORT_BATCH_SIZE = 2000
+
+
+def _export_value(v):
+    if v is None:
+        return None
+    if isinstance(v, datetime):
+        return v.isoformat()
+    if isinstance(v, (str, int, float, bool)):
+        return v
+    return str(v)  # UUIDs
+
+
+def _stream_export(stmt, fmt: str):
+    """
+    Own session: the request-scoped one may be closed before the body is
+    streamed. yield_per opens a server-side cursor and hands back plain row
+    tuples in fixed-size partitions, so memory stays flat.
+    """
+    names = [c.key for c in EXPORT_COLUMNS]
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(names)
+            for rows in result.partitions():
+                for row in rows:
+                    writer.writerow(["" if v is None else _export_value(v) for v in row])
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate(0)
+            if buf.tell():
+                yield buf.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps({k: _export_value(v) for k, v in zip(names, row)}, ensure_ascii=False) + "\n"
+                    for row in rows
+                )
+    finally:
+        db.close()
+
+
+@router.get("/export")
+def export_leads(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    stage: Optional[str] = Query(None),
+    source: Optional[str] = Query(None, description="lead_source"),
+    city: Optional[str] = Query(None),
+    date_from: Optional[datetime] = Query(None, description="created_at >="),
+    date_to: Optional[datetime] = Query(None, description="created_at <="),
+    current_user: User = Depends(get_current_principal),
+):
+    stmt = select(*EXPORT_COLUMNS).where(
+        Lead.company_id == current_user.company_id,
+        *lead_filters(stage=stage, lead_source=source, city=city, date_from=date_from, date_to=date_to),
+    )
+    stmt = stmt.order_by(Lead.created_at.desc(), Lead.id.desc())
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"leads_{datetime.utcnow():%Y%m%d_%H%M%S}.{format}"
+    return StreamingResponse(
+        _stream_export(stmt, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 # ==========================================================
 # ✅ GET LEAD BY ID
 # ==========================================================
@@ -113,10 +454,11 @@ def get_all_leads(
 def get_lead(
     lead_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_principal),
 ):
     lead = (
         db.query(Lead)
+        .options(*loader_profile(Lead, "detail"))
         .filter(Lead.id == lead_id, Lead.company_id == current_user.company_id)
         .first()
     )
@@ -125,6 +467,40 @@ def get_lead(
     return lead
 
 
+# ==========================================================
+# 🧾 LEAD 360 (lead + recent context in one round trip)
+# ==========================================================
+@router.get("/{lead_id}/full")
+def get_lead_full(
+    lead_id: UUID,
+    activities: int = Query(20, ge=0, le=200),
+    tasks: int = Query(50, ge=0, le=200),
+    quotations: int = Query(20, ge=0, le=200),
+    orders: int = Query(20, ge=0, le=200),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_principal),
+):
+    """
+    Lead card / detail payload: the lead, its last N activities, open tasks,
+    quotations and orders. Send the returned ETag back as If-None-Match to
+    get a bodyless 304 when nothing changed.
+    """
+    payload = load_lead_full(
+        db, current_user.company_id, lead_id,
+        activities=activities, tasks=tasks, quotations=quotations, orders=orders,
+    )
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Lead not found")
+
+    body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    etag = make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 # ==========================================================
 # ✅ UPDATE LEAD
 # ==========================================================
@@ -133,10 +509,11 @@ def update_lead(
     lead_id: str,
     payload: LeadUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_principal),
 ):
     lead = (
         db.query(Lead)
+        .options(*loader_profile(Lead, "bare"))
         .filter(Lead.id == lead_id, Lead.company_id == current_user.company_id)
         .first()
     )
@@ -147,8 +524,14 @@ def update_lead(
         setattr(lead, key, value)
 
     db.commit()
-    db.refresh(lead)
-    return lead
+    # The commit expires the row: reload it once, with the collections the response shows
+    return (
+        db.query(Lead)
+        .options(*loader_profile(Lead, "detail"))
+        .populate_existing()
+        .filter(Lead.id == lead_id)
+        .one()
+    )
 
 
 # ==========================================================
@@ -158,16 +541,20 @@ def update_lead(
 def delete_lead(
     lead_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_principal),
 ):
     lead = (
         db.query(Lead)
+        .options(*loader_profile(Lead, "bare"))
         .filter(Lead.id == lead_id, Lead.company_id == current_user.company_id)
         .first()
     )
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
 
+    # Activities go with the DB cascade; take them off the counters and rollup first
+    remove_for_leads(db, [lead.id])
+    remove_rollup_for_leads(db, [lead.id])
     db.delete(lead)
     db.commit()
     return {"message": "Lead deleted successfully"}
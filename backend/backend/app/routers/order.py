@@ -6,20 +6,20 @@ from app.models.order import Order
 from app.models.quotation import Quotation
 from app.models.leads import Lead
 from app.models.user import User
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_principal
 
 router = APIRouter(
     prefix="/orders",
     tags=["Orders"],
-    dependencies=[Depends(get_current_user)]
+    dependencies=[Depends(get_current_principal)]
 )
 
 @router.get("/")
-def get_all_orders(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_all_orders(db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
     return db.query(Order).filter(Order.company_id == current_user.company_id).all()
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def create_order(data: dict, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def create_order(data: dict, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
     quotation = db.query(Quotation).filter(Quotation.id == data.get("quotation_id"), Quotation.company_id == current_user.company_id).first()
     if not quotation:
         raise HTTPException(status_code=404, detail="Quotation not found")
@@ -44,7 +44,7 @@ def create_order(data: dict, db: Session = Depends(get_db), current_user: User =
     return order
 
 @router.put("/{order_id}")
-def update_order(order_id: str, data: dict, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def update_order(order_id: str, data: dict, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
     order = db.query(Order).filter(Order.id == order_id, Order.company_id == current_user.company_id).first()
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -67,7 +67,7 @@ def update_order(order_id: str, data: dict, db: Session = Depends(get_db), curre
     return order
 
 @router.delete("/{order_id}")
-def delete_order(order_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def delete_order(order_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
     order = db.query(Order).filter(Order.id == order_id, Order.company_id == current_user.company_id).first()
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -9,23 +9,23 @@ from app.models.quotation import Quotation
 from app.models.leads import Lead
 from app.models.company_profile import CompanyProfile
 from app.models.user import User
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_principal
 from app.utils.pdf_generator import build_quotation_pdf, default_company_profile
 
 router = APIRouter(
     prefix="/quotations",
     tags=["Quotations"],
-    dependencies=[Depends(get_current_user)]
+    dependencies=[Depends(get_current_principal)]
 )
 
 # GET – all (company scoped)
 @router.get("/")
-def get_all_quotations(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_all_quotations(db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
     return db.query(Quotation).filter(Quotation.company_id == current_user.company_id).all()
 
 # POST – create
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def create_quotation(data: dict, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def create_quotation(data: dict, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
     lead = db.query(Lead).filter(Lead.id == data.get("lead_id"), Lead.company_id == current_user.company_id).first()
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
@@ -42,7 +42,7 @@ def create_quotation(data: dict, db: Session = Depends(get_db), current_user: Us
 
 # PUT – update
 @router.put("/{quotation_id}")
-def update_quotation(quotation_id: str, data: dict, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def update_quotation(quotation_id: str, data: dict, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
     quotation = db.query(Quotation).filter(Quotation.id == quotation_id, Quotation.company_id == current_user.company_id).first()
     if not quotation:
         raise HTTPException(status_code=404, detail="Quotation not found")
@@ -63,7 +63,7 @@ def update_quotation(quotation_id: str, data: dict, db: Session = Depends(get_db
 
 # DELETE – delete
 @router.delete("/{quotation_id}")
-def delete_quotation(quotation_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def delete_quotation(quotation_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
     quotation = db.query(Quotation).filter(Quotation.id == quotation_id, Quotation.company_id == current_user.company_id).first()
     if not quotation:
         raise HTTPException(status_code=404, detail="Quotation not found")
@@ -74,7 +74,7 @@ def delete_quotation(quotation_id: str, db: Session = Depends(get_db), current_u
 
 # GET – download PDF
 @router.get("/{quotation_id}/pdf")
-def download_quotation_pdf(quotation_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def download_quotation_pdf(quotation_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
     quotation = db.query(Quotation).filter(Quotation.id == quotation_id, Quotation.company_id == current_user.company_id).first()
     if not quotation:
         raise HTTPException(status_code=404, detail="Quotation not found")
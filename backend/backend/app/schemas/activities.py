@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List
 from datetime import datetime
 from uuid import UUID
 
@@ -39,6 +39,15 @@ class ActivityCreate(ActivityBase):
     pass
 
 
+class ActivityBatchItem(ActivityCreate):
+    idempotency_key: str = Field(..., min_length=1, max_length=80)  # unique per company, client-generated
+    occurred_at: Optional[datetime] = None                          # device time; defaults to server time
+
+
+class ActivityBatchCreate(BaseModel):
+    activities: List[ActivityBatchItem]
+
+
 class ActivityUpdate(BaseModel):
     status: Optional[str] = None
     outcome: Optional[str] = None
@@ -96,6 +105,12 @@ class ActivityOut(ActivityBase):
     gps_verified: Optional[bool] = None
     trust_score_impact: Optional[int] = 0
     device_id: Optional[str] = None
+    ai_sentiment: Optional[str] = None                        # generated from meta
+
+    # Nullable in the table (legacy / Core-inserted rows)
+    priority: Optional[str] = "Medium"
+    auto_generated: Optional[bool] = False
+    meta: Optional[Dict[str, Any]] = {}
 
     # ✅ Display helpers (mapped correctly)
     when: Optional[datetime] = Field(None, alias="due_date")  # pulls from due_date automatically
@@ -0,0 +1,41 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional
+from datetime import datetime
+from uuid import UUID
+
+
+# ---------------------------------------------------------------------------
+# Next-task rules (see services/activity_logic)
+# ---------------------------------------------------------------------------
+class ActivityRuleBase(BaseModel):
+    name: str = Field(..., max_length=120)
+    trigger_type: Optional[str] = Field(None, max_length=40)       # None = any type
+    trigger_outcome: Optional[str] = Field(None, max_length=60)    # None = any outcome
+    next_type: str = Field("Task", max_length=40)
+    next_title: str = Field(..., max_length=200)
+    delay_minutes: int = Field(24 * 60, ge=0, le=60 * 24 * 365)
+    priority: str = Field("High", max_length=10)
+    enabled: bool = True
+
+
+class ActivityRuleCreate(ActivityRuleBase):
+    pass
+
+
+class ActivityRuleUpdate(BaseModel):
+    name: Optional[str] = Field(None, max_length=120)
+    trigger_type: Optional[str] = Field(None, max_length=40)
+    trigger_outcome: Optional[str] = Field(None, max_length=60)
+    next_type: Optional[str] = Field(None, max_length=40)
+    next_title: Optional[str] = Field(None, max_length=200)
+    delay_minutes: Optional[int] = Field(None, ge=0, le=60 * 24 * 365)
+    priority: Optional[str] = Field(None, max_length=10)
+    enabled: Optional[bool] = None
+
+
+class ActivityRuleOut(ActivityRuleBase):
+    id: UUID
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
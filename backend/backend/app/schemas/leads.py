@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 from uuid import UUID
 
@@ -105,6 +105,15 @@ class CompanyProfileOut(BaseModel):
         orm_mode = True
 
 
+# ==========================================================
+# 🔹 FUZZY DUPLICATE MATCH
+# ==========================================================
+class DuplicateMatch(BaseModel):
+    lead_id: UUID
+    business_name: Optional[str] = None
+    score: float
+
+
 # ==========================================================
 # 🔹 LEAD OUT (with relations)
 # ==========================================================
@@ -126,5 +135,55 @@ class LeadOut(LeadBase):
     activities: Optional[List[ActivityOut]] = None
     tasks: Optional[List[TaskOut]] = None
 
+    # 👇 Set on create when the fuzzy matcher finds likely duplicates
+    possible_duplicates: Optional[List[DuplicateMatch]] = None
+
     class Config:
         orm_mode = True
+
+
+# ==========================================================
+# 🔹 PAGED LIST (keyset cursor)
+# ==========================================================
+class LeadPage(BaseModel):
+    items: List[LeadOut]
+    limit: int
+    next_cursor: Optional[str] = None
+
+
+# ==========================================================
+# 🔹 BATCH DUPLICATE CHECK
+# ==========================================================
+class DuplicateCheckBatch(BaseModel):
+    emails: List[str] = []
+    phones: List[str] = []
+
+
+# ==========================================================
+# 🔹 MERGE
+# ==========================================================
+class LeadMergeRequest(BaseModel):
+    survivor_id: UUID
+    loser_ids: List[UUID]
+
+
+class LeadMergeBulk(BaseModel):
+    merges: List[LeadMergeRequest]
+
+
+# ==========================================================
+# 🔹 BULK DELETE / ARCHIVE
+# ==========================================================
+class LeadBulkFilter(BaseModel):
+    stage: Optional[str] = None
+    lead_source: Optional[str] = None
+    city: Optional[str] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    is_active: Optional[bool] = None
+
+
+class LeadBulkDelete(BaseModel):
+    ids: Optional[List[UUID]] = None
+    filter: Optional[LeadBulkFilter] = None
+    mode: Literal["delete", "archive"] = "delete"
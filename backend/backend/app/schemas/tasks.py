@@ -9,14 +9,17 @@ from enum import Enum
 # 🔹 ENUMS
 # ==========================================================
 class TaskStatus(str, Enum):
+    planned = "Planned"          # model default
     pending = "Pending"
     in_progress = "In Progress"
     completed = "Completed"
     done = "Done"
+    rescheduled = "Rescheduled"
 
 
 class TaskPriority(str, Enum):
     low = "Low"
+    normal = "Normal"            # model default
     medium = "Medium"
     high = "High"
 
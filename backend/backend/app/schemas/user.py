@@ -60,3 +60,10 @@ class UserMini(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# ==========================================================
+# 🔹 TOKENS
+# ==========================================================
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
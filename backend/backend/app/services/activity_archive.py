@@ -0,0 +1,143 @@
+# ================================
+# activity_archive.py — per-tenant retention for activities
+# ================================
+# Nightly: activities older than a company's retention window
+# (company_profile.activity_retention_months, default
+# settings.ACTIVITY_RETENTION_MONTHS) are moved, one (company, month) at a
+# time, into activity_archive as gzip'd JSON lines and deleted from the live
+# table. Once every tenant has left a month partition it is empty and gets
+# dropped, so live indexes and vacuum only ever cover the retention window.
+#
+#   python -m app.services.activity_archive      # run archival now
+import gzip
+import json
+import logging
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, delete, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core import dashboard_cache
+from app.core.config import settings
+from app.models.activities import Activity
+from app.models.activity_archive import ActivityArchive
+from app.models.company_profile import CompanyProfile
+from app.services import activity_counters, activity_partitions, activity_rollup
+from app.utils.serializers import dumps
+
+log = logging.getLogger("uvicorn")
+
+# pg_try_advisory_lock key: one archiver at a time across app processes
+_LOCK_KEY = 0x41435441  # "ACTA"
+
+
+def _cutoff_expr(today: date):
+    """First day of the oldest month each company still keeps live."""
+    months = func.coalesce(CompanyProfile.activity_retention_months, settings.ACTIVITY_RETENTION_MONTHS)
+    return literal(activity_partitions.month_start(today)) - func.make_interval(0, months)
+
+
+def expired_chunks(conn, today: Optional[date] = None) -> List[Dict]:
+    """(company_id, month, rows) for every month that is past its company's retention."""
+    today = today or date.today()
+    shortest = conn.execute(
+        select(func.min(func.coalesce(CompanyProfile.activity_retention_months, settings.ACTIVITY_RETENTION_MONTHS)))
+    ).scalar() or settings.ACTIVITY_RETENTION_MONTHS
+    # Literal bound keeps the scan on the old partitions only
+    horizon = activity_partitions.add_months(activity_partitions.month_start(today), -shortest)
+
+    month = func.date_trunc("month", Activity.created_at)
+    rows = conn.execute(
+        select(Activity.company_id, month.label("month"), func.count().label("rows"))
+        .join(CompanyProfile, CompanyProfile.id == Activity.company_id)
+        .where(Activity.created_at < horizon, Activity.created_at < _cutoff_expr(today))
+        .group_by(Activity.company_id, month)
+        .order_by(month, Activity.company_id)
+    ).mappings().all()
+    return [{**r, "month": r["month"].date()} for r in rows]
+
+
+def archive_chunk(conn, company_id, month: date) -> int:
+    """Move one (company, month) into activity_archive. Caller commits."""
+    where = (
+        Activity.company_id == company_id,
+        Activity.created_at >= month,
+        Activity.created_at < activity_partitions.add_months(month, 1),
+    )
+    table = Activity.__table__
+    rows = conn.execute(select(table).where(*where).order_by(table.c.created_at)).mappings().all()
+    if not rows:
+        return 0
+
+    payload = gzip.compress(b"\n".join(dumps(dict(r)) for r in rows))
+    stmt = pg_insert(ActivityArchive.__table__).values(
+        company_id=company_id, month=month, row_count=len(rows), payload=payload, archived_at=datetime.utcnow()
+    )
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=["company_id", "month"],
+        set_={
+            # Concatenated gzip members are still one valid gzip stream
+            "payload": ActivityArchive.__table__.c.payload.op("||")(stmt.excluded.payload),
+            "row_count": ActivityArchive.__table__.c.row_count + stmt.excluded.row_count,
+            "archived_at": stmt.excluded.archived_at,
+        },
+    ))
+
+    activity_counters.remove_matching(conn, *where)
+    activity_rollup.remove_matching(conn, *where)
+    conn.execute(delete(table).where(and_(*where)))
+    return len(rows)
+
+
+def archive_expired(conn, today: Optional[date] = None) -> Dict[str, int]:
+    """Archive every expired chunk (one commit each), then drop emptied partitions."""
+    today = today or date.today()
+    if not conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _LOCK_KEY}).scalar():
+        log.warning("⚠️ activity archival already running elsewhere; skipped")
+        return {"chunks": 0, "rows": 0, "partitions_dropped": 0}
+    try:
+        chunks = expired_chunks(conn, today)
+        conn.commit()
+        archived = 0
+        for chunk in chunks:
+            archived += archive_chunk(conn, chunk["company_id"], chunk["month"])
+            conn.commit()
+            dashboard_cache.bump(chunk["company_id"])
+
+        dropped = []
+        if activity_partitions.is_partitioned(conn):
+            oldest_kept = conn.execute(select(func.min(_cutoff_expr(today))).select_from(CompanyProfile)).scalar()
+            if oldest_kept:
+                dropped = activity_partitions.drop_empty_partitions(conn, oldest_kept.date())
+            conn.commit()
+        return {"chunks": len(chunks), "rows": archived, "partitions_dropped": len(dropped)}
+    finally:
+        conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _LOCK_KEY})
+        conn.commit()
+
+
+def load_archived(db, company_id, month: date) -> List[Dict]:
+    """Rows of one archived (company, month) as dicts (ISO strings for dates / ids)."""
+    row = db.get(ActivityArchive, (company_id, activity_partitions.month_start(month)))
+    if row is None:
+        return []
+    return [json.loads(line) for line in gzip.decompress(row.payload).splitlines() if line]
+
+
+def run_maintenance() -> None:
+    """Daily job: partitions ahead, then archival. Own connection."""
+    from app.db.session import engine
+
+    with engine.connect() as conn:
+        if activity_partitions.is_partitioned(conn):
+            created = activity_partitions.ensure_partitions(conn)
+            conn.commit()
+            if created:
+                log.warning("✅ activity partitions created: %s", ", ".join(created))
+        result = archive_expired(conn)
+    log.warning("✅ activity archival: %s", result)
+
+
+if __name__ == "__main__":
+    run_maintenance()
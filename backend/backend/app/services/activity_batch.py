@@ -0,0 +1,146 @@
+# ================================
+# activity_batch.py — batch activity ingestion (mobile sync)
+# ================================
+# Phones upload call logs / visit check-ins in batches. Each item carries a
+# client-generated idempotency_key, claimed once per company in
+# activity_idempotency_keys, so a retried upload returns the original ids
+# instead of inserting again.
+#
+# One request = one lead-ownership query + one key claim (INSERT ... ON
+# CONFLICT DO NOTHING RETURNING) + one multi-row activity INSERT + one
+# lookup for keys that already existed.
+# The insert bypasses the ORM, so counters, rollup and the rule outbox are
+# fed explicitly (insert_activities, shared with the rule worker).
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.dashboard_cache import mark_changed
+from app.models.activities import Activity
+from app.models.activity_idempotency import ActivityIdempotencyKey
+from app.models.leads import Lead
+from app.services import activity_counters, activity_rollup, activity_rules
+
+MAX_BATCH = 1000
+
+# Columns RETURNING hands to the counter / rollup deltas and the rule outbox
+_DELTA_FIELDS = (
+    "company_id", "assigned_to", "created_by", "created_at",
+    "type", "status", "verified_event", "call_duration",
+)
+
+
+def call_duration_from_meta(type_: Optional[str], meta: Optional[Dict]) -> Optional[int]:
+    """Seconds between meta.call_start and meta.call_end for Call activities."""
+    if (type_ or "").lower() != "call" or not meta:
+        return None
+    start, end = meta.get("call_start"), meta.get("call_end")
+    if not (start and end):
+        return None
+    try:
+        return int((datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds())
+    except Exception:
+        return None
+
+
+def insert_activities(db: Session, rows: List[Dict]) -> List:
+    """
+    One multi-row INSERT ... RETURNING. Rows with an idempotency_key go in
+    only if the key is claimed first in activity_idempotency_keys (ON
+    CONFLICT DO NOTHING), so a key inserts at most once per company.
+    Returns the rows actually inserted; counters, rollup and the rule outbox
+    are updated for them in the same transaction, and the dashboard cache is
+    invalidated on commit. Caller commits.
+    """
+    for row in rows:
+        row.setdefault("id", uuid.uuid4())
+
+    keyed = [r for r in rows if r.get("idempotency_key")]
+    if keyed:
+        keys = ActivityIdempotencyKey.__table__
+        claimed = set(db.execute(
+            pg_insert(keys)
+            .on_conflict_do_nothing(index_elements=[keys.c.company_id, keys.c.idempotency_key])
+            .returning(keys.c.company_id, keys.c.idempotency_key),
+            [{"company_id": r["company_id"], "idempotency_key": r["idempotency_key"], "activity_id": r["id"]} for r in keyed],
+        ).tuples().all())
+        rows = [r for r in rows if not r.get("idempotency_key") or (r["company_id"], r["idempotency_key"]) in claimed]
+    if not rows:
+        return []
+
+    table = Activity.__table__
+    inserted = db.execute(
+        insert(table).returning(table.c.id, table.c.idempotency_key, *[table.c[f] for f in _DELTA_FIELDS]),
+        rows,
+    ).mappings().all()
+    activity_counters.add_activities(db, inserted)
+    activity_rollup.add_activities(db, inserted)
+    activity_rules.enqueue_completed(db, inserted)
+    mark_changed(db, {r["company_id"] for r in inserted})
+    return inserted
+
+
+def ingest_activities(db: Session, current_user, items) -> Dict[str, Any]:
+    """Insert a batch of ActivityBatchItem; per-item result in input order."""
+    company_id = current_user.company_id
+    now = datetime.utcnow()
+
+    # First occurrence of a key wins inside one batch
+    unique = list({item.idempotency_key: item for item in reversed(items)}.values())
+
+    lead_ids = {item.lead_id for item in unique}
+    owned = set(db.scalars(select(Lead.id).where(Lead.company_id == company_id, Lead.id.in_(lead_ids))))
+
+    rows, rejected = [], set()
+    for item in unique:
+        if item.lead_id not in owned:
+            rejected.add(item.idempotency_key)
+            continue
+        data = item.dict(exclude={"idempotency_key", "occurred_at", "company_id", "created_by"})
+        rows.append({
+            **data,
+            "id": uuid.uuid4(),
+            "company_id": company_id,
+            "created_by": current_user.id,
+            "assigned_to": item.assigned_to or current_user.id,
+            "created_at": item.occurred_at or now,
+            "call_duration": item.call_duration or call_duration_from_meta(item.type, item.meta),
+            "idempotency_key": item.idempotency_key,
+        })
+
+    ids: Dict[str, Any] = {}
+    created = set()
+    if rows:
+        for row in insert_activities(db, rows):
+            ids[row["idempotency_key"]] = row["id"]
+            created.add(row["idempotency_key"])
+
+        existing = [r["idempotency_key"] for r in rows if r["idempotency_key"] not in created]
+        if existing:
+            k = ActivityIdempotencyKey
+            ids.update(db.execute(
+                select(k.idempotency_key, k.activity_id).where(
+                    k.company_id == company_id, k.idempotency_key.in_(existing)
+                )
+            ).all())
+    db.commit()
+
+    results: List[Dict[str, Any]] = []
+    for item in items:
+        key = item.idempotency_key
+        if key in rejected:
+            results.append({"idempotency_key": key, "status": "rejected", "detail": "Lead not found or not yours"})
+        else:
+            results.append({"idempotency_key": key, "id": ids.get(key), "status": "created" if key in created else "duplicate"})
+            created.discard(key)  # repeats of the key later in the batch report as duplicates
+
+    return {
+        "created": sum(r["status"] == "created" for r in results),
+        "duplicates": sum(r["status"] == "duplicate" for r in results),
+        "rejected": sum(r["status"] == "rejected" for r in results),
+        "results": results,
+    }
@@ -0,0 +1,80 @@
+# ================================
+# activity_chain.py — follow-up chain of an activity in one query
+# ================================
+# Two recursive CTEs over parent_activity_id (ancestors walking up, descendants
+# walking down) joined to the list columns, so a 20-step chain is one round
+# trip instead of one relationship hop per level. Each side recurses one step
+# past max_depth so the response can say whether it was cut off.
+#
+# activities is partitioned, so parent_activity_id has no FK cascade: deleting
+# an activity deletes its follow-ups here (after the counter / rollup
+# before_delete events have subtracted them).
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, event, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.activities import Activity
+from app.services.activity_counters import follow_up_chain
+from app.services.list_views import activity_list_select, activity_rows
+
+DEFAULT_DEPTH = 50
+MAX_DEPTH = 200
+
+
+def _walk(activity_id, company_id, max_depth: int, up: bool):
+    anchor = select(Activity.id, Activity.parent_activity_id, literal(0).label("depth")).where(
+        Activity.id == activity_id, Activity.company_id == company_id
+    )
+    cte = anchor.cte("ancestors" if up else "descendants", recursive=True)
+    step = -1 if up else 1
+    link = Activity.id == cte.c.parent_activity_id if up else Activity.parent_activity_id == cte.c.id
+    return cte.union_all(
+        select(Activity.id, Activity.parent_activity_id, (cte.c.depth + step).label("depth"))
+        .where(link, Activity.company_id == company_id, cte.c.depth * step <= max_depth)
+    )
+
+
+def load_chain(db: Session, activity_id, company_id, max_depth: int = DEFAULT_DEPTH) -> Optional[Dict[str, Any]]:
+    """
+    {"activity", "ancestors" (nearest first), "descendants" (by depth), "truncated"}
+    or None when the activity is not in this company. Rows carry "depth":
+    negative above the activity, positive below it.
+    """
+    up = _walk(activity_id, company_id, max_depth, up=True)
+    down = _walk(activity_id, company_id, max_depth, up=False)
+    chain = union_all(
+        select(up.c.id, up.c.depth),
+        select(down.c.id, down.c.depth).where(down.c.depth > 0),
+    ).subquery("chain")
+
+    rows = db.execute(
+        activity_list_select()
+        .add_columns(chain.c.depth)
+        .join(chain, chain.c.id == Activity.id)
+        .order_by(chain.c.depth, Activity.created_at)
+    ).all()
+    if not rows:
+        return None
+
+    items = activity_rows(rows)
+    for item, row in zip(items, rows):
+        item["depth"] = row[-1]
+
+    root = next(item for item in items if item["depth"] == 0)
+    ancestors = [i for i in items if -max_depth <= i["depth"] < 0]
+    descendants = [i for i in items if 0 < i["depth"] <= max_depth]
+    return {
+        "activity": root,
+        "ancestors": ancestors[::-1],
+        "descendants": descendants,
+        "truncated": {
+            "ancestors": any(i["depth"] < -max_depth for i in items),
+            "descendants": any(i["depth"] > max_depth for i in items),
+        },
+    }
+
+
+@event.listens_for(Activity, "after_delete")
+def _delete_follow_ups(mapper, connection, target):
+    connection.execute(delete(Activity.__table__).where(Activity.__table__.c.id.in_(follow_up_chain(target))))
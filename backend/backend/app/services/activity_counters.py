@@ -0,0 +1,224 @@
+# ================================
+# activity_counters.py — O(1) activity summary counters
+# ================================
+# Keeps activity_counters in step with activity writes:
+#   - ORM inserts / updates / deletes of Activity apply +/- deltas in the same
+#     flush (same transaction) through the mapper events below; a delete also
+#     subtracts the follow-up chain deleted with it (services/activity_chain)
+#   - paths that bypass the ORM (lead deletes cascading in the DB, bulk
+#     inserts) call remove_for_leads() / apply_deltas() explicitly
+#
+#   python -m app.services.activity_counters      # rebuild from activities
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models.activities import Activity
+from app.models.activity_counter import COMPANY_WIDE, ActivityCounter
+
+PENDING_STATUSES = ("Planned", "Pending", "Overdue")
+COMPLETED_STATUS = "Completed"
+COUNTER_FIELDS = ("total", "verified", "pending", "completed")
+
+# Activity attributes that move an activity between counters
+_WATCHED = ("company_id", "assigned_to", "created_by", "verified_event", "status")
+
+Deltas = Dict[Tuple, List[int]]
+
+
+# ---------------------------------------------------------------------------
+# Deltas
+# ---------------------------------------------------------------------------
+def _add(deltas: Deltas, company_id, users: Iterable, vector: Iterable[int]) -> None:
+    for user_id in {COMPANY_WIDE, *(u for u in users if u)}:
+        acc = deltas.setdefault((company_id, user_id), [0, 0, 0, 0])
+        for i, v in enumerate(vector):
+            acc[i] += v
+
+
+def _contribution(deltas: Deltas, values: Dict, sign: int) -> None:
+    """One activity's +1/-1 on its company row and its creator/assignee rows."""
+    if not values.get("company_id"):
+        return
+    status = values.get("status") or "Pending"
+    vector = (
+        sign,
+        sign if values.get("verified_event") else 0,
+        sign if status in PENDING_STATUSES else 0,
+        sign if status == COMPLETED_STATUS else 0,
+    )
+    _add(deltas, values["company_id"], (values.get("assigned_to"), values.get("created_by")), vector)
+
+
+def apply_deltas(conn, deltas: Deltas) -> None:
+    """Upsert counter deltas in one statement (conn: Connection or Session)."""
+    rows = [
+        {"company_id": company_id, "user_id": user_id, **dict(zip(COUNTER_FIELDS, vec))}
+        for (company_id, user_id), vec in deltas.items()
+        if any(vec)
+    ]
+    if not rows:
+        return
+    table = ActivityCounter.__table__
+    stmt = pg_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.company_id, table.c.user_id],
+        set_={
+            **{f: table.c[f] + stmt.excluded[f] for f in COUNTER_FIELDS},
+            "updated_at": func.now(),
+        },
+    )
+    conn.execute(stmt)
+
+
+def _grouped_deltas(conn, *where, sign: int = 1) -> Deltas:
+    """Deltas for every activity matching `where`, from one grouped aggregate."""
+    rows = conn.execute(
+        select(
+            Activity.company_id,
+            Activity.assigned_to,
+            Activity.created_by,
+            func.count(),
+            func.count().filter(Activity.verified_event.is_(True)),
+            func.count().filter(Activity.status.in_(PENDING_STATUSES)),
+            func.count().filter(Activity.status == COMPLETED_STATUS),
+        )
+        .where(*where)
+        .group_by(Activity.company_id, Activity.assigned_to, Activity.created_by)
+    ).all()
+    deltas: Deltas = {}
+    for company_id, assigned_to, created_by, *counts in rows:
+        _add(deltas, company_id, (assigned_to, created_by), [sign * c for c in counts])
+    return deltas
+
+
+def add_activities(conn, rows) -> None:
+    """Call after inserting activities outside the ORM (rows: mappings of watched fields)."""
+    deltas: Deltas = {}
+    for row in rows:
+        _contribution(deltas, row, +1)
+    apply_deltas(conn, deltas)
+
+
+def remove_matching(conn, *where) -> None:
+    """Call before a Core DELETE of the activities matching `where` (archival)."""
+    apply_deltas(conn, _grouped_deltas(conn, *where, sign=-1))
+
+
+def remove_for_leads(conn, lead_ids) -> None:
+    """Call before deleting leads: their activities go with the DB cascade."""
+    if lead_ids:
+        remove_matching(conn, Activity.lead_id.in_(list(lead_ids)))
+
+
+def rebuild_counters(conn, company_id=None) -> int:
+    """Recompute counters from activities (all tenants, or one). Caller commits."""
+    table = ActivityCounter.__table__
+    where = [Activity.company_id == company_id] if company_id else []
+    conn.execute(delete(table).where(table.c.company_id == company_id) if company_id else delete(table))
+    deltas = _grouped_deltas(conn, *where)
+    apply_deltas(conn, deltas)
+    return len(deltas)
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+def read_overview(db, company_id, user_id=None) -> Dict[str, int]:
+    """Counter row lookup; falls back to one FILTER aggregate if the row is missing."""
+    row = db.get(ActivityCounter, (company_id, user_id or COMPANY_WIDE))
+    if row is not None:
+        return {f: getattr(row, f) for f in COUNTER_FIELDS}
+
+    conds = [Activity.company_id == company_id]
+    if user_id:
+        conds.append((Activity.assigned_to == user_id) | (Activity.created_by == user_id))
+    counts = db.execute(
+        select(
+            func.count(),
+            func.count().filter(Activity.verified_event.is_(True)),
+            func.count().filter(Activity.status.in_(PENDING_STATUSES)),
+            func.count().filter(Activity.status == COMPLETED_STATUS),
+        ).where(*conds)
+    ).one()
+    return dict(zip(COUNTER_FIELDS, counts))
+
+
+# ---------------------------------------------------------------------------
+# 🔄 ORM events (same transaction as the activity write)
+# ---------------------------------------------------------------------------
+def _current(target) -> Dict:
+    return {f: getattr(target, f) for f in _WATCHED}
+
+
+@event.listens_for(Activity, "after_insert")
+def _activity_inserted(mapper, connection, target):
+    deltas: Deltas = {}
+    _contribution(deltas, _current(target), +1)
+    apply_deltas(connection, deltas)
+
+
+def value_change(connection, target, fields) -> Optional[Tuple[Dict, Dict]]:
+    """
+    (old, new) values of `fields` for an Activity in before_update, or None
+    if none of them changed. When an old value is not in memory (expired, or
+    overwritten without being loaded) the stored row is read instead.
+    """
+    state = inspect(target)
+    histories = {f: state.attrs[f].history for f in fields}
+    if not any(h.has_changes() for h in histories.values()):
+        return None
+
+    old = {}
+    for f, h in histories.items():
+        if h.deleted:
+            old[f] = h.deleted[0]
+        elif h.added or f in state.unloaded:
+            old = dict(connection.execute(
+                select(*[getattr(Activity, name) for name in fields]).where(Activity.id == target.id)
+            ).mappings().one())
+            break
+        else:
+            old[f] = h.unchanged[0] if h.unchanged else None
+    new = {f: (h.added[0] if h.added else old[f]) for f, h in histories.items()}
+    return old, new
+
+
+def follow_up_chain(target):
+    """Ids deleted with `target`: its parent_activity_id descendants."""
+    chain = select(Activity.id).where(Activity.parent_activity_id == target.id).cte("chain", recursive=True)
+    chain = chain.union_all(select(Activity.id).where(Activity.parent_activity_id == chain.c.id))
+    return select(chain.c.id)
+
+
+@event.listens_for(Activity, "before_update")
+def _activity_updating(mapper, connection, target):
+    change = value_change(connection, target, _WATCHED)
+    if change is None:
+        return
+
+    deltas: Deltas = {}
+    _contribution(deltas, change[0], -1)
+    _contribution(deltas, change[1], +1)
+    apply_deltas(connection, deltas)
+
+
+@event.listens_for(Activity, "before_delete")
+def _activity_deleting(mapper, connection, target):
+    # Follow-ups chained through parent_activity_id are deleted with it
+    deltas = _grouped_deltas(connection, Activity.id.in_(follow_up_chain(target)), sign=-1)
+    _contribution(deltas, _current(target), -1)
+    apply_deltas(connection, deltas)
+
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        rows = rebuild_counters(session)
+        session.commit()
+        print(f"✅ activity_counters rebuilt: {rows} rows")
+    finally:
+        session.close()
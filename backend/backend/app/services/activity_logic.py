@@ -1,45 +1,104 @@
+# ================================
+# activity_logic.py — next-task rules
+# ================================
+# Rules are compiled per company into a dict keyed by (type, outcome); a
+# completed activity is matched with at most four lookups, most specific
+# first, whatever the number of rules:
+#
+#   (type, outcome) → (any, outcome) → (type, any) → (any, any)
+#
+# Companies without configured rules get DEFAULT_RULES (the former
+# hard-coded outcome sets). Evaluation runs in the outbox worker
+# (services/activity_rules), never on the request path.
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from uuid import UUID
-from ..models.activities import Activity
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
 
 FOLLOW_UP_OUTCOMES = {"Follow-Up Needed", "No Answer", "Busy"}
 INTERESTED_OUTCOMES = {"Interested"}
-CLOSED_OUTCOMES = {"Closed Won", "Closed Lost"}
-
-def maybe_create_next_task(db: Session, completed_activity: Activity):
-    """
-    Creates the 'next task' based on outcome, links parent_activity_id to the completed one.
-    """
-    if completed_activity.outcome in FOLLOW_UP_OUTCOMES:
-        title = "Follow-Up Call"
-        due = datetime.utcnow() + timedelta(days=1)
-        _spawn(db, completed_activity, title, due)
-
-    elif completed_activity.outcome in INTERESTED_OUTCOMES and completed_activity.type in {"Call","WhatsApp","Email","Visit"}:
-        title = "Send Proposal"
-        due = datetime.utcnow() + timedelta(hours=4)
-        _spawn(db, completed_activity, title, due, priority="Medium")
-
-    # If closed, no auto task
-    return
-
-def _spawn(db: Session, parent: Activity, title: str, due, priority="High"):
-    nxt = Activity(
-        lead_id=parent.lead_id,
-        type="Task",
-        title=f"{title} — {parent.title}",
-        description=f"Auto-created from activity {str(parent.id)} with outcome '{parent.outcome}'.",
-        status="Pending",
-        due_date=due,
-        priority=priority,
-        assigned_to=parent.assigned_to or parent.created_by,
-        created_by=parent.created_by,
-        auto_generated=True,
-        parent_activity_id=parent.id,
-        source_channel="AutoTask",
-        meta={"auto_note": "System generated next task"}
-    )
-    db.add(nxt)
-    db.flush()
-    return nxt
+PROPOSAL_TYPES = {"Call", "WhatsApp", "Email", "Visit"}
+
+
+class CompiledRule(NamedTuple):
+    key: str                # idempotency namespace: one follow-up per (rule, parent)
+    next_type: str
+    next_title: str
+    delay: timedelta
+    priority: str
+
+
+RuleTable = Dict[Tuple[Optional[str], Optional[str]], List[CompiledRule]]
+
+DEFAULT_RULES = [
+    *(
+        {"id": "default-follow-up", "trigger_type": None, "trigger_outcome": outcome,
+         "next_type": "Task", "next_title": "Follow-Up Call", "delay_minutes": 24 * 60, "priority": "High"}
+        for outcome in sorted(FOLLOW_UP_OUTCOMES)
+    ),
+    *(
+        {"id": "default-proposal", "trigger_type": type_, "trigger_outcome": outcome,
+         "next_type": "Task", "next_title": "Send Proposal", "delay_minutes": 4 * 60, "priority": "Medium"}
+        for type_ in sorted(PROPOSAL_TYPES)
+        for outcome in sorted(INTERESTED_OUTCOMES)
+    ),
+]
+
+
+def _norm(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip().casefold()
+    return value or None
+
+
+def _get(rule, name):
+    return rule[name] if isinstance(rule, Mapping) else getattr(rule, name)
+
+
+def compile_rules(rules: Iterable) -> RuleTable:
+    """ActivityRule rows (or dicts) → {(type, outcome): [CompiledRule, ...]}."""
+    table: RuleTable = {}
+    for rule in rules:
+        key = (_norm(_get(rule, "trigger_type")), _norm(_get(rule, "trigger_outcome")))
+        table.setdefault(key, []).append(
+            CompiledRule(
+                key=str(_get(rule, "id")),
+                next_type=_get(rule, "next_type") or "Task",
+                next_title=_get(rule, "next_title"),
+                delay=timedelta(minutes=_get(rule, "delay_minutes") or 0),
+                priority=_get(rule, "priority") or "High",
+            )
+        )
+    return table
+
+
+DEFAULT_TABLE = compile_rules(DEFAULT_RULES)
+
+
+def match(table: RuleTable, type_: Optional[str], outcome: Optional[str]) -> List[CompiledRule]:
+    """Rules of the most specific (type, outcome) key present in `table`."""
+    t, o = _norm(type_), _norm(outcome)
+    for key in ((t, o), (None, o), (t, None), (None, None)):
+        rules = table.get(key)
+        if rules:
+            return rules
+    return []
+
+
+def follow_up_row(parent: Mapping, rule: CompiledRule, now: datetime) -> Dict:
+    """Insert row for the follow-up `rule` schedules after `parent` completed."""
+    return {
+        "company_id": parent["company_id"],
+        "lead_id": parent["lead_id"],
+        "type": rule.next_type,
+        "title": f"{rule.next_title} — {parent['title']}"[:200],
+        "description": f"Auto-created from activity {parent['id']} with outcome '{parent['outcome']}'.",
+        "status": "Pending",
+        "due_date": now + rule.delay,
+        "priority": rule.priority,
+        "assigned_to": parent["assigned_to"] or parent["created_by"],
+        "created_by": parent["created_by"],
+        "created_at": now,
+        "auto_generated": True,
+        "parent_activity_id": parent["id"],
+        "source_channel": "AutoTask",
+        "meta": {"auto_note": "System generated next task", "rule": rule.key},
+        "idempotency_key": f"rule:{rule.key}:{parent['id']}"[:80],
+    }
@@ -0,0 +1,155 @@
+# ================================
+# activity_partitions.py — monthly RANGE partitions of activities
+# ================================
+# activities is PARTITION BY RANGE (created_at), one partition per month
+# (activities_y2026m10) plus activities_default for rows outside every
+# month range (e.g. device clocks far off). Partitions are created
+# ACTIVITY_PARTITIONS_AHEAD months ahead by the daily maintenance job, the
+# app startup hook and upgrade_schema. Old months are emptied per tenant by
+# services/activity_archive and then dropped here.
+#
+#   python -m app.services.activity_partitions ensure    # create upcoming months
+#   python -m app.services.activity_partitions migrate   # one-off: convert a plain table
+import logging
+import re
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.models.activities import Activity
+
+log = logging.getLogger("uvicorn")
+
+PARENT = "activities"
+DEFAULT_PARTITION = "activities_default"
+_NAME = re.compile(r"^activities_y(\d{4})m(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, n: int) -> date:
+    y, m = divmod(month.year * 12 + month.month - 1 + n, 12)
+    return date(y, m + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(conn) -> bool:
+    return bool(conn.execute(
+        text("SELECT c.relkind = 'p' FROM pg_class c WHERE c.oid = to_regclass(:t)"), {"t": PARENT}
+    ).scalar())
+
+
+def month_partitions(conn) -> List[date]:
+    """Months that currently have a partition, oldest first."""
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:t)"
+    ), {"t": PARENT}).scalars()
+    months = []
+    for name in names:
+        m = _NAME.match(name)
+        if m:
+            months.append(date(int(m.group(1)), int(m.group(2)), 1))
+    return sorted(months)
+
+
+def ensure_partitions(conn, ahead: Optional[int] = None, since: Optional[date] = None) -> List[str]:
+    """
+    Create missing month partitions from `since` (default: this month) up to
+    `ahead` months from now, and the default partition. Caller commits.
+    """
+    ahead = settings.ACTIVITY_PARTITIONS_AHEAD if ahead is None else ahead
+    this_month = month_start(date.today())
+    month = month_start(since) if since else this_month
+    last = add_months(this_month, ahead)
+
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+    existing = set(month_partitions(conn))
+    created = []
+    while month <= last:
+        if month not in existing:
+            name = partition_name(month)
+            try:
+                with conn.begin_nested():
+                    conn.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} "
+                        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+                    ))
+                created.append(name)
+            except DBAPIError as e:
+                # Rows for that month already sit in the default partition
+                log.warning("⚠️ partition %s not created: %s", name, e.orig)
+        month = add_months(month, 1)
+    return created
+
+
+def drop_empty_partitions(conn, before: date) -> List[str]:
+    """Detach + drop month partitions ending on/before `before` that hold no rows."""
+    dropped = []
+    for month in month_partitions(conn):
+        if add_months(month, 1) > before:
+            break
+        name = partition_name(month)
+        if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})")).scalar():
+            continue
+        conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        conn.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
+
+
+def migrate_to_partitioned(engine, keep_legacy: bool = False) -> None:
+    """
+    One-off conversion of a plain activities table (run upgrade_schema first,
+    in a maintenance window: rows are copied with one INSERT ... SELECT).
+    """
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            print("✅ activities is already partitioned")
+            return
+        conn.execute(text(f"LOCK TABLE {PARENT} IN ACCESS EXCLUSIVE MODE"))
+        conn.execute(text(f"ALTER TABLE {PARENT} RENAME TO {PARENT}_legacy"))
+
+        # Index / FK names are schema-wide: free them for the new table
+        for (index,) in conn.execute(text(
+            "SELECT indexname FROM pg_indexes WHERE tablename = :t"
+        ), {"t": f"{PARENT}_legacy"}).all():
+            conn.execute(text(f'ALTER INDEX "{index}" RENAME TO "{index[:55]}_legacy"'))
+        for table, constraint in conn.execute(text(
+            "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+            "WHERE contype = 'f' AND confrelid = to_regclass(:t)"
+        ), {"t": f"{PARENT}_legacy"}).all():
+            conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{constraint}"'))
+
+        Activity.__table__.create(conn)
+        oldest = conn.execute(text(f"SELECT min(created_at) FROM {PARENT}_legacy")).scalar()
+        ensure_partitions(conn, since=oldest.date() if oldest else None)
+
+        columns = ", ".join(c.name for c in Activity.__table__.columns if c.computed is None)
+        copied = conn.execute(text(
+            f"INSERT INTO {PARENT} ({columns}) SELECT {columns} FROM {PARENT}_legacy"
+        )).rowcount
+        if not keep_legacy:
+            conn.execute(text(f"DROP TABLE {PARENT}_legacy"))
+    print(f"✅ activities partitioned by month: {copied} rows copied")
+
+
+if __name__ == "__main__":
+    import sys
+
+    from app.db.session import engine
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "ensure"
+    if command == "migrate":
+        migrate_to_partitioned(engine, keep_legacy="--keep-legacy" in sys.argv)
+    else:
+        with engine.begin() as conn:
+            print(f"✅ partitions created: {ensure_partitions(conn) or 'none needed'}")
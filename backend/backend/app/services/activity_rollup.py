@@ -0,0 +1,224 @@
+# ================================
+# activity_rollup.py — daily activity rollup for charts
+# ================================
+# activity_daily_rollup holds count + call-duration sums per
+# (company, user, day, type, status). Same maintenance model as
+# activity_counters: mapper events apply deltas in the activity's own
+# transaction, ORM-bypassing paths call remove_for_leads()/apply_deltas().
+#
+#   python -m app.services.activity_rollup [company_id]   # rebuild / backfill
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, cast, delete, event, func, insert, inspect, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models.activities import Activity
+from app.models.activity_counter import COMPANY_WIDE
+from app.models.activity_rollup import ActivityDailyRollup
+from app.services.activity_counters import follow_up_chain, value_change
+
+_WATCHED = ("company_id", "assigned_to", "created_by", "created_at", "type", "status", "call_duration")
+
+BUCKETS = ("day", "week", "month")
+GROUP_FIELDS = ("type", "status", "user_id")
+
+Deltas = Dict[Tuple, List[int]]
+
+_user_expr = func.coalesce(Activity.assigned_to, Activity.created_by, literal(COMPANY_WIDE))
+_day_expr = cast(Activity.created_at, Date)
+
+
+# ---------------------------------------------------------------------------
+# Deltas
+# ---------------------------------------------------------------------------
+def _contribution(deltas: Deltas, values: Dict, sign: int) -> None:
+    if not values.get("company_id"):
+        return
+    # Always the stored created_at (eager_defaults / RETURNING): bucketing by
+    # a client clock would drift from rebuild_rollup's CAST(created_at AS DATE)
+    created = values.get("created_at") or datetime.utcnow()
+    key = (
+        values["company_id"],
+        values.get("assigned_to") or values.get("created_by") or COMPANY_WIDE,
+        created.date() if isinstance(created, datetime) else created,
+        values.get("type") or "",
+        values.get("status") or "Pending",
+    )
+    acc = deltas.setdefault(key, [0, 0])
+    acc[0] += sign
+    acc[1] += sign * (values.get("call_duration") or 0)
+
+
+def apply_deltas(conn, deltas: Deltas) -> None:
+    rows = [
+        {
+            "company_id": company_id, "user_id": user_id, "day": day, "type": type_, "status": status,
+            "count": count, "call_duration_sum": duration,
+        }
+        for (company_id, user_id, day, type_, status), (count, duration) in deltas.items()
+        if count or duration
+    ]
+    if not rows:
+        return
+    table = ActivityDailyRollup.__table__
+    stmt = pg_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.company_id, table.c.user_id, table.c.day, table.c.type, table.c.status],
+        set_={
+            "count": table.c["count"] + stmt.excluded["count"],
+            "call_duration_sum": table.c.call_duration_sum + stmt.excluded.call_duration_sum,
+        },
+    )
+    conn.execute(stmt)
+
+
+def _grouped_select(*where):
+    return (
+        select(
+            Activity.company_id,
+            _user_expr.label("user_id"),
+            _day_expr.label("day"),
+            Activity.type,
+            Activity.status,
+            func.count().label("count"),
+            func.coalesce(func.sum(Activity.call_duration), 0).label("call_duration_sum"),
+        )
+        .where(*where)
+        .group_by(Activity.company_id, _user_expr, _day_expr, Activity.type, Activity.status)
+    )
+
+
+def _grouped_deltas(conn, *where, sign: int = 1) -> Deltas:
+    return {
+        (r.company_id, r.user_id, r.day, r.type, r.status): [sign * r.count, sign * int(r.call_duration_sum)]
+        for r in conn.execute(_grouped_select(*where)).all()
+    }
+
+
+def add_activities(conn, rows) -> None:
+    """Call after inserting activities outside the ORM (rows: mappings of watched fields)."""
+    deltas: Deltas = {}
+    for row in rows:
+        _contribution(deltas, row, +1)
+    apply_deltas(conn, deltas)
+
+
+def remove_matching(conn, *where) -> None:
+    """Call before a Core DELETE of the activities matching `where` (archival)."""
+    apply_deltas(conn, _grouped_deltas(conn, *where, sign=-1))
+
+
+def remove_for_leads(conn, lead_ids) -> None:
+    """Call before deleting leads: their activities go with the DB cascade."""
+    if lead_ids:
+        remove_matching(conn, Activity.lead_id.in_(list(lead_ids)))
+
+
+def rebuild_rollup(conn, company_id=None) -> int:
+    """Recompute from activities with one INSERT ... SELECT ... GROUP BY. Caller commits."""
+    table = ActivityDailyRollup.__table__
+    where = [Activity.company_id == company_id] if company_id else []
+    conn.execute(delete(table).where(table.c.company_id == company_id) if company_id else delete(table))
+    result = conn.execute(
+        insert(table).from_select(
+            ["company_id", "user_id", "day", "type", "status", "count", "call_duration_sum"],
+            _grouped_select(*where),
+        )
+    )
+    return result.rowcount
+
+
+# ---------------------------------------------------------------------------
+# Query API
+# ---------------------------------------------------------------------------
+def rollup_series(
+    db,
+    company_id,
+    date_from: date,
+    date_to: date,
+    bucket: str = "day",
+    group_by: Sequence[str] = (),
+    user_id=None,
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Counts and call-duration sums per bucket (and optional type/status/user)."""
+    r = ActivityDailyRollup
+    bucket_expr = (r.day if bucket == "day" else cast(func.date_trunc(bucket, r.day), Date)).label("bucket")
+    group_cols = [getattr(r, g) for g in group_by]
+
+    conds = [r.company_id == company_id, r.day >= date_from, r.day <= date_to]
+    if user_id:
+        conds.append(r.user_id == user_id)
+    if type:
+        conds.append(r.type == type)
+    if status:
+        conds.append(r.status == status)
+
+    stmt = (
+        select(
+            bucket_expr,
+            *group_cols,
+            func.sum(r.count).label("count"),
+            func.sum(r.call_duration_sum).label("call_duration_sum"),
+        )
+        .where(*conds)
+        .group_by(bucket_expr, *group_cols)
+        .having(func.sum(r.count) > 0)
+        .order_by(bucket_expr, *group_cols)
+    )
+    return [
+        {**dict(row), "count": int(row["count"]), "call_duration_sum": int(row["call_duration_sum"] or 0)}
+        for row in db.execute(stmt).mappings().all()
+    ]
+
+
+# ---------------------------------------------------------------------------
+# 🔄 ORM events (same transaction as the activity write)
+# ---------------------------------------------------------------------------
+def _current(target) -> Dict:
+    unloaded = inspect(target).unloaded
+    # created_at comes back with the INSERT (Activity has eager_defaults)
+    return {f: (None if f in unloaded else getattr(target, f)) for f in _WATCHED}
+
+
+@event.listens_for(Activity, "after_insert")
+def _activity_inserted(mapper, connection, target):
+    deltas: Deltas = {}
+    _contribution(deltas, _current(target), +1)
+    apply_deltas(connection, deltas)
+
+
+@event.listens_for(Activity, "before_update")
+def _activity_updating(mapper, connection, target):
+    change = value_change(connection, target, _WATCHED)
+    if change is None:
+        return
+    deltas: Deltas = {}
+    _contribution(deltas, change[0], -1)
+    _contribution(deltas, change[1], +1)
+    apply_deltas(connection, deltas)
+
+
+@event.listens_for(Activity, "before_delete")
+def _activity_deleting(mapper, connection, target):
+    deltas = _grouped_deltas(connection, Activity.id.in_(follow_up_chain(target)), sign=-1)
+    _contribution(deltas, _current(target), -1)
+    apply_deltas(connection, deltas)
+
+
+if __name__ == "__main__":
+    import sys
+    import uuid
+
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        target = uuid.UUID(sys.argv[1]) if len(sys.argv) > 1 else None
+        rows = rebuild_rollup(session, target)
+        session.commit()
+        print(f"✅ activity_daily_rollup rebuilt: {rows} rows")
+    finally:
+        session.close()
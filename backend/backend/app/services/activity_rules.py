@@ -0,0 +1,199 @@
+# ================================
+# activity_rules.py — outbox + worker for next-task rules
+# ================================
+# Completing an activity only writes one activity_outbox row in the same
+# transaction (mapper events below; bulk inserts call enqueue_completed).
+# A background job (services/scheduler) drains the outbox in batches:
+#
+#   SELECT ... FOR UPDATE SKIP LOCKED        (safe with several app workers)
+#   → match each event against the company's compiled rule table
+#   → one multi-row INSERT of the follow-ups (idempotent per rule + parent)
+#   → mark the events processed, commit
+#     (a failing batch is retried event by event; only the bad event is marked)
+#
+#   python -m app.services.activity_rules      # drain once from a shell / cron
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.activities import Activity
+from app.models.activity_rule import ActivityOutbox, ActivityRule
+from app.services import activity_batch
+from app.services.activity_counters import value_change
+from app.services.activity_logic import DEFAULT_TABLE, compile_rules, follow_up_row, match
+
+log = logging.getLogger("uvicorn")
+
+COMPLETED_STATUS = "Completed"
+MAX_ATTEMPTS = 5
+
+
+# ---------------------------------------------------------------------------
+# Enqueue (request path: one INSERT, no rule evaluation)
+# ---------------------------------------------------------------------------
+def enqueue_completed(conn, rows) -> None:
+    """Outbox events for inserted rows (mappings with id, company_id, status) already Completed."""
+    events = [
+        {"company_id": r["company_id"], "activity_id": r["id"], "event": "completed"}
+        for r in rows
+        if r["status"] == COMPLETED_STATUS
+    ]
+    if events:
+        conn.execute(insert(ActivityOutbox.__table__), events)
+
+
+@event.listens_for(Activity, "after_insert")
+def _activity_inserted(mapper, connection, target):
+    if target.status == COMPLETED_STATUS:
+        enqueue_completed(connection, [{"company_id": target.company_id, "id": target.id, "status": target.status}])
+
+
+@event.listens_for(Activity, "before_update")
+def _activity_updating(mapper, connection, target):
+    change = value_change(connection, target, ("status",))
+    if change is None:
+        return
+    old, new = change
+    if new["status"] == COMPLETED_STATUS and old["status"] != COMPLETED_STATUS:
+        enqueue_completed(connection, [{"company_id": target.company_id, "id": target.id, "status": new["status"]}])
+
+
+# ---------------------------------------------------------------------------
+# Compiled rule tables (recompiled only when a company's rules change)
+# ---------------------------------------------------------------------------
+_tables: Dict = {}  # company_id -> (stamp, RuleTable)
+
+
+def invalidate(company_id=None) -> None:
+    if company_id is None:
+        _tables.clear()
+    else:
+        _tables.pop(company_id, None)
+
+
+def rule_tables(db: Session, company_ids: Iterable) -> Dict:
+    """{company_id: RuleTable}; one stamp query, rule rows only for stale companies."""
+    company_ids = set(company_ids)
+    stamps: Dict = {
+        company_id: (count, updated)
+        for company_id, count, updated in db.execute(
+            select(ActivityRule.company_id, func.count(), func.max(ActivityRule.updated_at))
+            .where(ActivityRule.company_id.in_(company_ids))
+            .group_by(ActivityRule.company_id)
+        ).all()
+    }
+    stale = [c for c in company_ids if c in stamps and _tables.get(c, (None,))[0] != stamps[c]]
+    if stale:
+        rules: Dict = {c: [] for c in stale}
+        for rule in db.scalars(
+            select(ActivityRule).where(ActivityRule.company_id.in_(stale), ActivityRule.enabled.is_(True))
+        ):
+            rules[rule.company_id].append(rule)
+        for company_id, company_rules in rules.items():
+            _tables[company_id] = (stamps[company_id], compile_rules(company_rules))
+
+    # No rows at all = defaults; rows that are all disabled = no auto tasks
+    return {c: _tables[c][1] if c in stamps else DEFAULT_TABLE for c in company_ids}
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+def _claim(db: Session, limit: int):
+    # Outer join: events whose activity was deleted / archived are just closed
+    o, a = ActivityOutbox, Activity
+    return db.execute(
+        select(
+            o.id.label("outbox_id"),
+            a.id, a.company_id, a.lead_id, a.type, a.outcome, a.title, a.assigned_to, a.created_by,
+        )
+        .outerjoin(a, a.id == o.activity_id)
+        .where(o.processed_at.is_(None), o.attempts < MAX_ATTEMPTS)
+        .order_by(o.id)
+        .limit(limit)
+        .with_for_update(of=o, skip_locked=True)
+    ).mappings().all()
+
+
+def _follow_up(db: Session, events, now: datetime) -> int:
+    """Insert the follow-ups these events schedule and close the events. Returns follow-ups created."""
+    live = [e for e in events if e["id"] is not None]
+    tables = rule_tables(db, {e["company_id"] for e in live})
+    rows = [
+        follow_up_row(e, rule, now)
+        for e in live
+        for rule in match(tables[e["company_id"]], e["type"], e["outcome"])
+    ]
+    created = activity_batch.insert_activities(db, rows) if rows else []
+    db.execute(
+        update(ActivityOutbox)
+        .where(ActivityOutbox.id.in_([e["outbox_id"] for e in events]))
+        .values(processed_at=now, attempts=ActivityOutbox.attempts + 1)
+    )
+    return len(created)
+
+
+def process_outbox(db: Session, limit: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Handle one batch of pending events. Returns (events, follow-ups created).
+    The batch runs in one savepoint; if it fails, each event gets its own, so
+    only the failing event records attempts / last_error and the rest go through.
+    """
+    limit = limit or settings.RULE_WORKER_BATCH
+    events = _claim(db, limit)
+    if not events:
+        db.rollback()
+        return 0, 0
+
+    now = datetime.utcnow()
+    try:
+        with db.begin_nested():
+            created = _follow_up(db, events, now)
+    except Exception:
+        created = 0
+        for e in events:
+            try:
+                with db.begin_nested():
+                    created += _follow_up(db, [e], now)
+            except Exception as err:
+                log.warning("⚠️ activity outbox event %s failed: %s", e["outbox_id"], err)
+                db.execute(
+                    update(ActivityOutbox)
+                    .where(ActivityOutbox.id == e["outbox_id"])
+                    .values(attempts=ActivityOutbox.attempts + 1, last_error=str(err)[:2000])
+                )
+    db.commit()
+    return len(events), created
+
+
+def drain(max_batches: int = 100) -> int:
+    """Process batches until the outbox is empty (or max_batches). Own session."""
+    from app.db.session import SessionLocal
+
+    total = 0
+    db = SessionLocal()
+    try:
+        for _ in range(max_batches):
+            n, _created = process_outbox(db)
+            total += n
+            if n < settings.RULE_WORKER_BATCH:
+                break
+    finally:
+        db.close()
+    return total
+
+
+def run_worker() -> None:
+    """Scheduler job (services/scheduler): drain, never raise."""
+    try:
+        drain()
+    except Exception as e:  # failing events record their own last_error
+        log.warning("⚠️ activity rule worker: %s", e)
+
+
+if __name__ == "__main__":
+    print(f"✅ activity outbox drained: {drain()} events")
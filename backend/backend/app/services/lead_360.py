@@ -0,0 +1,90 @@
+from typing import Any, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.orm import Session, lazyload, noload
+
+from app.models.activities import Activity
+from app.models.leads import Lead
+from app.models.order import Order
+from app.models.quotation import Quotation
+from app.models.tasks import Task, TaskStatus
+from app.schemas.activities import ActivityOut
+from app.schemas.leads import LeadOut
+from app.schemas.tasks import TaskOut
+
+QUOTATION_COLUMNS = (
+    Quotation.id, Quotation.item_name, Quotation.quantity, Quotation.rate, Quotation.total,
+    Quotation.status, Quotation.remarks, Quotation.created_at, Quotation.updated_at,
+)
+ORDER_COLUMNS = (
+    Order.id, Order.quotation_id, Order.total_value, Order.status, Order.remarks,
+    Order.created_at, Order.updated_at,
+)
+
+
+def load_lead_full(
+    db: Session,
+    company_id,
+    lead_id,
+    activities: int = 20,
+    tasks: int = 50,
+    quotations: int = 20,
+    orders: int = 20,
+) -> Optional[Dict[str, Any]]:
+    """
+    Lead plus its recent activities, open tasks, quotations and orders.
+
+    One query per collection, each ordered and LIMITed in SQL, so a lead with
+    10k activities still reads only the newest N. Relationships on the child
+    rows are not eagerly joined; Activity.lead resolves from the identity map.
+    """
+    lead = (
+        db.query(Lead)
+        # LeadOut reads .activities/.tasks; the limited queries below replace them
+        .options(noload(Lead.activities), noload(Lead.tasks))
+        .filter(Lead.id == lead_id, Lead.company_id == company_id)
+        .first()
+    )
+    if not lead:
+        return None
+
+    recent_activities = (
+        db.query(Activity)
+        .options(lazyload("*"))
+        .filter(Activity.lead_id == lead.id)
+        .order_by(Activity.created_at.desc(), Activity.id.desc())
+        .limit(activities)
+        .all()
+    )
+    open_tasks = (
+        db.query(Task)
+        .options(lazyload("*"))
+        .filter(Task.lead_id == lead.id, Task.status != TaskStatus.done)
+        .order_by(Task.due_date.asc().nulls_last(), Task.created_at.desc())
+        .limit(tasks)
+        .all()
+    )
+    quotation_rows = db.execute(
+        select(*QUOTATION_COLUMNS)
+        .where(Quotation.lead_id == lead.id)
+        .order_by(Quotation.created_at.desc())
+        .limit(quotations)
+    ).mappings().all()
+    order_rows = db.execute(
+        select(*ORDER_COLUMNS)
+        .where(Order.lead_id == lead.id)
+        .order_by(Order.created_at.desc())
+        .limit(orders)
+    ).mappings().all()
+
+    # The schemas still carry v1 `orm_mode`, which pydantic 2 ignores
+    lead_out = LeadOut.model_validate(lead, from_attributes=True).model_copy(update={"activities": None, "tasks": None})
+    return jsonable_encoder({
+        "lead": lead_out,
+        "activities": [ActivityOut.model_validate(a, from_attributes=True) for a in recent_activities],
+        "open_tasks": [TaskOut.model_validate(t, from_attributes=True) for t in open_tasks],
+        "quotations": [dict(r) for r in quotation_rows],
+        "orders": [dict(r) for r in order_rows],
+        "limits": {"activities": activities, "tasks": tasks, "quotations": quotations, "orders": orders},
+    })
@@ -0,0 +1,78 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.dashboard_cache import mark_changed
+from app.models.leads import Lead
+from app.services.activity_counters import remove_for_leads
+from app.services.activity_rollup import remove_for_leads as remove_rollup_for_leads
+
+BULK_CHUNK = 5000
+
+
+def lead_filters(
+    stage: Optional[str] = None,
+    lead_source: Optional[str] = None,
+    city: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    is_active: Optional[bool] = None,
+) -> list:
+    """WHERE clauses shared by export and bulk delete."""
+    conds = []
+    if stage:
+        conds.append(Lead.stage == stage)
+    if lead_source:
+        conds.append(Lead.lead_source == lead_source)
+    if city:
+        conds.append(func.lower(Lead.city) == city.strip().lower())
+    if date_from:
+        conds.append(Lead.created_at >= date_from)
+    if date_to:
+        conds.append(Lead.created_at <= date_to)
+    if is_active is not None:
+        conds.append(Lead.is_active == is_active)
+    return conds
+
+
+def _matching_ids(db: Session, company_id, conds: list) -> List:
+    return list(db.execute(
+        select(Lead.id).where(Lead.company_id == company_id, *conds).order_by(Lead.id)
+    ).scalars())
+
+
+def bulk_delete_leads(db: Session, company_id, conds: list) -> int:
+    """
+    Core DELETE in id chunks, each committed on its own. Quotations, orders,
+    tasks and activities go with the FK ON DELETE CASCADE; nothing is loaded.
+    Activity counters and the daily rollup are decremented in the same transaction.
+    """
+    deleted = 0
+    ids = _matching_ids(db, company_id, conds)
+    for start in range(0, len(ids), BULK_CHUNK):
+        chunk = ids[start:start + BULK_CHUNK]
+        remove_for_leads(db, chunk)
+        remove_rollup_for_leads(db, chunk)
+        deleted += db.execute(
+            delete(Lead.__table__).where(
+                Lead.__table__.c.company_id == company_id,
+                Lead.__table__.c.id.in_(chunk),
+            )
+        ).rowcount
+        mark_changed(db, (company_id,))
+        db.commit()
+    return deleted
+
+
+def bulk_archive_leads(db: Session, company_id, conds: list) -> int:
+    """Soft delete: one UPDATE setting is_active = false."""
+    archived = db.execute(
+        update(Lead.__table__)
+        .where(Lead.__table__.c.company_id == company_id, *conds)
+        .values(is_active=False, updated_at=datetime.utcnow())
+    ).rowcount
+    mark_changed(db, (company_id,))
+    db.commit()
+    return archived
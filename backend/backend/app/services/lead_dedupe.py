@@ -0,0 +1,338 @@
+# ================================
+# lead_dedupe.py — fuzzy duplicate-lead detection
+# ================================
+# Exact email/phone checks live in routers/leads.py. This module finds
+# near-duplicates ("Royal Look Salon" vs "Royal Look Saloon, Mysuru"):
+#
+#   1. Blocking   — only leads sharing a pincode or a phonetic name key are
+#                   compared, so work is sum(block²) instead of n².
+#   2. Scoring    — business names become hashed character-trigram vectors;
+#                   a block is scored with one matrix product (cosine), then
+#                   contact / pincode / city agreement is added vectorised.
+#   3. Persisting — pairs above the threshold are upserted into
+#                   lead_duplicate_candidates (open pairs are re-scored,
+#                   dismissed ones are left alone).
+#
+#   python -m app.services.lead_dedupe [company_id ...]
+import re
+import sys
+import time
+import uuid
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.lead_duplicate import LeadDuplicateCandidate
+from app.models.leads import Lead
+from app.utils.contact import normalize_business_name
+
+VECTOR_DIM = 512           # hashed trigram buckets
+MAX_BLOCK = 2000           # larger blocks are split on a finer key
+ROW_CHUNK = 512            # rows per matrix product inside a block
+MIN_NAME_SCORE = 0.6       # cheap prefilter before the full score
+SCORE_THRESHOLD = 0.82
+WRITE_CHUNK = 1000
+BLOCK_KEY_LEN = 40          # lead_duplicate_candidates.block_key
+
+# Score weights (sum to 1). When neither side has contact data the contact
+# weight moves onto the name so such pairs are not penalised.
+W_NAME, W_CONTACT, W_PINCODE, W_CITY = 0.70, 0.15, 0.10, 0.05
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+_COLUMNS = (
+    Lead.id,
+    Lead.business_name,
+    Lead.contact_person,
+    Lead.city,
+    Lead.pincode,
+    Lead.name_key,
+    Lead.email_normalized,
+    Lead.phone_normalized,
+)
+
+
+# ---------------------------------------------------------------------------
+# Columnar lead table
+# ---------------------------------------------------------------------------
+def _key(value) -> Optional[str]:
+    if not value:
+        return None
+    k = _NON_ALNUM.sub(" ", str(value).lower()).strip()
+    return k or None
+
+
+class _LeadTable:
+    """Lead rows as parallel arrays; categorical fields factorised to int codes (-1 = missing)."""
+
+    def __init__(self, rows):
+        self.ids = [r.id for r in rows]
+        self.names = [normalize_business_name(r.business_name, r.city) for r in rows]
+        self.display = [r.business_name for r in rows]
+        self.pincodes = [(r.pincode or "").strip() or None for r in rows]
+        self.name_keys = [r.name_key for r in rows]
+        self.city = self._codes(_key(r.city) for r in rows)
+        self.pincode = self._codes(self.pincodes)
+        self.contact = self._codes(_key(r.contact_person) for r in rows)
+        self.email = self._codes(r.email_normalized for r in rows)
+        self.phone = self._codes(r.phone_normalized for r in rows)
+        self._grams: List[Optional[np.ndarray]] = [None] * len(rows)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def _codes(values) -> np.ndarray:
+        seen: Dict[str, int] = {}
+        return np.fromiter(
+            (seen.setdefault(v, len(seen)) if v else -1 for v in values), dtype=np.int64
+        )
+
+    def grams(self, i: int) -> np.ndarray:
+        g = self._grams[i]
+        if g is None:
+            s = f"  {self.names[i]} "
+            g = np.fromiter(
+                (zlib.crc32(s[k:k + 3].encode()) % VECTOR_DIM for k in range(len(s) - 2)),
+                dtype=np.int64,
+            )
+            self._grams[i] = g
+        return g
+
+    def vectors(self, idx: np.ndarray) -> np.ndarray:
+        """L2-normalised trigram count vectors for the given rows (float32)."""
+        m = np.zeros((len(idx), VECTOR_DIM), dtype=np.float32)
+        for row, i in enumerate(idx):
+            np.add.at(m[row], self.grams(i), 1.0)
+        norms = np.linalg.norm(m, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return m / norms
+
+
+# ---------------------------------------------------------------------------
+# Blocking
+# ---------------------------------------------------------------------------
+def _block_key(key: str) -> str:
+    """Fit block_key: long keys (free-text pincodes) keep a prefix plus a crc32."""
+    if len(key) <= BLOCK_KEY_LEN:
+        return key
+    return f"{key[:BLOCK_KEY_LEN - 9]}~{zlib.crc32(key.encode('utf-8')):08x}"
+
+
+def _blocks(table: _LeadTable):
+    """Yield (block_key, row indices). Oversized blocks are split once on a finer key."""
+    blocks = defaultdict(list)
+    for i in range(len(table)):
+        if table.pincodes[i]:
+            blocks[f"pincode:{table.pincodes[i]}"].append(i)
+        if table.name_keys[i]:
+            blocks[f"name:{table.name_keys[i]}"].append(i)
+
+    for key, idx in blocks.items():
+        if len(idx) < 2:
+            continue
+        if len(idx) <= MAX_BLOCK:
+            yield _block_key(key), np.asarray(idx)
+            continue
+        # pincode blocks split by name key; name blocks split by pincode
+        sub = defaultdict(list)
+        for i in idx:
+            finer = table.name_keys[i] if key.startswith("pincode:") else table.pincodes[i]
+            sub[finer].append(i)
+        for finer, sub_idx in sub.items():
+            if finer and len(sub_idx) > 1:
+                yield _block_key(f"{key}:{finer}"), np.asarray(sub_idx)
+
+
+# ---------------------------------------------------------------------------
+# Vectorised scoring
+# ---------------------------------------------------------------------------
+def _combine(table: _LeadTable, a: np.ndarray, b: np.ndarray, name_score: np.ndarray) -> np.ndarray:
+    """Full score for index pairs (a[k], b[k]) given their name cosine."""
+    def same(codes):
+        return (codes[a] >= 0) & (codes[a] == codes[b])
+
+    def both(codes):
+        return (codes[a] >= 0) & (codes[b] >= 0)
+
+    contact_known = both(table.contact) | both(table.email) | both(table.phone)
+    contact_match = same(table.contact) | same(table.email) | same(table.phone)
+    name_w = np.where(contact_known, W_NAME, W_NAME + W_CONTACT)
+    return (
+        name_w * name_score
+        + W_CONTACT * contact_match
+        + W_PINCODE * same(table.pincode)
+        + W_CITY * same(table.city)
+    )
+
+
+def _score_block(table: _LeadTable, idx: np.ndarray):
+    """Yield (i, j, score, name_score) for pairs in one block above the threshold."""
+    vecs = table.vectors(idx)
+    n = len(idx)
+    for start in range(0, n, ROW_CHUNK):
+        sims = vecs[start:start + ROW_CHUNK] @ vecs.T
+        # upper triangle only: each pair once, no self-pairs
+        rows, cols = np.nonzero(sims >= MIN_NAME_SCORE)
+        rows_abs = rows + start
+        keep = cols > rows_abs
+        rows, cols, rows_abs = rows[keep], cols[keep], rows_abs[keep]
+        if not len(rows):
+            continue
+        name_score = sims[rows, cols]
+        a, b = idx[rows_abs], idx[cols]
+        score = _combine(table, a, b, name_score)
+        hit = score >= SCORE_THRESHOLD
+        yield from zip(a[hit], b[hit], score[hit], name_score[hit])
+
+
+def _pair_row(table: _LeadTable, company_id, i, j, score, name_score, block_key, now) -> Dict[str, Any]:
+    lead_id, dup_id = sorted((table.ids[i], table.ids[j]))
+    return {
+        "id": uuid.uuid4(),
+        "company_id": company_id,
+        "lead_id": lead_id,
+        "duplicate_lead_id": dup_id,
+        "score": round(float(score), 4),
+        "name_score": round(float(name_score), 4),
+        "block_key": block_key,
+        "status": "open",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _save_pairs(db: Session, rows: List[Dict[str, Any]]) -> None:
+    for start in range(0, len(rows), WRITE_CHUNK):
+        stmt = pg_insert(LeadDuplicateCandidate).values(rows[start:start + WRITE_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["lead_id", "duplicate_lead_id"],
+            set_={
+                "score": stmt.excluded.score,
+                "name_score": stmt.excluded.name_score,
+                "block_key": stmt.excluded.block_key,
+                "updated_at": stmt.excluded.updated_at,
+            },
+            where=LeadDuplicateCandidate.status == "open",
+        )
+        db.execute(stmt)
+
+
+# ---------------------------------------------------------------------------
+# Batch scan (whole tenant)
+# ---------------------------------------------------------------------------
+def run_duplicate_scan(db: Session, company_id) -> Dict[str, Any]:
+    """Score every blocked pair for one tenant and upsert candidate pairs."""
+    started = time.perf_counter()
+    rows = db.execute(select(*_COLUMNS).where(Lead.company_id == company_id)).all()
+    table = _LeadTable(rows)
+
+    best: Dict[tuple, tuple] = {}
+    blocks = comparisons = 0
+    for block_key, idx in _blocks(table):
+        blocks += 1
+        comparisons += len(idx) * (len(idx) - 1) // 2
+        for i, j, score, name_score in _score_block(table, idx):
+            pair = (i, j) if i < j else (j, i)
+            if pair not in best or score > best[pair][0]:
+                best[pair] = (score, name_score, block_key)
+
+    now = datetime.utcnow()
+    out = [
+        _pair_row(table, company_id, i, j, score, name_score, block_key, now)
+        for (i, j), (score, name_score, block_key) in best.items()
+    ]
+    _save_pairs(db, out)
+    db.commit()
+
+    return {
+        "company_id": str(company_id),
+        "leads": len(table),
+        "blocks": blocks,
+        "comparisons": comparisons,
+        "pairs": len(out),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def run_duplicate_scan_job(company_id) -> Dict[str, Any]:
+    """Background-task entry point: owns its session."""
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return run_duplicate_scan(db, company_id)
+    finally:
+        db.close()
+
+
+# ---------------------------------------------------------------------------
+# On-create check (one lead against its blocks)
+# ---------------------------------------------------------------------------
+def find_candidates_for_lead(db: Session, lead: Lead, limit: int = 5) -> List[Dict[str, Any]]:
+    """
+    Score a freshly saved lead against leads sharing its pincode or name key,
+    persist matching pairs and return the best few for the API response.
+    """
+    conds = []
+    if lead.pincode and lead.pincode.strip():
+        conds.append(Lead.pincode == lead.pincode)
+    if lead.name_key:
+        conds.append(Lead.name_key == lead.name_key)
+    if not conds:
+        return []
+
+    others = db.execute(
+        select(*_COLUMNS)
+        .where(Lead.company_id == lead.company_id, Lead.id != lead.id, or_(*conds))
+        .limit(MAX_BLOCK)
+    ).all()
+    if not others:
+        return []
+
+    me = db.execute(select(*_COLUMNS).where(Lead.id == lead.id)).one()
+    table = _LeadTable([me, *others])
+    vecs = table.vectors(np.arange(len(table)))
+    name_score = vecs[1:] @ vecs[0]
+    b = np.nonzero(name_score >= MIN_NAME_SCORE)[0] + 1
+    if not len(b):
+        return []
+    a = np.zeros_like(b)
+    name_score = name_score[b - 1]
+    score = _combine(table, a, b, name_score)
+    hit = score >= SCORE_THRESHOLD
+    if not hit.any():
+        return []
+
+    now = datetime.utcnow()
+    block_key = _block_key(f"pincode:{table.pincodes[0]}" if table.pincodes[0] else f"name:{table.name_keys[0]}")
+    order = np.argsort(-score[hit])
+    matches = [(int(j), float(s), float(ns)) for j, s, ns in zip(b[hit], score[hit], name_score[hit])]
+    matches = [matches[k] for k in order]
+
+    _save_pairs(db, [_pair_row(table, lead.company_id, 0, j, s, ns, block_key, now) for j, s, ns in matches])
+    db.commit()
+
+    return [
+        {"lead_id": table.ids[j], "business_name": table.display[j], "score": round(s, 4)}
+        for j, s, _ in matches[:limit]
+    ]
+
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+    from app.models.company_profile import CompanyProfile
+
+    session = SessionLocal()
+    try:
+        targets = sys.argv[1:] or [str(cid) for (cid,) in session.execute(select(CompanyProfile.id)).all()]
+        for cid in targets:
+            print(f"⚙️ {run_duplicate_scan(session, uuid.UUID(cid))}")
+    finally:
+        session.close()
@@ -0,0 +1,179 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.dashboard_cache import mark_changed
+from app.models.leads import Lead
+from app.schemas.leads import LeadCreate
+from app.utils.contact import name_key, normalize_email, normalize_phone
+from app.utils.geo import geo_cell
+
+CHUNK_SIZE = 1000
+MAX_ROWS = 100_000
+
+_LEAD_FIELDS = set(LeadCreate.model_fields)
+# Common spreadsheet headers -> Lead columns
+_ALIASES = {
+    "name": "business_name",
+    "business": "business_name",
+    "company": "business_name",
+    "contact": "contact_person",
+    "mobile": "phone",
+    "phone_number": "phone",
+    "source": "lead_source",
+    "pin": "pincode",
+    "zip": "pincode",
+}
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+def parse_records(raw: bytes, filename: str) -> List[Dict[str, Any]]:
+    """CSV (header row) or JSON (array of objects / NDJSON) -> list of dicts."""
+    text = raw.decode("utf-8-sig", errors="replace")
+    name = (filename or "").lower()
+
+    if name.endswith(".json") or name.endswith(".ndjson") or text.lstrip().startswith(("[", "{")):
+        stripped = text.strip()
+        if stripped.startswith("["):
+            records = json.loads(stripped)
+        else:
+            records = [json.loads(line) for line in stripped.splitlines() if line.strip()]
+        if not all(isinstance(r, dict) for r in records):
+            raise ValueError("JSON import must be a list of objects")
+    else:
+        records = list(csv.DictReader(io.StringIO(text)))
+
+    if len(records) > MAX_ROWS:
+        raise ValueError(f"Too many rows ({len(records)}); the limit is {MAX_ROWS}")
+    return records
+
+
+def _clean(record: Dict[str, Any]) -> Dict[str, Any]:
+    out = {}
+    for key, value in record.items():
+        if key is None:
+            continue
+        k = str(key).strip().lower().replace(" ", "_")
+        k = _ALIASES.get(k, k)
+        if k not in _LEAD_FIELDS:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if value == "":
+                value = None
+        out[k] = value
+    return out
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# ---------------------------------------------------------------------------
+# Set-based duplicate resolution
+# ---------------------------------------------------------------------------
+def _existing_identities(db: Session, company_id, emails: set, phones: set) -> Tuple[set, set]:
+    """One indexed query per chunk against the normalised identity columns."""
+    if not emails and not phones:
+        return set(), set()
+
+    conds = []
+    if emails:
+        conds.append(Lead.email_normalized.in_(emails))
+    if phones:
+        conds.append(Lead.phone_normalized.in_(phones))
+
+    rows = db.execute(
+        select(Lead.email_normalized, Lead.phone_normalized).where(Lead.company_id == company_id, or_(*conds))
+    ).all()
+    return {e for e, _ in rows if e in emails}, {p for _, p in rows if p in phones}
+
+
+# ---------------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------------
+def import_leads(db: Session, records: List[Dict[str, Any]], company_id, created_by) -> Dict[str, Any]:
+    """
+    Validate, normalise and de-duplicate (within the file and against the
+    tenant), then insert accepted rows with one multi-row INSERT per chunk.
+    Each chunk is committed on its own so a late failure keeps earlier work.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+    seen_emails: Dict[str, int] = {}
+    seen_phones: Dict[str, int] = {}
+    accepted = 0
+
+    for chunk in _chunks(list(enumerate(records, start=1)), CHUNK_SIZE):
+        candidates = []
+        for row_no, record in chunk:
+            try:
+                lead = LeadCreate(**_clean(record))
+            except ValidationError as e:
+                err = e.errors()[0]
+                field = ".".join(str(x) for x in err.get("loc", ())) or "row"
+                results[row_no - 1] = {"row": row_no, "status": "rejected", "reason": f"{field}: {err.get('msg')}"}
+                continue
+
+            email_n, phone_n = normalize_email(lead.email), normalize_phone(lead.phone)
+            dup_of = seen_emails.get(email_n) if email_n else None
+            dup_of = dup_of or (seen_phones.get(phone_n) if phone_n else None)
+            if dup_of:
+                results[row_no - 1] = {"row": row_no, "status": "rejected", "reason": f"duplicate of row {dup_of} in file"}
+                continue
+            if email_n:
+                seen_emails[email_n] = row_no
+            if phone_n:
+                seen_phones[phone_n] = row_no
+            candidates.append((row_no, lead, email_n, phone_n))
+
+        found_emails, found_phones = _existing_identities(
+            db,
+            company_id,
+            {c[2] for c in candidates if c[2]},
+            {c[3] for c in candidates if c[3]},
+        )
+
+        now = datetime.utcnow()
+        rows = []
+        for row_no, lead, email_n, phone_n in candidates:
+            if (email_n and email_n in found_emails) or (phone_n and phone_n in found_phones):
+                results[row_no - 1] = {"row": row_no, "status": "rejected", "reason": "lead with this phone or email already exists"}
+                continue
+            new_id = uuid.uuid4()
+            rows.append({
+                **lead.model_dump(),
+                "id": new_id,
+                "email_normalized": email_n,
+                "phone_normalized": phone_n,
+                "name_key": name_key(lead.business_name, lead.city),
+                "geo_cell": geo_cell(lead.lat, lead.lng),
+                "company_id": company_id,
+                "created_by": created_by,
+                "created_at": now,
+                "updated_at": now,
+            })
+            results[row_no - 1] = {"row": row_no, "status": "accepted", "id": str(new_id)}
+
+        if rows:
+            # executemany -> batched multi-row INSERT ... VALUES (...), (...)
+            db.execute(insert(Lead), rows)
+            mark_changed(db, (company_id,))
+            db.commit()
+            accepted += len(rows)
+
+    return {
+        "total": len(records),
+        "accepted": accepted,
+        "rejected": len(records) - accepted,
+        "results": results,
+    }
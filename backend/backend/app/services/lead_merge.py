@@ -0,0 +1,135 @@
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import column, delete, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.core.dashboard_cache import mark_changed
+from app.models.activities import Activity
+from app.models.leads import Lead
+from app.models.order import Order
+from app.models.quotation import Quotation
+from app.models.tasks import Task
+
+MAX_MERGE_LEADS = 5000
+
+# Child tables re-parented from loser to survivor
+CHILD_TABLES = {
+    "activities": Activity.__table__,
+    "tasks": Task.__table__,
+    "quotations": Quotation.__table__,
+    "orders": Order.__table__,
+}
+
+# Survivor fields filled from a loser when blank on the survivor
+FILL_FIELDS = (
+    "contact_person", "email", "phone", "country", "state", "city", "pincode",
+    "lat", "lng", "lead_source", "next_action", "notes",
+)
+
+
+class MergeError(ValueError):
+    pass
+
+
+def _resolve(merges: List[Tuple[UUID, List[UUID]]]) -> Dict[UUID, UUID]:
+    """
+    (survivor, [losers]) groups -> {loser: final survivor}. A survivor that is
+    itself merged away elsewhere in the batch is followed to its own survivor.
+    """
+    mapping: Dict[UUID, UUID] = {}
+    for survivor, losers in merges:
+        for loser in losers:
+            if loser == survivor:
+                raise MergeError(f"Lead {loser} cannot be merged into itself")
+            if loser in mapping and mapping[loser] != survivor:
+                raise MergeError(f"Lead {loser} is merged into more than one survivor")
+            mapping[loser] = survivor
+
+    for loser in list(mapping):
+        seen = {loser}
+        target = mapping[loser]
+        while target in mapping:
+            if target in seen:
+                raise MergeError(f"Merge cycle through lead {target}")
+            seen.add(target)
+            target = mapping[target]
+        mapping[loser] = target
+    return mapping
+
+
+def merge_leads(db: Session, company_id, merges: List[Tuple[UUID, List[UUID]]]) -> Dict[str, Any]:
+    """
+    Merge losers into survivors in one transaction:
+      1. one UPDATE per child table re-points lead_id (UPDATE ... FROM VALUES)
+      2. blank survivor fields are filled from the losers
+      3. losers are deleted with a single Core DELETE (nothing left to cascade)
+    """
+    mapping = _resolve(merges)
+    if not mapping:
+        raise MergeError("Nothing to merge")
+    if len(mapping) > MAX_MERGE_LEADS:
+        raise MergeError(f"At most {MAX_MERGE_LEADS} leads per merge call")
+
+    all_ids = set(mapping) | set(mapping.values())
+    found = set(db.execute(
+        select(Lead.id).where(Lead.company_id == company_id, Lead.id.in_(all_ids))
+    ).scalars())
+    missing = all_ids - found
+    if missing:
+        raise MergeError(f"Leads not found: {', '.join(sorted(str(m) for m in missing))}")
+
+    try:
+        survivor_ids = set(mapping.values())
+        pairs = values(
+            column("loser_id", PG_UUID(as_uuid=True)),
+            column("survivor_id", PG_UUID(as_uuid=True)),
+            name="merge_map",
+        ).data(list(mapping.items()))
+
+        moved = {}
+        for name, table in CHILD_TABLES.items():
+            if len(survivor_ids) == 1:
+                # Single survivor: UPDATE ... SET lead_id = :s WHERE lead_id IN (...)
+                stmt = update(table).where(table.c.lead_id.in_(mapping)).values(lead_id=next(iter(survivor_ids)))
+            else:
+                # Many pairs: UPDATE ... SET lead_id = m.survivor_id FROM (VALUES ...) m WHERE lead_id = m.loser_id
+                stmt = (
+                    update(table)
+                    .where(table.c.lead_id == pairs.c.loser_id)
+                    .values(lead_id=pairs.c.survivor_id)
+                )
+            moved[name] = db.execute(stmt).rowcount
+
+        # Fill survivor blanks (first non-empty loser value wins)
+        losers = db.execute(
+            select(Lead.id, *[getattr(Lead, f) for f in FILL_FIELDS]).where(Lead.id.in_(mapping))
+        ).all()
+        survivors = {
+            lead.id: lead
+            for lead in db.query(Lead).filter(Lead.id.in_(survivor_ids)).all()
+        }
+        for row in losers:
+            survivor = survivors[mapping[row.id]]
+            for f in FILL_FIELDS:
+                value = getattr(row, f)
+                if getattr(survivor, f) in (None, "") and value not in (None, ""):
+                    setattr(survivor, f, value)
+        db.flush()
+
+        deleted = db.execute(
+            delete(Lead.__table__).where(Lead.__table__.c.id.in_(mapping))
+        ).rowcount
+        mark_changed(db, (company_id,))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {
+        "merged": deleted,
+        "survivors": len(survivors),
+        "moved": moved,
+        "mapping": {str(k): str(v) for k, v in mapping.items()},
+    }
@@ -0,0 +1,99 @@
+# backend/app/services/list_views.py
+#
+# Column selects + row shaping for the hot list endpoints (activities, tasks).
+# Each endpoint reads only the columns its payload needs, as plain tuples,
+# and builds the output dicts directly; see app.utils.serializers.dumps.
+
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from app.models.activities import Activity
+from app.models.leads import Lead
+from app.models.tasks import Task
+from app.models.user import User
+
+Assignee = aliased(User, name="assignee")
+
+# ---------------------------------------------------------------------------
+# Activities (keys match ActivityOut, plus lead_name / assigned_to_name / when)
+# ---------------------------------------------------------------------------
+ACTIVITY_COLUMNS = (
+    Activity.id, Activity.lead_id, Activity.type, Activity.title, Activity.description,
+    Activity.status, Activity.due_date, Activity.completed_at, Activity.outcome,
+    Activity.next_task, Activity.next_task_date, Activity.priority, Activity.assigned_to,
+    Activity.source_channel, Activity.auto_generated, Activity.parent_activity_id,
+    Activity.meta, Activity.created_by, Activity.created_at, Activity.call_duration,
+    Activity.geo_lat, Activity.geo_long, Activity.verified_event, Activity.verification_type,
+    Activity.gps_verified, Activity.trust_score_impact, Activity.device_id, Activity.ai_sentiment,
+)
+_ACTIVITY_KEYS = tuple(c.key for c in ACTIVITY_COLUMNS)
+
+
+def activity_list_select():
+    return (
+        select(
+            *ACTIVITY_COLUMNS,
+            Lead.business_name.label("lead_business_name"),
+            Lead.contact_person.label("lead_contact_person"),
+            Assignee.full_name.label("assigned_to_name"),
+        )
+        .join(Lead, Lead.id == Activity.lead_id)
+        .outerjoin(Assignee, Assignee.id == Activity.assigned_to)
+    )
+
+
+def activity_rows(rows: Iterable[tuple]) -> List[Dict[str, Any]]:
+    n = len(_ACTIVITY_KEYS)
+    out = []
+    for r in rows:
+        d = dict(zip(_ACTIVITY_KEYS, r))
+        business_name, contact_person, assignee_name = r[n], r[n + 1], r[n + 2]
+        d["meta"] = d["meta"] or {}
+        d["trust_score_impact"] = d["trust_score_impact"] or 0
+        d["updated_at"] = None
+        d["when"] = d["due_date"]
+        d["lead"] = {"id": d["lead_id"], "business_name": business_name, "contact_person": contact_person}
+        d["lead_name"] = business_name
+        d["assigned_to_name"] = assignee_name
+        out.append(d)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Tasks (keys match TaskBase, plus id / lead_name / assigned_to_name)
+# ---------------------------------------------------------------------------
+TASK_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.due_date, Task.status, Task.priority,
+    Task.assigned_to, Task.lead_id, Task.created_at, Task.updated_at,
+)
+_TASK_KEYS = tuple(c.key for c in TASK_COLUMNS)
+
+
+def task_list_select():
+    return (
+        select(
+            *TASK_COLUMNS,
+            Lead.business_name.label("lead_name"),
+            Assignee.full_name.label("assigned_to_name"),
+        )
+        .join(Lead, Lead.id == Task.lead_id)
+        .outerjoin(Assignee, Assignee.id == Task.assigned_to)
+    )
+
+
+def task_rows(rows: Iterable[tuple]) -> List[Dict[str, Any]]:
+    n = len(_TASK_KEYS)
+    out = []
+    for r in rows:
+        d = dict(zip(_TASK_KEYS, r))
+        d["when"] = d.pop("due_date")
+        d["outcome"] = None
+        d["source_channel"] = None
+        d["auto_generated"] = False
+        d["parent_activity_id"] = None
+        d["lead_name"] = r[n]
+        d["assigned_to_name"] = r[n + 1]
+        out.append(d)
+    return out
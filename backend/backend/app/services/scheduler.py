@@ -0,0 +1,50 @@
+# ================================
+# scheduler.py — in-process background jobs (APScheduler)
+# ================================
+# Started from main.py on app startup. Every job is safe to run in several
+# app processes at once (SKIP LOCKED outbox claims, advisory-locked archival).
+import logging
+
+from app.core.config import settings
+
+try:
+    from apscheduler.schedulers.background import BackgroundScheduler
+except ImportError:  # pragma: no cover
+    BackgroundScheduler = None
+
+log = logging.getLogger("uvicorn")
+
+_scheduler = None
+
+
+def start_scheduler() -> None:
+    global _scheduler
+    if _scheduler is not None:
+        return
+    if BackgroundScheduler is None:
+        log.warning("⚠️ APScheduler not installed; background jobs disabled")
+        return
+
+    from app.services.activity_archive import run_maintenance
+    from app.services.activity_rules import run_worker
+
+    _scheduler = BackgroundScheduler(daemon=True)
+    if settings.RULE_WORKER_ENABLED:
+        _scheduler.add_job(
+            run_worker, "interval", seconds=settings.RULE_WORKER_INTERVAL_SECONDS,
+            id="activity_rules", max_instances=1, coalesce=True,
+        )
+    if settings.ACTIVITY_MAINTENANCE_ENABLED:
+        _scheduler.add_job(
+            run_maintenance, "cron", hour=2, minute=30,
+            id="activity_maintenance", max_instances=1, coalesce=True,
+        )
+    _scheduler.start()
+    log.warning("✅ Background jobs: %s", ", ".join(job.id for job in _scheduler.get_jobs()) or "none")
+
+
+def stop_scheduler() -> None:
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
@@ -0,0 +1,238 @@
+# ================================
+# upgrade_schema.py — idempotent DDL for existing databases
+# ================================
+# create_all() only creates missing tables. Columns and indexes added to
+# existing tables are applied here; every statement is safe to re-run.
+import os
+import sys
+
+from sqlalchemy import bindparam, text
+
+# ✅ Ensure Python recognizes backend/app as package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import Base, engine
+from app import models  # noqa: F401  (registers every table on Base.metadata)
+from app.models import activities  # noqa: F401
+from app.models.activities import SENTIMENT_EXPR
+from app.services.activity_partitions import ensure_partitions, is_partitioned
+from app.utils.contact import name_key, normalize_email, normalize_phone
+from app.utils.geo import geo_cell
+
+BACKFILL_BATCH = 5000
+
+# Run before backfills
+COLUMNS = [
+    # Normalised contact identity for duplicate checks
+    "ALTER TABLE leads ADD COLUMN IF NOT EXISTS email_normalized VARCHAR",
+    "ALTER TABLE leads ADD COLUMN IF NOT EXISTS phone_normalized VARCHAR(20)",
+    # Fuzzy-duplicate blocking key
+    "ALTER TABLE leads ADD COLUMN IF NOT EXISTS name_key VARCHAR(12)",
+    # Nearby-lead grid bucket
+    "ALTER TABLE leads ADD COLUMN IF NOT EXISTS geo_cell BIGINT",
+    # Batch sync idempotency
+    "ALTER TABLE activities ADD COLUMN IF NOT EXISTS idempotency_key VARCHAR(80)",
+    # Hot meta key as a generated column (rewrites activities once)
+    "ALTER TABLE activities ADD COLUMN IF NOT EXISTS ai_sentiment VARCHAR "
+    f"GENERATED ALWAYS AS ({SENTIMENT_EXPR}) STORED",
+    # Per-tenant activity retention (months; NULL = default)
+    "ALTER TABLE company_profile ADD COLUMN IF NOT EXISTS activity_retention_months INTEGER",
+]
+
+# Run after backfills
+INDEXES = [
+    # Keyset pagination for GET /leads
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_company_created_id "
+    "ON leads (company_id, created_at DESC, id DESC)",
+    # Duplicate checks
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_company_email_norm "
+    "ON leads (company_id, email_normalized) WHERE email_normalized IS NOT NULL",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_company_phone_norm "
+    "ON leads (company_id, phone_normalized) WHERE phone_normalized IS NOT NULL",
+    # Fuzzy-duplicate blocking
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_company_pincode "
+    "ON leads (company_id, pincode)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_company_name_key "
+    "ON leads (company_id, name_key)",
+    # Nearby leads (/dashboard/myday)
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_company_geo_cell "
+    "ON leads (company_id, geo_cell)",
+    # Lead merge / cascades re-parent children by lead_id
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_lead_id ON tasks (lead_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_quotations_lead_id ON quotations (lead_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_lead_id ON orders (lead_id)",
+    # Keyset pagination for GET /activities
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_activities_company_created_id "
+    "ON activities (company_id, created_at DESC, id DESC)",
+    # Follow-up chains (recursive CTE) and follow-up deletes
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_activities_parent_activity_id "
+    "ON activities (parent_activity_id)",
+    # meta containment / key filters and sentiment queries
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_activities_meta_path_ops "
+    "ON activities USING gin (meta jsonb_path_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_activities_company_sentiment_created "
+    "ON activities (company_id, ai_sentiment, created_at)",
+    # Batch sync keys moved to activity_idempotency_keys (partition-safe)
+    "DROP INDEX CONCURRENTLY IF EXISTS ux_activities_company_idempotency",
+]
+
+
+def backfill_lead_identity(conn):
+    """Fill email/phone_normalized in id-ordered batches (Python normalisation)."""
+    update = text(
+        "UPDATE leads SET email_normalized = :e, phone_normalized = :p WHERE id = :id"
+    ).bindparams(bindparam("id"), bindparam("e"), bindparam("p"))
+    last_id, total = None, 0
+    while True:
+        rows = conn.execute(
+            text(
+                "SELECT id, email, phone FROM leads "
+                "WHERE (email IS NOT NULL AND email_normalized IS NULL "
+                "   OR phone IS NOT NULL AND phone_normalized IS NULL) "
+                + ("AND id > :last " if last_id else "")
+                + "ORDER BY id LIMIT :n"
+            ),
+            {"last": last_id, "n": BACKFILL_BATCH} if last_id else {"n": BACKFILL_BATCH},
+        ).all()
+        if not rows:
+            break
+        conn.execute(update, [
+            {"id": r.id, "e": normalize_email(r.email), "p": normalize_phone(r.phone)} for r in rows
+        ])
+        conn.commit()
+        last_id, total = rows[-1].id, total + len(rows)
+    print(f"   ↳ leads identity backfilled: {total} rows")
+
+
+def backfill_lead_created_at(conn):
+    """Give legacy leads a created_at, then make it NOT NULL (keyset pagination key)."""
+    result = conn.execute(text(
+        "UPDATE leads SET created_at = COALESCE(updated_at, now() AT TIME ZONE 'utc') "
+        "WHERE created_at IS NULL"
+    ))
+    conn.execute(text("ALTER TABLE leads ALTER COLUMN created_at SET NOT NULL"))
+    conn.commit()
+    print(f"   ↳ leads created_at backfilled: {result.rowcount} rows")
+
+
+def backfill_lead_name_key(conn):
+    """Fill name_key (phonetic blocking key) in id-ordered batches."""
+    update = text("UPDATE leads SET name_key = :k WHERE id = :id").bindparams(bindparam("id"), bindparam("k"))
+    last_id, total = None, 0
+    while True:
+        rows = conn.execute(
+            text(
+                "SELECT id, business_name, city FROM leads "
+                "WHERE name_key IS NULL AND business_name IS NOT NULL "
+                + ("AND id > :last " if last_id else "")
+                + "ORDER BY id LIMIT :n"
+            ),
+            {"last": last_id, "n": BACKFILL_BATCH} if last_id else {"n": BACKFILL_BATCH},
+        ).all()
+        if not rows:
+            break
+        conn.execute(update, [{"id": r.id, "k": name_key(r.business_name, r.city)} for r in rows])
+        conn.commit()
+        last_id, total = rows[-1].id, total + len(rows)
+    print(f"   ↳ leads name_key backfilled: {total} rows")
+
+
+def backfill_lead_geo_cell(conn):
+    """Fill geo_cell for leads with coordinates, in id-ordered batches (same formula as the app)."""
+    update = text("UPDATE leads SET geo_cell = :c WHERE id = :id").bindparams(bindparam("id"), bindparam("c"))
+    last_id, total = None, 0
+    while True:
+        rows = conn.execute(
+            text(
+                "SELECT id, lat, lng FROM leads "
+                "WHERE geo_cell IS NULL AND lat IS NOT NULL AND lng IS NOT NULL "
+                + ("AND id > :last " if last_id else "")
+                + "ORDER BY id LIMIT :n"
+            ),
+            {"last": last_id, "n": BACKFILL_BATCH} if last_id else {"n": BACKFILL_BATCH},
+        ).all()
+        if not rows:
+            break
+        conn.execute(update, [{"id": r.id, "c": geo_cell(r.lat, r.lng)} for r in rows])
+        conn.commit()
+        last_id, total = rows[-1].id, total + len(rows)
+    print(f"   ↳ leads geo_cell backfilled: {total} rows")
+
+
+def backfill_activity_counters(conn):
+    """Seed activity_counters from existing activities (safe to re-run)."""
+    from app.services.activity_counters import rebuild_counters
+
+    rows = rebuild_counters(conn)
+    conn.commit()
+    print(f"   ↳ activity counters rebuilt: {rows} rows")
+
+
+def backfill_activity_rollup(conn):
+    """Seed activity_daily_rollup from existing activities (safe to re-run)."""
+    from app.services.activity_rollup import rebuild_rollup
+
+    rows = rebuild_rollup(conn)
+    conn.commit()
+    print(f"   ↳ activity daily rollup rebuilt: {rows} rows")
+
+
+def backfill_activity_idempotency_keys(conn):
+    """Claim keys already stored on activities (safe to re-run)."""
+    result = conn.execute(text(
+        "INSERT INTO activity_idempotency_keys (company_id, idempotency_key, activity_id, created_at) "
+        "SELECT DISTINCT ON (company_id, idempotency_key) company_id, idempotency_key, id, created_at "
+        "FROM activities WHERE idempotency_key IS NOT NULL "
+        "ORDER BY company_id, idempotency_key, created_at "
+        "ON CONFLICT DO NOTHING"
+    ))
+    conn.commit()
+    print(f"   ↳ activity idempotency keys claimed: {result.rowcount} rows")
+
+
+BACKFILLS = [
+    backfill_lead_created_at,
+    backfill_lead_identity,
+    backfill_lead_name_key,
+    backfill_lead_geo_cell,
+    backfill_activity_counters,
+    backfill_activity_rollup,
+    backfill_activity_idempotency_keys,
+]
+
+
+def upgrade():
+    # New tables (counters, rollups, ...) before anything that fills them
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        partitioned = is_partitioned(conn)
+        if partitioned:
+            print(f"⚙️ activity partitions: {ensure_partitions(conn) or 'up to date'}")
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for stmt in COLUMNS:
+            print(f"⚙️ {stmt}")
+            conn.execute(text(stmt))
+
+    with engine.connect() as conn:
+        for backfill in BACKFILLS:
+            print(f"⚙️ {backfill.__name__}")
+            backfill(conn)
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for stmt in INDEXES:
+            # Partitioned tables cannot build indexes CONCURRENTLY
+            if partitioned and " ON activities " in stmt:
+                stmt = stmt.replace(" CONCURRENTLY", "")
+            print(f"⚙️ {stmt}")
+            conn.execute(text(stmt))
+
+    if not partitioned:
+        print("⚠️ activities is not partitioned yet: python -m app.services.activity_partitions migrate")
+    print("✅ Schema is up to date.")
+
+
+if __name__ == "__main__":
+    upgrade()
@@ -0,0 +1,90 @@
+import re
+from typing import Optional
+
+from app.core.config import settings
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_email(raw) -> Optional[str]:
+    """Lower-cased, trimmed email, or None when blank/invalid."""
+    if raw is None:
+        return None
+    email = str(raw).strip().lower()
+    if not email or "@" not in email:
+        return None
+    return email
+
+
+def normalize_phone(raw, country_code: Optional[str] = None) -> Optional[str]:
+    """
+    E.164-style '+<digits>'. Local numbers (10 digits, or 11 with a trunk
+    '0') get the default country code; '00' international prefixes are
+    treated like '+'. Returns None when there are too few digits to match on.
+    """
+    if raw is None:
+        return None
+    text = str(raw).strip()
+    digits = _NON_DIGITS.sub("", text)
+    if len(digits) < 6:
+        return None
+
+    cc = country_code or settings.DEFAULT_PHONE_COUNTRY_CODE
+    if not text.startswith("+"):
+        if digits.startswith("00"):
+            digits = digits[2:]
+        elif len(digits) == 11 and digits.startswith("0"):
+            digits = cc + digits[1:]
+        elif len(digits) == 10:
+            digits = cc + digits
+    return "+" + digits[:15]
+
+
+# ---------------------------------------------------------------------------
+# Business-name keys (fuzzy duplicate blocking)
+# ---------------------------------------------------------------------------
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+NAME_STOP_WORDS = {
+    "the", "and", "of", "pvt", "private", "ltd", "limited", "llp", "co",
+    "company", "inc", "corp", "enterprises", "enterprise", "traders", "m", "s",
+}
+_SOUNDEX_CODES = {
+    ch: digit
+    for digit, letters in {"1": "bfpv", "2": "cgjkqsxz", "3": "dt", "4": "l", "5": "mn", "6": "r"}.items()
+    for ch in letters
+}
+
+
+def normalize_business_name(name, city=None) -> str:
+    """'Royal Look Saloon, Mysuru' -> 'royal look saloon' (city/legal suffixes dropped)."""
+    if not name:
+        return ""
+    drop = set(NAME_STOP_WORDS)
+    if city:
+        drop.update(_NON_ALNUM.sub(" ", str(city).lower()).split())
+    tokens = [t for t in _NON_ALNUM.sub(" ", str(name).lower()).split() if t not in drop]
+    return " ".join(tokens)
+
+
+def soundex(word: str) -> Optional[str]:
+    letters = "".join(ch for ch in (word or "").lower() if ch.isalpha())
+    if not letters:
+        return None
+    out, last = letters[0].upper(), _SOUNDEX_CODES.get(letters[0], "")
+    for ch in letters[1:]:
+        code = _SOUNDEX_CODES.get(ch, "")
+        if code and code != last:
+            out += code
+            if len(out) == 4:
+                break
+        if ch not in "hw":
+            last = code
+    return out.ljust(4, "0")
+
+
+def name_key(name, city=None) -> Optional[str]:
+    """Phonetic code of the first significant name token (blocking key)."""
+    tokens = normalize_business_name(name, city).split()
+    if not tokens:
+        return None
+    return soundex(tokens[0]) or tokens[0][:4].upper()
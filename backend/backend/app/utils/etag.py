@@ -0,0 +1,15 @@
+import hashlib
+from typing import Optional
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag over the exact response bytes."""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match may list several tags, use weak prefixes, or be '*'."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
@@ -1,11 +1,129 @@
-from math import radians, sin, cos, sqrt, atan2
+# backend/app/utils/geo.py
+#
+# Great-circle (haversine) distances in km. The batch functions take arrays
+# of points and run in NumPy; calc_distance is the scalar wrapper kept for
+# one-off callers.
+#
+#   d = distances_from(rep_lat, rep_lng, lead_lats, lead_lngs)   # one-to-many
+#   idx, d = within_radius(rep_lat, rep_lng, lats, lngs, 10)     # sorted by distance
+#   idx, d = nearest(rep_lat, rep_lng, lats, lngs, k=20)
+#
+# geo_cell / bounding_box / cells_in_bbox back the leads.geo_cell grid index:
+# nearby queries read only the cells around a point, then filter exactly.
+
+import math
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = EARTH_RADIUS_KM * math.pi / 180.0
+
+# Grid bucket size: 0.05° ≈ 5.5 km of latitude; a 10 km radius reads ~25 cells
+CELL_DEG = 0.05
+_COLS = int(round(360 / CELL_DEG))
+MAX_CELLS = 2500  # larger boxes fall back to the plain lat/lng range
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+def _rad(values: ArrayLike) -> np.ndarray:
+    return np.radians(np.asarray(values, dtype=np.float64))
+
+
+def _haversine(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Inputs in radians, broadcast against each other."""
+    a = np.sin((lat2 - lat1) * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) * 0.5) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distances_from(lat: float, lng: float, lats: ArrayLike, lngs: ArrayLike) -> np.ndarray:
+    """One-to-many: km from (lat, lng) to every (lats[i], lngs[i])."""
+    return _haversine(np.radians(lat), np.radians(lng), _rad(lats), _rad(lngs))
+
+
+def distance_matrix(lats1: ArrayLike, lngs1: ArrayLike, lats2: ArrayLike, lngs2: ArrayLike) -> np.ndarray:
+    """Many-to-many: km matrix of shape (len(lats1), len(lats2))."""
+    return _haversine(_rad(lats1)[:, None], _rad(lngs1)[:, None], _rad(lats2)[None, :], _rad(lngs2)[None, :])
+
+
+def within_radius(
+    lat: float, lng: float, lats: ArrayLike, lngs: ArrayLike, radius_km: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(indices, km) of the points within radius_km, nearest first."""
+    d = distances_from(lat, lng, lats, lngs)
+    idx = np.flatnonzero(d <= radius_km)
+    idx = idx[np.argsort(d[idx], kind="stable")]
+    return idx, d[idx]
+
+
+def nearest(lat: float, lng: float, lats: ArrayLike, lngs: ArrayLike, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(indices, km) of the k nearest points, nearest first (argpartition, no full sort)."""
+    d = distances_from(lat, lng, lats, lngs)
+    if k <= 0 or d.size == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0)
+    if k < d.size:
+        idx = np.argpartition(d, k - 1)[:k]
+    else:
+        idx = np.arange(d.size)
+    idx = idx[np.argsort(d[idx], kind="stable")]
+    return idx, d[idx]
+
 
 def calc_distance(lat1, lng1, lat2, lng2):
     """Return distance in km between two lat/lng coordinates."""
     if not all([lat1, lng1, lat2, lng2]):
         return None
-    R = 6371.0
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lng2 - lng1)
-    a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon/2)**2
-    return round(R * 2 * atan2(sqrt(a), sqrt(1-a)), 2)
+    return round(float(distances_from(lat1, lng1, (lat2,), (lng2,))[0]), 2)
+
+
+# ---------------------------------------------------------------------------
+# Grid index helpers
+# ---------------------------------------------------------------------------
+def _row(lat: float) -> int:
+    return int(math.floor((min(max(lat, -90.0), 90.0) + 90.0) / CELL_DEG))
+
+
+def _col(lng: float) -> int:
+    return int(math.floor(((lng + 180.0) % 360.0) / CELL_DEG)) % _COLS
+
+
+def geo_cell(lat, lng) -> Optional[int]:
+    """Grid bucket of a point (stored in leads.geo_cell)."""
+    if lat is None or lng is None:
+        return None
+    return _row(lat) * _COLS + _col(lng)
+
+
+def tile_center(lat: float, lng: float, tile_deg: float) -> Tuple[float, float]:
+    """Centre of the tile_deg x tile_deg tile containing the point (cache keys)."""
+    return (
+        round((math.floor(lat / tile_deg) + 0.5) * tile_deg, 6),
+        round((math.floor(lng / tile_deg) + 0.5) * tile_deg, 6),
+    )
+
+
+def tile_margin_km(tile_deg: float) -> float:
+    """Upper bound on the distance from any point of a tile to its centre."""
+    return tile_deg * KM_PER_DEG_LAT * math.sqrt(0.5)
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lng, max_lng) enclosing the radius; lng spans the globe near the poles."""
+    dlat = radius_km / KM_PER_DEG_LAT
+    cos_lat = math.cos(math.radians(lat))
+    dlng = 180.0 if cos_lat < 1e-6 else min(180.0, dlat / cos_lat)
+    return max(lat - dlat, -90.0), min(lat + dlat, 90.0), lng - dlng, lng + dlng
+
+
+def cells_in_bbox(min_lat: float, max_lat: float, min_lng: float, max_lng: float) -> Optional[List[int]]:
+    """Every grid cell the box touches, or None if that is more than MAX_CELLS."""
+    rows = range(_row(min_lat), _row(max_lat) + 1)
+    n_cols = int(math.floor(max_lng / CELL_DEG) - math.floor(min_lng / CELL_DEG)) + 1
+    if n_cols >= _COLS:
+        return None
+    if len(rows) * n_cols > MAX_CELLS:
+        return None
+    first = _col(min_lng)
+    cols = [(first + i) % _COLS for i in range(n_cols)]
+    return [r * _COLS + c for r in rows for c in cols]
@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, tuple_
+
+
+# ---------------------------------------------------------------------------
+# Keyset (cursor) pagination on (created_at DESC, id DESC)
+# ---------------------------------------------------------------------------
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, row_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(ts), UUID(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(query, created_col, id_col, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Return (rows, next_cursor). Seeks past the cursor with a row-value
+    comparison so every page is an index range scan, however deep it is.
+    """
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_col, id_col) < tuple_(ts, row_id))
+
+    rows = query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1).all()
+    return _split(rows, created_col, id_col, limit)
+
+
+def keyset_select(db, stmt, created_col, id_col, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """keyset_page for Core/2.0 select() statements returning rows."""
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(created_col, id_col) < tuple_(ts, row_id))
+
+    rows = db.execute(stmt.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)).all()
+    return _split(rows, created_col, id_col, limit)
+
+
+def _split(rows, created_col, id_col, limit: int):
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+
+
+# ---------------------------------------------------------------------------
+# Total counts: planner estimate for big results, exact count for small ones
+# ---------------------------------------------------------------------------
+EXACT_COUNT_BELOW = 10_000
+
+
+def planner_estimate(db, stmt) -> Optional[int]:
+    """Row estimate from EXPLAIN (FORMAT JSON); None if it cannot be obtained."""
+    try:
+        conn = db.connection()
+        compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+        # Savepoint: a failed EXPLAIN must not abort the request's transaction
+        with conn.begin_nested():
+            raw = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, compiled.params).scalar()
+        plan = json.loads(raw) if isinstance(raw, str) else raw
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:
+        return None
+
+
+def count_estimate(db, stmt, exact_below: int = EXACT_COUNT_BELOW) -> Tuple[int, bool]:
+    """
+    (total, is_estimate) for the rows `stmt` would return (no ORDER BY/LIMIT).
+    Large results use the planner's estimate; small ones are counted exactly.
+    """
+    estimate = planner_estimate(db, stmt)
+    if estimate is not None and estimate >= exact_below:
+        return estimate, True
+    exact = db.execute(select(func.count()).select_from(stmt.subquery())).scalar()
+    return exact, False
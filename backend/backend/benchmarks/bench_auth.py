@@ -0,0 +1,68 @@
+# bench_auth.py
+#
+# Compares p50/p99 latency of the auth dependencies against the configured
+# database:  DB-backed get_current_user (cache cleared every call), cached
+# get_current_user, and claims-only get_current_principal.
+#
+#   python benchmarks/bench_auth.py [iterations]
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core.principal_cache import principal_cache
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.routers.auth import create_access_token, get_current_principal, get_current_user
+
+
+def _timed(fn, iterations: int):
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    q = statistics.quantiles(samples, n=100)
+    return q[49], q[98]
+
+
+def main(iterations: int = 2000):
+    db = SessionLocal()
+    user = db.query(User).filter(User.is_active == True).first()  # noqa: E712
+    if not user:
+        print("❌ No active user found — run seed_initial_data.py first.")
+        return
+
+    token = create_access_token({
+        "sub": str(user.id),
+        "email": user.email,
+        "company_id": str(user.company_id),
+        "role": user.role,
+    })
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    def db_backed():
+        principal_cache.clear()
+        get_current_user(creds, db)
+
+    cases = [
+        ("get_current_user (DB every call)", db_backed),
+        ("get_current_user (cached)", lambda: get_current_user(creds, db)),
+        ("get_current_principal (claims)", lambda: get_current_principal(creds, db)),
+    ]
+    print(f"⏱  {iterations} iterations per case")
+    for name, fn in cases:
+        fn()  # warm up
+        p50, p99 = _timed(fn, iterations)
+        print(f"{name:<36} p50={p50:.3f}ms  p99={p99:.3f}ms")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,66 @@
+# bench_geo.py
+#
+# Haversine throughput without a database, on random points around Mysuru:
+#   scalar  — calc_distance in a Python loop (old my_day path, math-based)
+#   batch   — distances_from / within_radius / nearest (NumPy)
+#   matrix  — distance_matrix, many-to-many
+#
+#   python benchmarks/bench_geo.py [points] [iterations]
+
+import math
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.utils.geo import distance_matrix, distances_from, nearest, within_radius
+
+REP = (12.2958, 76.6394)
+
+
+def _scalar(lat1, lng1, lat2, lng2):
+    # Pre-NumPy implementation, for comparison
+    dlat, dlon = math.radians(lat2 - lat1), math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return 6371.0 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _timed(label: str, fn, iterations: int) -> None:
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    print(f"{label:<34} median {statistics.median(samples):9.3f} ms   min {min(samples):9.3f} ms")
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    rng = np.random.default_rng(7)
+    lats = REP[0] + rng.uniform(-1.5, 1.5, n)
+    lngs = REP[1] + rng.uniform(-1.5, 1.5, n)
+    lat_list, lng_list = lats.tolist(), lngs.tolist()
+
+    # Same answers before timing anything
+    ref = np.array([_scalar(REP[0], REP[1], a, b) for a, b in zip(lat_list[:1000], lng_list[:1000])])
+    assert np.allclose(ref, distances_from(*REP, lats[:1000], lngs[:1000]), atol=1e-6)
+
+    print(f"{n} points, {iterations} iterations")
+    _timed("scalar loop (math)", lambda: [_scalar(REP[0], REP[1], a, b) for a, b in zip(lat_list, lng_list)], max(1, iterations // 10))
+    _timed("distances_from (ndarray)", lambda: distances_from(*REP, lats, lngs), iterations)
+    _timed("distances_from (lists)", lambda: distances_from(*REP, lat_list, lng_list), iterations)
+    _timed("within_radius 10 km", lambda: within_radius(*REP, lats, lngs, 10.0), iterations)
+    _timed("nearest k=50", lambda: nearest(*REP, lats, lngs, 50), iterations)
+
+    m = min(n, 1000)
+    _timed(f"distance_matrix {m}x{m}", lambda: distance_matrix(lats[:m], lngs[:m], lats[:m], lngs[:m]), iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# bench_serializers.py
+#
+# CPU cost of serialising one 500-row activity page, without a database:
+#   old — ORM objects -> {**a.__dict__} -> ActivityOut validation ->
+#         jsonable_encoder -> json.dumps (what FastAPI did for response_model)
+#   new — column tuples -> activity_rows() -> utils.serializers.dumps
+#
+#   python benchmarks/bench_serializers.py [rows] [iterations]
+
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models import Lead, User  # noqa: F401  (registers mappers)
+from app.models.activities import Activity
+from app.schemas.activities import ActivityOut
+from app.services.list_views import ACTIVITY_COLUMNS, activity_rows
+from app.utils.serializers import dumps, orjson
+
+
+def _fixtures(n: int):
+    company_id, user_id = uuid.uuid4(), uuid.uuid4()
+    lead = Lead(id=uuid.uuid4(), business_name="Royal Look Salon", contact_person="Ravi", company_id=company_id)
+    now = datetime.utcnow()
+    objs, tuples = [], []
+    for i in range(n):
+        a = Activity(
+            id=uuid.uuid4(), lead_id=lead.id, company_id=company_id, type="Call",
+            title=f"Follow-up call #{i}", description="Discussed pricing and next visit",
+            status="Pending", due_date=now + timedelta(hours=i), priority="Medium",
+            assigned_to=user_id, created_by=user_id, created_at=now - timedelta(minutes=i),
+            source_channel="Manual", auto_generated=False, meta={"call_start": now.isoformat()},
+            call_duration=120, verified_event=False, gps_verified=False, trust_score_impact=0,
+        )
+        a.lead = lead
+        objs.append(a)
+        tuples.append(tuple(getattr(a, c.key) for c in ACTIVITY_COLUMNS) + (lead.business_name, lead.contact_person, "Asha"))
+    return objs, tuples
+
+
+def old_path(objs):
+    data = [
+        {**a.__dict__, "lead_name": getattr(a.lead, "name", None), "assigned_to_name": None, "when": a.due_date}
+        for a in objs
+    ]
+    validated = TypeAdapter(List[ActivityOut]).validate_python(data)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def new_path(tuples):
+    return dumps(activity_rows(tuples))
+
+
+def _timed(fn, arg, iterations: int):
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn(arg)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main(rows: int = 500, iterations: int = 50):
+    objs, tuples = _fixtures(rows)
+    old_path(objs), new_path(tuples)  # warm up
+    old_ms = _timed(old_path, objs, iterations)
+    new_ms = _timed(new_path, tuples, iterations)
+    print(f"⏱  {rows} rows, {iterations} iterations, encoder={'orjson' if orjson else 'json'}")
+    print(f"{'ORM + ActivityOut + jsonable_encoder':<38} median={old_ms:.2f}ms")
+    print(f"{'column rows + dumps':<38} median={new_ms:.2f}ms")
+    print(f"speed-up: {old_ms / new_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+    )
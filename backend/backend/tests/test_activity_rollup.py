@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import event  # noqa: E402
+
+from app.models.activities import Activity  # noqa: E402
+from app.models.activity_rollup import ActivityDailyRollup  # noqa: E402
+from app.services.activity_batch import insert_activities  # noqa: E402
+from app.services.activity_rollup import rebuild_rollup  # noqa: E402
+
+
+@pytest.fixture
+def far_timezone(engine):
+    """
+    Session time zone on the other side of the date line from UTC right now,
+    so now() and utcnow() fall on different calendar days.
+    """
+    tz = "Etc/GMT-14" if datetime.utcnow().hour >= 12 else "Etc/GMT+12"
+
+    def _set_timezone(dbapi_conn, record):
+        with dbapi_conn.cursor() as cur:
+            cur.execute(f"SET TIME ZONE '{tz}'")
+        dbapi_conn.commit()
+
+    engine.dispose()
+    event.listen(engine, "connect", _set_timezone)
+    try:
+        yield tz
+    finally:
+        event.remove(engine, "connect", _set_timezone)
+        engine.dispose()
+
+
+def _rollup(db, company_id):
+    r = ActivityDailyRollup
+    return {
+        (row.user_id, row.day, row.type, row.status): (row.count, row.call_duration_sum)
+        for row in db.query(r).filter(r.company_id == company_id)
+        if row.count or row.call_duration_sum
+    }
+
+
+def _activity(tenant, lead, **fields):
+    return Activity(lead_id=lead.id, company_id=tenant.company_id, created_by=tenant.id, **fields)
+
+
+def test_incremental_rollup_matches_rebuild(far_timezone, db, tenant, make_lead):
+    lead = make_lead()
+
+    call = _activity(tenant, lead, type="Call", title="Intro", call_duration=60)
+    visit = _activity(tenant, lead, type="Visit", title="Demo")
+    db.add_all([call, visit])
+    db.commit()
+    db.add(_activity(tenant, lead, type="Task", title="Follow up", parent_activity_id=call.id))
+    db.commit()
+
+    # Updates move rows between (type, status) buckets
+    visit.status = "Done"
+    db.commit()
+    call.call_duration = 90
+    db.commit()
+
+    # Core path (batch sync / rule worker), created_at from the server default
+    insert_activities(db, [
+        {"lead_id": lead.id, "company_id": tenant.company_id, "created_by": tenant.id,
+         "type": "Call", "title": f"Batch {i}", "status": "Done", "call_duration": 30}
+        for i in range(3)
+    ])
+    db.commit()
+
+    # Deletes take the follow-up chain with them (loaded, as the routes do)
+    db.refresh(call)
+    db.delete(call)
+    db.commit()
+
+    incremental = _rollup(db, tenant.company_id)
+    stored_days = {a.created_at.date() for a in db.query(Activity).filter(Activity.company_id == tenant.company_id)}
+
+    rebuild_rollup(db, tenant.company_id)
+    db.commit()
+    rebuilt = _rollup(db, tenant.company_id)
+
+    assert rebuilt, "expected rollup rows"
+    assert incremental == rebuilt
+    assert {key[1] for key in incremental} == stored_days
@@ -0,0 +1,151 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import update  # noqa: E402
+
+from app.models.activities import Activity  # noqa: E402
+from app.models.activity_rule import ActivityOutbox, ActivityRule  # noqa: E402
+from app.services import activity_rules  # noqa: E402
+from app.services.activity_logic import DEFAULT_TABLE  # noqa: E402
+
+RULE = {
+    "name": "No answer → retry",
+    "trigger_type": "Call",
+    "trigger_outcome": "No Answer",
+    "next_title": "Call again",
+    "delay_minutes": 120,
+}
+
+
+def test_defaults_until_company_adds_rules(client):
+    resp = client.get("/activity-rules")
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["source"] == "default"
+
+
+def test_company_rules_round_trip(client):
+    created = client.post("/activity-rules", json=RULE)
+    assert created.status_code == 200, created.text
+    rule = created.json()
+    assert rule["id"] and rule["next_title"] == "Call again" and rule["next_type"] == "Task"
+
+    updated = client.put(f"/activity-rules/{rule['id']}", json={"delay_minutes": 30, "enabled": False})
+    assert updated.status_code == 200, updated.text
+    assert updated.json()["delay_minutes"] == 30 and updated.json()["enabled"] is False
+
+    listed = client.get("/activity-rules")
+    assert listed.status_code == 200, listed.text
+    body = listed.json()
+    assert body["source"] == "company"
+    assert [(r["id"], r["delay_minutes"]) for r in body["rules"]] == [(rule["id"], 30)]
+
+    assert client.delete(f"/activity-rules/{rule['id']}").json() == {"ok": True}
+    assert client.get("/activity-rules").json()["source"] == "default"
+
+
+# ---------------------------------------------------------------------------
+# Outbox worker
+# ---------------------------------------------------------------------------
+def _drain(db):
+    while activity_rules.process_outbox(db)[0]:
+        pass
+
+
+def _complete(db, tenant, lead, title, type_="Call", outcome="No Answer"):
+    activity = Activity(
+        lead_id=lead.id, company_id=tenant.company_id, created_by=tenant.id,
+        type=type_, outcome=outcome, title=title, status=activity_rules.COMPLETED_STATUS,
+    )
+    db.add(activity)
+    db.commit()
+    return activity.id
+
+
+def _outbox(db, activity_id):
+    return db.query(ActivityOutbox).filter(ActivityOutbox.activity_id == activity_id).one()
+
+
+def _follow_ups(db, parent_id):
+    return db.query(Activity).filter(Activity.parent_activity_id == parent_id).all()
+
+
+def test_completion_enqueues_and_worker_creates_follow_up(db, tenant, make_lead):
+    lead = make_lead()
+    _drain(db)
+    parent_id = _complete(db, tenant, lead, "Intro")
+    assert _outbox(db, parent_id).processed_at is None
+
+    _drain(db)
+    event = _outbox(db, parent_id)
+    assert event.processed_at is not None and event.attempts == 1
+    [follow_up] = _follow_ups(db, parent_id)
+    assert follow_up.title == "Follow-Up Call — Intro" and follow_up.auto_generated is True
+
+    # Re-processing the same event never creates a second follow-up
+    db.execute(update(ActivityOutbox).where(ActivityOutbox.id == event.id).values(processed_at=None))
+    db.commit()
+    _drain(db)
+    assert len(_follow_ups(db, parent_id)) == 1
+
+
+def test_status_change_to_completed_enqueues(db, tenant, make_lead):
+    lead = make_lead()
+    activity = Activity(
+        lead_id=lead.id, company_id=tenant.company_id, created_by=tenant.id,
+        type="Visit", outcome="Interested", title="Demo",
+    )
+    db.add(activity)
+    db.commit()
+    assert not db.query(ActivityOutbox).filter(ActivityOutbox.activity_id == activity.id).count()
+
+    activity.status = activity_rules.COMPLETED_STATUS
+    db.commit()
+    _drain(db)
+    assert [a.title for a in _follow_ups(db, activity.id)] == ["Send Proposal — Demo"]
+
+
+def test_company_rules_replace_defaults(db, tenant, make_lead):
+    assert activity_rules.rule_tables(db, {tenant.company_id}) == {tenant.company_id: DEFAULT_TABLE}
+
+    rule = ActivityRule(company_id=tenant.company_id, name="Retry", trigger_outcome="No Answer", next_title="Retry")
+    db.add(rule)
+    db.commit()
+    lead = make_lead()
+    parent_id = _complete(db, tenant, lead, "Intro")
+    _drain(db)
+    assert [a.title for a in _follow_ups(db, parent_id)] == ["Retry — Intro"]
+
+    # Every rule disabled: no auto tasks (not the defaults)
+    rule.enabled = False
+    db.commit()
+    parent_id = _complete(db, tenant, lead, "Second try")
+    _drain(db)
+    assert _follow_ups(db, parent_id) == []
+
+
+def test_failing_event_does_not_block_batch(db, tenant, make_lead, monkeypatch):
+    follow_up_row = activity_rules.follow_up_row
+
+    def _flaky(parent, rule, now):
+        if parent["title"] == "Broken":
+            raise ValueError("bad parent")
+        return follow_up_row(parent, rule, now)
+
+    lead = make_lead()
+    _drain(db)
+    broken_id = _complete(db, tenant, lead, "Broken")
+    healthy_id = _complete(db, tenant, lead, "Healthy")
+
+    monkeypatch.setattr(activity_rules, "follow_up_row", _flaky)
+    assert activity_rules.process_outbox(db) == (2, 1)
+
+    broken, healthy = _outbox(db, broken_id), _outbox(db, healthy_id)
+    assert broken.processed_at is None and broken.attempts == 1 and "bad parent" in broken.last_error
+    assert healthy.processed_at is not None and healthy.last_error is None
+    assert len(_follow_ups(db, healthy_id)) == 1 and _follow_ups(db, broken_id) == []
+
+    # Once the cause is gone the failed event goes through on the next run
+    monkeypatch.undo()
+    _drain(db)
+    assert len(_follow_ups(db, broken_id)) == 1
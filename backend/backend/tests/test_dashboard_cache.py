@@ -0,0 +1,181 @@
+import threading
+import time as _time
+from datetime import datetime, time
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from app.core import dashboard_cache  # noqa: E402
+from app.models.activities import Activity  # noqa: E402
+from app.models.tasks import Task, TaskPriority, TaskStatus  # noqa: E402
+
+MYSURU = {"lat": 12.2958, "lng": 76.6394}
+
+
+class SharedRedis:
+    """The handful of Redis commands the dashboard cache uses, in memory."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value, expires = self._data.get(key, (None, None))
+            if expires is not None and expires < _time.time():
+                self._data.pop(key, None)
+                return None
+            return value
+
+    def setex(self, key, ttl, value):
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        with self._lock:
+            self._data[key] = (value, _time.time() + ttl)
+
+    def incr(self, key):
+        with self._lock:
+            value, expires = self._data.get(key, ("0", None))
+            value = str(int(value) + 1)
+            self._data[key] = (value, expires)
+            return int(value)
+
+    def expire(self, key, ttl):
+        with self._lock:
+            if key in self._data:
+                self._data[key] = (self._data[key][0], _time.time() + ttl)
+
+    def pipeline(self):
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, redis):
+        self._redis, self._calls = redis, []
+
+    def __getattr__(self, name):
+        return lambda *args: self._calls.append((name, args))
+
+    def execute(self):
+        return [getattr(self._redis, name)(*args) for name, args in self._calls]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    shared = SharedRedis()
+    monkeypatch.setattr(dashboard_cache, "get_redis", lambda: shared)
+    new_worker()
+    yield shared
+    new_worker()
+
+
+def new_worker():
+    """What another app process starts with: empty L1 caches and local stamps."""
+    dashboard_cache.myday_cache.clear()
+    dashboard_cache.geo_cache.clear()
+    with dashboard_cache._lock:
+        dashboard_cache._local_versions.clear()
+
+
+def _counts():
+    s = dashboard_cache.stats()
+    return {(name, k): s[name][k] for name in ("myday", "geo") for k in ("hits", "redis_hits", "misses")}
+
+
+def _delta(before, name, key):
+    return _counts()[(name, key)] - before[(name, key)]
+
+
+def _myday(client, **headers):
+    return client.get("/dashboard/myday", params=MYSURU, headers=headers)
+
+
+def test_other_worker_reads_shared_entries(client, redis, make_lead):
+    make_lead(lat=12.30, lng=76.64)
+
+    before = _counts()
+    first = _myday(client)
+    assert first.status_code == 200, first.text
+    assert _delta(before, "myday", "misses") == 1 and _delta(before, "geo", "misses") == 1
+
+    new_worker()
+    before = _counts()
+    second = _myday(client)
+    assert second.status_code == 200
+    assert _delta(before, "myday", "redis_hits") == 1 and _delta(before, "geo", "redis_hits") == 1
+    assert _delta(before, "myday", "misses") == 0
+    assert second.content == first.content
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+
+def test_versions_match_across_workers(redis, tenant, make_lead):
+    version = dashboard_cache.company_version(tenant.company_id)
+    new_worker()
+    assert dashboard_cache.company_version(tenant.company_id) == version
+
+    make_lead()
+    new_worker()
+    assert dashboard_cache.company_version(tenant.company_id) != version
+
+
+def test_lead_write_invalidates_other_workers(client, redis, make_lead):
+    make_lead(lat=12.30, lng=76.64)
+    body = _myday(client).json()
+
+    make_lead(lat=12.31, lng=76.65)  # committed by another "worker" (the test session)
+    new_worker()
+    before = _counts()
+    fresh = _myday(client).json()
+    assert _delta(before, "myday", "misses") == 1 and _delta(before, "geo", "misses") == 1
+    assert fresh["summary"]["new_leads_today"] == body["summary"]["new_leads_today"] + 1
+    assert fresh["summary"]["nearby_leads"] == body["summary"]["nearby_leads"] + 1
+
+
+def test_task_write_invalidates(client, redis, db, tenant, make_lead):
+    lead = make_lead()
+    body = _myday(client).json()
+
+    db.add(Task(
+        lead_id=lead.id, company_id=tenant.company_id, created_by=tenant.id, title="Visit",
+        status=TaskStatus.planned, priority=TaskPriority.normal,
+        due_date=datetime.combine(datetime.utcnow().date(), time(12)),
+    ))
+    db.commit()
+
+    new_worker()
+    fresh = _myday(client).json()
+    assert fresh["summary"]["tasks_today"] == body["summary"]["tasks_today"] + 1
+
+
+def test_activity_write_invalidates(client, redis, db, tenant, make_lead):
+    lead = make_lead()
+    _myday(client)
+    version = dashboard_cache.company_version(tenant.company_id)
+
+    db.add(Activity(lead_id=lead.id, company_id=tenant.company_id, created_by=tenant.id, type="Call", title="Call"))
+    db.commit()
+
+    assert dashboard_cache.company_version(tenant.company_id) != version
+    before = _counts()
+    _myday(client)
+    assert _delta(before, "myday", "misses") == 1
+
+
+def test_conditional_request(client, redis, make_lead):
+    make_lead(lat=12.30, lng=76.64)
+    first = _myday(client)
+    before = dashboard_cache.stats()["not_modified_responses"]
+
+    again = _myday(client, **{"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304 and again.content == b""
+    assert dashboard_cache.stats()["not_modified_responses"] == before + 1
+
+
+def test_metrics_endpoint(client, redis):
+    _myday(client)
+    resp = client.get("/dashboard/metrics")
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["myday"]["redis_enabled"] is True
+    assert {"hits", "redis_hits", "misses", "hit_rate"} <= set(body["geo"])
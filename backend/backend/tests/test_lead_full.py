@@ -0,0 +1,75 @@
+import uuid
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import null, update  # noqa: E402
+
+from app.models.activities import Activity  # noqa: E402
+from app.models.tasks import Task, TaskPriority, TaskStatus  # noqa: E402
+
+
+def _seed(db, tenant, lead):
+    db.add_all([
+        Activity(
+            lead_id=lead.id, company_id=tenant.company_id, created_by=tenant.id,
+            type="Call", title="Intro call", status="Done",
+        ),
+        Task(
+            lead_id=lead.id, company_id=tenant.company_id, created_by=tenant.id,
+            title="Send brochure", status=TaskStatus.planned, priority=TaskPriority.normal,
+        ),
+        Task(
+            lead_id=lead.id, company_id=tenant.company_id, created_by=tenant.id,
+            title="Call back", status=TaskStatus.rescheduled, priority=TaskPriority.high,
+        ),
+        Task(
+            lead_id=lead.id, company_id=tenant.company_id, created_by=tenant.id,
+            title="Closed", status=TaskStatus.done, priority=TaskPriority.low,
+        ),
+    ])
+    db.commit()
+
+    # Rows written before the defaults existed: the ORM would fill them in, so NULL them directly
+    activities = Activity.__table__
+    db.execute(
+        update(activities)
+        .where(activities.c.lead_id == lead.id)
+        .values(auto_generated=None, priority=None, meta=null())  # SQL NULL, not JSON null
+    )
+    db.commit()
+
+
+def test_lead_full_payload(client, db, tenant, make_lead):
+    lead = make_lead(business_name="Royal Look Salon", city="Mysuru")
+    _seed(db, tenant, lead)
+
+    resp = client.get(f"/leads/{lead.id}/full")
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+
+    assert body["lead"]["id"] == str(lead.id)
+    assert body["lead"]["business_name"] == "Royal Look Salon"
+    assert [a["title"] for a in body["activities"]] == ["Intro call"]
+    activity = body["activities"][0]
+    assert activity["auto_generated"] is None and activity["priority"] is None and activity["meta"] is None
+    assert sorted(t["status"] for t in body["open_tasks"]) == ["Planned", "Rescheduled"]
+    assert body["quotations"] == [] and body["orders"] == []
+
+
+def test_lead_full_etag_revalidation(client, db, tenant, make_lead):
+    lead = make_lead()
+    _seed(db, tenant, lead)
+
+    first = client.get(f"/leads/{lead.id}/full")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    again = client.get(f"/leads/{lead.id}/full", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+
+def test_lead_full_unknown_lead_is_404(client):
+    assert client.get(f"/leads/{uuid.uuid4()}/full").status_code == 404
@@ -0,0 +1,117 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from app.models.activities import Activity  # noqa: E402
+from app.models.tasks import Task, TaskPriority, TaskStatus  # noqa: E402
+
+
+def _touching(statements, table):
+    return [s for s in statements if f" {table} " in f" {s} " or f" {table}." in s]
+
+
+def _selects_from(statements, table):
+    return [s for s in statements if s.startswith("SELECT") and f"FROM {table} " in f"{s} "]
+
+
+@pytest.fixture
+def leads_with_children(db, tenant, make_lead):
+    leads = [make_lead(city="Mysuru"), make_lead(city="Mandya")]
+    for lead in leads:
+        db.add_all([
+            Activity(lead_id=lead.id, company_id=tenant.company_id, created_by=tenant.id, type="Call", title="Call"),
+            Activity(lead_id=lead.id, company_id=tenant.company_id, created_by=tenant.id, type="Visit", title="Visit"),
+            Task(
+                lead_id=lead.id, company_id=tenant.company_id, created_by=tenant.id,
+                title="Follow up", status=TaskStatus.planned, priority=TaskPriority.normal,
+            ),
+        ])
+    db.commit()
+    return leads
+
+
+def test_lead_list_sql(client, sql, leads_with_children):
+    with sql() as statements:
+        resp = client.get("/leads/", params={"limit": 10})
+    assert resp.status_code == 200, resp.text
+    assert len(resp.json()) == 2
+    assert "activities" not in resp.json()[0] and "tasks" not in resp.json()[0]
+
+    # Page + one IN query for the companies; nothing per row, no collections
+    assert len(statements) == 2, statements
+    page, companies = statements
+    assert page.startswith("SELECT") and "FROM leads " in page and "JOIN" not in page
+    assert "LIMIT" in page
+    assert "FROM company_profile " in companies and " IN " in companies
+    assert not _touching(statements, "activities") and not _touching(statements, "tasks")
+
+
+def test_lead_page_sql(client, sql, leads_with_children):
+    with sql() as statements:
+        resp = client.get("/leads/page", params={"limit": 1})
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert len(body["items"]) == 1 and body["next_cursor"]
+    assert "activities" not in body["items"][0]
+    assert len(statements) == 2, statements
+
+
+def test_lead_detail_sql(client, sql, leads_with_children):
+    lead_id = leads_with_children[0].id  # read before capturing: the commit expired it
+    with sql() as statements:
+        resp = client.get(f"/leads/{lead_id}")
+    assert resp.status_code == 200, resp.text
+    assert len(resp.json()["activities"]) == 2 and len(resp.json()["tasks"]) == 1
+
+    # Lead joined to its company, then one IN query per collection
+    assert len(statements) == 3, statements
+    lead_q, *collections = statements
+    assert "FROM leads LEFT OUTER JOIN company_profile" in lead_q
+    assert len(_selects_from(collections, "activities")) == 1
+    assert len(_selects_from(collections, "tasks")) == 1
+
+
+def test_lead_update_sql(client, sql, leads_with_children):
+    lead_id = leads_with_children[0].id
+    with sql() as statements:
+        resp = client.put(f"/leads/{lead_id}", json={"city": "Hassan"})
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["city"] == "Hassan"
+    assert len(resp.json()["activities"]) == 2 and len(resp.json()["tasks"]) == 1
+
+    # Bare lookup, the UPDATE, then the detail reload: collections read once
+    assert len(statements) == 5, statements
+    lookup, update, reload, *collections = statements
+    assert lookup.startswith("SELECT") and "FROM leads " in lookup and "JOIN" not in lookup
+    assert update.startswith("UPDATE leads SET")
+    assert "FROM leads LEFT OUTER JOIN company_profile" in reload
+    assert len(_selects_from(collections, "activities")) == 1
+    assert len(_selects_from(collections, "tasks")) == 1
+
+
+def test_lead_delete_sql(client, sql, db, leads_with_children):
+    lead_id = leads_with_children[0].id
+    with sql() as statements:
+        resp = client.delete(f"/leads/{lead_id}")
+    assert resp.status_code == 204, resp.text
+
+    lookup = statements[0]
+    assert lookup.startswith("SELECT") and "FROM leads " in lookup and "JOIN" not in lookup
+    # Children go with the FK cascade: not loaded, not deleted row by row
+    deletes = [s for s in statements if s.startswith("DELETE")]
+    assert len(deletes) == 1 and deletes[0].startswith("DELETE FROM leads")
+    assert not [s for s in _selects_from(statements, "activities") if "activities.title" in s]
+    assert not _selects_from(statements, "tasks")
+
+    assert db.query(Activity).filter(Activity.lead_id == lead_id).count() == 0
+
+
+def test_summary_overview_sql(client, sql, leads_with_children):
+    with sql() as statements:
+        resp = client.get("/activities/summary/overview")
+    assert resp.status_code == 200, resp.text
+
+    # Counter row lookup by primary key: no join, no scan of activities
+    assert len(statements) == 1, statements
+    assert "FROM activity_counters " in statements[0] and "JOIN" not in statements[0]
+    assert resp.json()["total"] == 4